@@ -1,26 +1,46 @@
 import os
+import time
 from datetime import datetime, timedelta
 
+import click
 import pytz
 from dotenv import load_dotenv
 from flask import Flask, render_template, redirect, url_for, session
+from flask import current_app
 from flask import jsonify
 from flask import request
+from flask.cli import pass_script_info, with_appcontext
 from flask_jwt_extended import JWTManager
 from flask_login import LoginManager, logout_user
 from flask_login import current_user
 from flask_login import login_required
-from flask_mail import Mail
-from flask_migrate import Migrate
-from sqlalchemy import select
-
-from backend.database import db
-from backend.models import UserTeam
+from jinja2 import FileSystemBytecodeCache
+from sqlalchemy import inspect
+
+from backend.compression import init_compression
+from backend.database import (
+    create_shard_schemas,
+    db,
+    init_read_engines,
+    init_shards,
+    init_sqlite_profile,
+    read_only,
+    set_request_shard,
+    sharding_enabled,
+    upgrade_schemas,
+)
+from backend.instrumentation import init_sql_instrumentation
+from backend.metrics import init_metrics
+from backend.profiling import init_profiling
+from backend.serialization import init_serialization
+from backend.static_assets import compress_static_files, init_static_assets
+from backend.structured_logging import get_logger, init_logging
+from backend.tracing import init_tracing
 from backend.models.notification import Notification
-from backend.models.project import Project
 from backend.models.user import User
 from backend.routes.analysis_routes import analysis_bp
 from backend.routes.category_routes import category_bp
+from backend.routes.metrics_routes import metrics_bp
 from backend.routes.notification_routes import notification_bp
 from backend.routes.project_routes import project_bp
 from backend.routes.task_routes import task_bp
@@ -31,26 +51,52 @@ from backend.services.analysis_service import (
     calendar_due_dates,
     calendar_worked_time,
 )
+from backend.services.project_service import get_visible_projects
+from backend.services.seed_service import seed_synthetic_data
+from backend.services.shard_service import (
+    shard_for_user,
+    sync_team_directory,
+    sync_user_directory,
+)
+from backend.services.snapshot_service import (
+    discard_stale_snapshot,
+    refresh_configured_snapshot,
+)
 from backend.services.task_service import get_task_by_id
+from backend.services.time_partition_service import (
+    compact_all_time_entries,
+    ensure_history_views,
+)
 from backend.services.team_service import get_teams
 from backend.services.time_entry_service import get_time_entries_by_task
+from config import database_file_settings
 
 """
 Main Flask application module for the backend API and frontend rendering.
 
-This module initializes the Flask app, loads configuration from environment variables,
-registers blueprints for modular route handling, and sets up extensions such as SQLAlchemy,
-Flask-Migrate, Flask-Mail, Flask-Login, and Flask-JWT-Extended.
+The `create_app()` factory builds the Flask app, loads configuration from environment
+variables, registers blueprints for modular route handling, and sets up extensions such
+as SQLAlchemy, Flask-Login, and Flask-JWT-Extended. Flask-Migrate (with Alembic) and
+Flask-Mail are only imported when `flask db` runs or the first email is sent, and the
+PDF exports import reportlab on first use, so workers and tests boot faster.
 
 Routes include user authentication (login/logout), project and team views, time tracking,
 notifications, and various API endpoints for analysis, categories, tasks, time entries, and more.
 
 Key Features:
 - Environment configuration loading via python-dotenv
-- SQLAlchemy ORM for database interaction with migrations support
+- Application factory; the module attribute `app` is built on first access
+- SQLAlchemy ORM for database interaction with migrations support; the schema is only
+  created at startup while Alembic does not manage the database
+- Optional sharding: each user's requests run against the SQLite file the user is
+  assigned to (see `backend.database.init_shards`)
 - User session management and authentication with Flask-Login and JWT
 - Modular route structure via Blueprints
-- Template rendering for frontend pages with static asset cache busting
+- Template rendering for frontend pages with a Jinja bytecode cache; static files are
+  served under content-hashed, immutable URLs (see `backend.static_assets`)
+- gzip/brotli compression of JSON, CSV and HTML responses (see `backend.compression`)
+- JSON through orjson, MessagePack for clients that ask for it (see
+  `backend.serialization`)
 - Notification management including reading, deleting, and test notifications
 - JSON APIs for calendar data and analysis services
 - Secure file upload folder initialization
@@ -60,7 +106,12 @@ Usage:
 
         python app.py
 
-    Or use a production WSGI server pointing to `app` Flask instance.
+    In production, serve it with preforked gunicorn workers (see `backend.serving`):
+
+        flask --app app serve --workers 4 --threads 4
+
+    Or use a production WSGI server pointing to the `app` Flask instance (`app:app`)
+    or to the factory (`app:create_app()`).
 
 Modules and Blueprints:
 - `auth_bp`: User authentication routes (login, logout, register)
@@ -71,9 +122,9 @@ Modules and Blueprints:
 - `project_bp`: Project views and APIs
 - `category_bp`: Category management API
 - `analysis_bp`: Data analysis endpoints (calendar views, reports)
+- `metrics_bp`: Prometheus metrics endpoint (`/metrics`)
 
 Template Context Processors:
-- `override_url_for`: Adds cache-busting query parameter to static file URLs
 - `inject_user_status`: Injects user login status and unread notification flag
 
 Flask-Login User Loader:
@@ -90,70 +141,177 @@ Example routes:
 # Load environment variables from .env file
 load_dotenv()
 
-app = Flask(
-    __name__, template_folder="frontend/templates", static_folder="frontend/static"
-)
-
-# Load configuration from config.py
-app.config.from_object("config.Config")
+log = get_logger("backend.views")
 
-# Initialize extensions
-db.init_app(app)
-migrate = Migrate(app, db)
-mail = Mail(app)
 login_manager = LoginManager()
 login_manager.login_view = "auth.login"
-login_manager.init_app(app)
-jwt = JWTManager(app)
+jwt = JWTManager()
 
-# Create an upload folder if not exists
-os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
 
-# Register Blueprints
-app.register_blueprint(auth_bp, url_prefix="/auth")
-app.register_blueprint(team_bp, url_prefix="/api/teams")
+class LazyMigrateGroup(click.Group):
+    """The `flask db` command group, loaded on first use.
 
-app.register_blueprint(notification_bp, url_prefix="/notifications")
-app.register_blueprint(task_bp, url_prefix="/api")
-app.register_blueprint(time_entry_bp, url_prefix="/api/time_entries")
-# For HTML Tempaltes
-app.register_blueprint(project_bp)
-# For API-Zugriffe
-app.register_blueprint(project_bp, url_prefix="/api/projects", name="project_api")
-app.register_blueprint(category_bp)
-app.register_blueprint(analysis_bp, url_prefix="/api/analysis")
-# Create tables if not exist
-with app.app_context():
-    db.create_all()
+    Flask-Migrate imports Alembic (and every Alembic dialect) as soon as it is
+    initialized, which is the largest share of the startup time. Web workers
+    never run migrations, so the extension is only set up when a `flask db`
+    command is looked up.
 
-# Secret key is now in config.py loaded from .env
+    Args:
+        app (Flask): The Flask application instance.
+    """
 
+    def __init__(self, app):
+        super().__init__("db", help="Perform database migrations.")
+        self.app = app
 
-@app.context_processor
-def override_url_for():
-    """
-    Context processor to add cache-busting query parameter to static file URLs.
+    def _migrate_commands(self):
+        from flask_migrate import Migrate
+        from flask_migrate.cli import db as db_commands
+
+        if "migrate" not in self.app.extensions:
+            Migrate(self.app, db, render_as_batch=True)
+        return db_commands
+
+    def parse_args(self, ctx, args):
+        # the group's own options (--directory, --x-arg) and their callback
+        commands = self._migrate_commands()
+        self.params, self.callback = commands.params, commands.callback
+        return super().parse_args(ctx, args)
 
-    This helps force the browser to reload static files (like CSS/JS/images)
-    when they change, by appending a timestamp based on the file's last modification time.
+    def list_commands(self, ctx):
+        return self._migrate_commands().list_commands(ctx)
+
+    def get_command(self, ctx, cmd_name):
+        return self._migrate_commands().get_command(ctx, cmd_name)
+
+
+def create_app(config=None):
+    """Build and configure the Flask application.
+
+    Args:
+        config (dict, optional): Settings applied on top of `config.Config`
+            before any extension is initialized. Overriding
+            `SQLALCHEMY_DATABASE_URI` also moves the settings of
+            `config.database_file_settings` next to that database, unless
+            they are given as well.
 
     Returns:
-        dict: A dictionary with a custom 'url_for' function to use in Jinja2 templates.
+        Flask: The configured application.
     """
+    app = Flask(
+        __name__, template_folder="frontend/templates", static_folder="frontend/static"
+    )
 
-    def dated_url_for(endpoint, **values):
-        if endpoint == "static":
-            filename = values.get("filename", None)
-            if filename:
-                file_path = os.path.join(app.static_folder, filename)
-                if os.path.exists(file_path):
-                    values["v"] = int(os.stat(file_path).st_mtime)
-        return url_for(endpoint, **values)
-
-    return dict(url_for=dated_url_for)
+    # Load configuration from config.py
+    app.config.from_object("config.Config")
+    if config:
+        app.config.update(config)
+        if "SQLALCHEMY_DATABASE_URI" in config:
+            derived = database_file_settings(
+                app.config["SQLALCHEMY_DATABASE_URI"],
+                app.config["SQLALCHEMY_ENGINE_OPTIONS"],
+            )
+            app.config.update(
+                (key, value) for key, value in derived.items() if key not in config
+            )
+
+    # before anything creates the Jinja environment, which keeps json.dumps
+    init_serialization(app)
+
+    # compiled templates survive restarts, so new workers skip the Jinja compiler
+    app.jinja_options = {
+        **app.jinja_options,
+        "bytecode_cache": FileSystemBytecodeCache(
+            app.config["JINJA_BYTECODE_CACHE_DIR"]
+        ),
+    }
+
+    # Initialize extensions
+    init_logging(app)
+    db.init_app(app)
+    init_shards(app)
+    init_read_engines(app)
+    init_sqlite_profile(app)
+    init_sql_instrumentation(app)
+    init_metrics(app)
+    init_profiling(app)
+    init_tracing(app)
+    init_static_assets(app)
+    init_compression(app)
+    login_manager.init_app(app)
+    jwt.init_app(app)
+    app.cli.add_command(LazyMigrateGroup(app))
+
+    # Create an upload folder if not exists
+    os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
+
+    # Register Blueprints
+    app.register_blueprint(auth_bp, url_prefix="/auth")
+    app.register_blueprint(team_bp, url_prefix="/api/teams")
+
+    app.register_blueprint(notification_bp, url_prefix="/notifications")
+    app.register_blueprint(task_bp, url_prefix="/api")
+    app.register_blueprint(time_entry_bp, url_prefix="/api/time_entries")
+    # For HTML Tempaltes
+    app.register_blueprint(project_bp)
+    # For API-Zugriffe
+    app.register_blueprint(project_bp, url_prefix="/api/projects", name="project_api")
+    app.register_blueprint(category_bp)
+    app.register_blueprint(analysis_bp, url_prefix="/api/analysis")
+    app.register_blueprint(metrics_bp)
+
+    # Views of this module
+    app.add_url_rule("/", view_func=home)
+    app.add_url_rule("/ping", view_func=ping, methods=["POST"])
+    app.add_url_rule("/calendar-due-dates", view_func=get_calendar_due_dates)
+    app.add_url_rule("/dashboard", view_func=dashboard)
+    app.add_url_rule("/TimeTracking", view_func=timeTracking)
+    app.add_url_rule("/analysis", view_func=analysis)
+    app.add_url_rule("/projects", view_func=projects, methods=["GET", "POST"])
+    app.add_url_rule("/teams", view_func=teams)
+    app.add_url_rule("/logout", view_func=logout, methods=["GET", "POST"])
+    app.add_url_rule("/notifications", view_func=notifications)
+    app.add_url_rule("/time_entries", view_func=time_entry_page)
+    app.add_url_rule("/calendar-worked-time", view_func=get_calendar_worked_time)
+    app.context_processor(inject_user_status)
+    app.before_request(update_last_active)
+    app.before_request(make_session_permanent)
+    app.before_request(check_session_expiry)
+    app.cli.add_command(refresh_analytics_snapshot_command)
+    app.cli.add_command(seed_synthetic_command)
+    app.cli.add_command(serve_command)
+    app.cli.add_command(compress_static_command)
+    app.cli.add_command(compact_time_entries_command)
+
+    # Create tables if not exist, unless Alembic manages the schema
+    if app.config["AUTO_CREATE_SCHEMA"]:
+        with app.app_context():
+            if not inspect(db.engine).has_table("alembic_version"):
+                db.create_all()
+        create_shard_schemas(app)
+        upgrade_schemas(app)
+        ensure_history_views(app)
+    discard_stale_snapshot(app)
+    if sharding_enabled(app):
+        sync_user_directory(app)
+        sync_team_directory(app)
+
+    # Secret key is now in config.py loaded from .env
+    return app
+
+
+def __getattr__(name):
+    """Build the default application on first access of the module's `app`.
+
+    `from app import app` and WSGI servers pointed at `app:app` keep working,
+    while importing the module for `create_app` builds nothing.
+    """
+    if name == "app":
+        application = globals()["app"] = create_app()
+        return application
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
-@app.route("/")
 def home():
     """
     Render the homepage.
@@ -164,7 +322,6 @@ def home():
     return render_template("homepage.html")
 
 
-@app.route("/ping", methods=["POST"])
 @login_required
 def ping():
     """
@@ -181,8 +338,8 @@ def ping():
     return "", 204
 
 
-@app.route("/calendar-due-dates")
 @login_required
+@read_only()
 def get_calendar_due_dates():
     """
     API endpoint to return calendar due dates as JSON.
@@ -195,7 +352,6 @@ def get_calendar_due_dates():
     return jsonify(calendar_due_dates())
 
 
-@app.route("/dashboard")
 def dashboard():
     """
     Render the main dashboard page.
@@ -220,7 +376,6 @@ def dashboard():
     return render_template("dashboard.html")
 
 
-@app.route("/TimeTracking")
 @login_required
 def timeTracking():
     """
@@ -234,7 +389,6 @@ def timeTracking():
     return render_template("timeTracking.html")
 
 
-@app.route("/analysis")
 @login_required
 def analysis():
     """
@@ -249,8 +403,8 @@ def analysis():
     return render_template("analysis.html")
 
 
-@app.route("/projects", methods=["GET", "POST"])
 @login_required
+@read_only()
 def projects():
     """
     Display a list of projects for the current user.
@@ -264,21 +418,16 @@ def projects():
     if not current_user.is_authenticated:
         return redirect(url_for("login"))
 
-    team_id_select = (
-        select(UserTeam.team_id)
-        .where(UserTeam.user_id == current_user.user_id)
-        .subquery()
+    all_projects = get_visible_projects(current_user.user_id)
+    log.debug(
+        "projects.listed",
+        project_ids=lambda: [project.project_id for project in all_projects],
     )
-    user_q = Project.query.filter(Project.user_id == current_user.user_id)
-    team_q = Project.query.filter(Project.team_id.in_(team_id_select))
-
-    all_projects = user_q.union(team_q).all()
-    print("Alle Projekte:", all_projects)
     return render_template("projects.html", projects=all_projects)
 
 
-@app.route("/teams")
 @login_required
+@read_only()
 def teams():
     """
     Display teams associated with the current user, including their projects.
@@ -290,7 +439,6 @@ def teams():
     return render_template("teams.html", teams=teams)
 
 
-@app.route("/logout", methods=["GET", "POST"])
 def logout():
     """
     Log out the current user.
@@ -310,7 +458,6 @@ def logout():
     return redirect(url_for("home"))
 
 
-@app.context_processor
 def inject_user_status():
     """
     Inject user login status and notification status into templates.
@@ -347,10 +494,11 @@ def load_user(user_id):
     Returns:
         User or None: User instance if found, else None.
     """
+    # the rest of the request works on the shard with the user's data
+    set_request_shard(shard_for_user(int(user_id)))
     return User.query.get(int(user_id))
 
 
-@app.route("/notifications")
 @login_required
 def notifications():
     """
@@ -372,7 +520,6 @@ def notifications():
     return render_template("notifications.html", notifications=user_notifications)
 
 
-@app.route("/time_entries")
 @login_required
 def time_entry_page():
     """
@@ -398,8 +545,8 @@ def time_entry_page():
     )
 
 
-@app.route("/calendar-worked-time")
 @login_required
+@read_only()
 def get_calendar_worked_time():
     """
     API endpoint to return calendar worked time data as JSON.
@@ -412,8 +559,79 @@ def get_calendar_worked_time():
     return jsonify(calendar_worked_time())
 
 
-@app.before_request
+@click.command("refresh-analytics-snapshot")
+@with_appcontext
+def refresh_analytics_snapshot_command():
+    """Copy the live database into the analytics snapshot once (e.g. from cron)."""
+    refreshed_at = refresh_configured_snapshot(current_app._get_current_object())
+    print(f"Analytics snapshot refreshed (data as of {refreshed_at.isoformat()})")
+
+
+@click.command("seed-synthetic")
+@click.option("--users", default=100, show_default=True)
+@click.option("--teams", default=20, show_default=True)
+@click.option("--projects-per-user", default=4, show_default=True)
+@click.option("--tasks-per-project", default=8, show_default=True)
+@click.option("--entries", default=100_000, show_default=True)
+@click.option("--notifications-per-user", default=10, show_default=True)
+@click.option("--years", default=2, show_default=True)
+@click.option("--seed", default=0, show_default=True)
+@click.option("--password", default="synthetic", show_default=True)
+@with_appcontext
+def seed_synthetic_command(**options):
+    """Add a reproducible synthetic data set to the database for scale testing."""
+    started = time.perf_counter()
+    connection = db.engine.raw_connection()
+    try:
+        counts = seed_synthetic_data(connection.driver_connection, **options)
+    finally:
+        connection.close()
+    summary = ", ".join(f"{count} {table}" for table, count in counts.items())
+    print(f"Inserted {summary} in {time.perf_counter() - started:.1f}s")
+
+
+@click.command("compress-static")
+@with_appcontext
+def compress_static_command():
+    """Write .gz (and with brotli installed .br) files next to the static files."""
+    written = compress_static_files(
+        current_app.static_folder, current_app.config["STATIC_MANIFEST_EXCLUDE"]
+    )
+    print(f"Compressed {len(written)} static files, restart the app to serve them")
+
+
+@click.command("compact-time-entries")
+@with_appcontext
+def compact_time_entries_command():
+    """Move time entries older than the hot months into month partitions (e.g. from cron)."""
+    results = compact_all_time_entries(current_app._get_current_object())
+    for database, moved in results.items():
+        summary = ", ".join(f"{count} into {name}" for name, count in moved.items())
+        print(f"{database}: moved {summary or 'nothing'}")
+
+
+@click.command("serve")
+@click.option("--bind", "-b", help="host:port, defaults to SERVER_BIND.")
+@click.option("--workers", "-w", type=int, help="Defaults to SERVER_WORKERS.")
+@click.option("--threads", type=int, help="Per worker, defaults to SERVER_THREADS.")
+@click.option("--timeout", type=int, help="Seconds, defaults to SERVER_TIMEOUT.")
+@click.option(
+    "--graceful-timeout", type=int, help="Defaults to SERVER_GRACEFUL_TIMEOUT."
+)
+@click.option("--keepalive", type=int, help="Seconds, defaults to SERVER_KEEPALIVE.")
+@click.option("--max-requests", type=int, help="Defaults to SERVER_MAX_REQUESTS.")
+@pass_script_info
+def serve_command(info, **options):
+    """Serve the app with preforked, preloaded gunicorn workers."""
+    # gunicorn is only imported by the process that serves
+    from backend.serving import serve
+
+    serve(info.load_app(), **options)
+
+
 def update_last_active():
+    if request.endpoint == "static":
+        return
     if current_user.is_authenticated:
         now = datetime.now()
         if not current_user.last_active or now - current_user.last_active > timedelta(
@@ -423,18 +641,19 @@ def update_last_active():
             db.session.commit()
 
 
-@app.before_request
 def make_session_permanent():
     """Marks the session as permanent and sets its lifetime to 24 hours.
 
     This function is executed before each request. It ensures that the session
     persists across browser restarts and is valid for 24 hours.
+    Static files are skipped, a cookie would keep caches from storing them.
     """
+    if request.endpoint == "static":
+        return
     session.permanent = True
-    app.permanent_session_lifetime = timedelta(hours=24)
+    current_app.permanent_session_lifetime = timedelta(hours=24)
 
 
-@app.before_request
 def check_session_expiry():
     """Checks user activity and logs out after 24 hours of inactivity.
 
@@ -443,11 +662,14 @@ def check_session_expiry():
     if more than 24 hours have passed since the last interaction.
 
     If the session is still valid, it updates the 'last_activity' timestamp.
+    Static files are skipped, they are no user activity and must stay cacheable.
 
     Returns:
         Response or None: Redirects to the login page if the session has expired;
         otherwise, continues processing the request.
     """
+    if request.endpoint == "static":
+        return None
     try:
         last_activity = session.get("last_activity")
         if last_activity:
@@ -469,4 +691,4 @@ def check_session_expiry():
 
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    create_app().run(debug=True)
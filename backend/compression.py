@@ -0,0 +1,126 @@
+import zlib
+
+from flask import request
+
+# server preference when the client accepts several with the same quality
+ENCODINGS = ("br", "gzip")
+
+
+def load_brotli():
+    """Return the brotli module, or None if the optional package is missing."""
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+class GzipCompressor:
+    """Incremental gzip stream with the interface of `brotli.Compressor`.
+
+    Args:
+        level (int): zlib compression level, 1 (fastest) to 9 (smallest).
+    """
+
+    def __init__(self, level):
+        # wbits 16 + 15: gzip header and trailer around a deflate stream
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def process(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+def negotiate_encoding(accept_encodings, available):
+    """Pick the encoding the client prefers among those the server offers.
+
+    Args:
+        accept_encodings (werkzeug.datastructures.Accept): The parsed
+            Accept-Encoding header.
+        available (iterable[str]): Supported encodings in server preference.
+
+    Returns:
+        str or None: The encoding to use, None to send the body as it is.
+    """
+    best, best_quality = None, 0
+    for encoding in available:
+        quality = accept_encodings[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def _compress_chunks(chunks, compressor):
+    # every chunk is flushed, so a streamed response still arrives piecewise
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            if chunk:
+                yield compressor.process(chunk) + compressor.flush()
+        yield compressor.finish()
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+
+
+def init_compression(app):
+    """Compress text responses with gzip or, if installed, brotli.
+
+    The encoding is negotiated from `Accept-Encoding`. Buffered responses are
+    compressed in one go when they reach `COMPRESSION_MIN_SIZE` bytes,
+    streamed responses chunk by chunk as the view produces them. Only the
+    types in `COMPRESSION_MIMETYPES` are compressed; files sent with
+    `send_file` (PDFs, static files with their precompressed variants) are
+    passed through untouched.
+
+    Args:
+        app (Flask): The Flask application instance.
+    """
+    if not app.config.get("COMPRESSION_ENABLED", True):
+        return
+
+    mimetypes = set(app.config["COMPRESSION_MIMETYPES"])
+    min_size = app.config["COMPRESSION_MIN_SIZE"]
+    level = app.config["COMPRESSION_LEVEL"]
+    brotli = load_brotli()
+    compressors = {"gzip": lambda: GzipCompressor(level)}
+    if brotli is not None:
+        quality = app.config["COMPRESSION_BROTLI_QUALITY"]
+        compressors["br"] = lambda: brotli.Compressor(quality=quality)
+    available = [encoding for encoding in ENCODINGS if encoding in compressors]
+
+    @app.after_request
+    def compress_response(response):
+        if (
+            response.mimetype not in mimetypes
+            or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+            or not 200 <= response.status_code < 300
+            or response.status_code == 204
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encoding = negotiate_encoding(request.accept_encodings, available)
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = _compress_chunks(
+                response.response, compressors[encoding]()
+            )
+            response.headers.pop("Content-Length", None)
+        else:
+            data = response.get_data()
+            if len(data) < min_size:
+                return response
+            compressor = compressors[encoding]()
+            response.set_data(compressor.process(data) + compressor.finish())
+        response.headers["Content-Encoding"] = encoding
+        return response
@@ -1,8 +1,172 @@
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from flask import current_app, g
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.schema import CreateTable
+
+DEFAULT_SQLITE_PRAGMAS = {"foreign_keys": "ON"}
+
+# keys of the read-only engines in SQLALCHEMY_READ_BINDS
+READ_BIND = "reader"
+ANALYTICS_BIND = "analytics"
+
+_read_bind = ContextVar("read_bind", default=None)
+
+# name of the primary database when it is used as a shard
+DEFAULT_SHARD = "default"
+
+_shard = ContextVar("shard", default=None)
+
+
+@contextmanager
+def read_only(bind=READ_BIND):
+    """Route the queries of a block (or decorated function) to a read-only engine.
+
+    Reads inside the block see the last committed state of the database in
+    one WAL snapshot and do not wait for writers. Flushes and UPDATE/DELETE
+    statements still go to the writer, but they will not be visible to later
+    reads in the same request, so only mark code that does not read its own
+    writes.
+
+    Args:
+        bind (str, optional): READ_BIND for the live database or
+            ANALYTICS_BIND for the periodically refreshed analytics snapshot.
+
+    Example:
+        @read_only()
+        def api_overall_progress():
+            ...
+    """
+    token = _read_bind.set(bind)
+    try:
+        yield
+    finally:
+        _read_bind.reset(token)
+
+
+@contextmanager
+def use_shard(name):
+    """Route the database work of a block to one shard.
+
+    For code outside a request, e.g. a background thread continuing the work
+    of a request, which passes on `current_shard()`, or for a request that
+    also touches the data of another shard, like a team of another user.
+
+    Pending changes are flushed when the block is entered and left, as the
+    session routes a flush to the shard that is current at that time.
+
+    Args:
+        name (str): Key of `SQLALCHEMY_SHARDS`, or DEFAULT_SHARD for the
+            primary database.
+    """
+    db.session.flush()
+    token = _shard.set(name)
+    try:
+        yield
+        db.session.flush()
+    finally:
+        _shard.reset(token)
+
+
+def set_request_shard(name):
+    """Route the rest of the current request to a shard.
+
+    Called as soon as the user of the request is known (the user loader, the
+    login); `init_shards` restores the previous routing when the request ends.
+
+    Args:
+        name (str): Key of `SQLALCHEMY_SHARDS`, or DEFAULT_SHARD.
+    """
+    _shard.set(name)
+
+
+def current_shard():
+    """Return the name of the shard the current work is routed to."""
+    return _shard.get() or DEFAULT_SHARD
+
+
+def sharding_enabled(app=None):
+    """Check whether the app has shards besides the primary database.
+
+    Args:
+        app (Flask, optional): Defaults to the current app.
+
+    Returns:
+        bool: True if `SQLALCHEMY_SHARDS` is configured.
+    """
+    app = app or current_app
+    return bool(app.extensions.get("shard_engines"))
+
+
+def shard_names(app=None):
+    """Return all shard names, the primary database first.
+
+    Args:
+        app (Flask, optional): Defaults to the current app.
+
+    Returns:
+        list[str]: DEFAULT_SHARD followed by the configured shards in order.
+    """
+    app = app or current_app
+    return [DEFAULT_SHARD, *sorted(app.extensions.get("shard_engines", {}))]
+
+
+def _database_file_exists(engine):
+    """Check whether the file behind a `sqlite:///file:...?uri=true` engine exists."""
+    database = engine.url.database or ""
+    if database.startswith("file:"):
+        database = database[5:]
+    return os.path.exists(database)
+
+
+class RoutingSession(Session):
+    """Session that routes statements to a shard or a read-only engine.
+
+    Inside a request of a user on a shard (see `set_request_shard`) every
+    statement goes to that shard's engine, except those on directory tables
+    (`info={"directory": True}`), which always live in the primary database.
+    The read-only engines replicate the primary database only, so
+    `read_only()` applies to users of the default shard.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        shard = _shard.get()
+        if (
+            bind is None
+            and shard not in (None, DEFAULT_SHARD)
+            and not (mapper is not None and mapper.local_table.info.get("directory"))
+        ):
+            return current_app.extensions["shard_engines"][shard]
+
+        key = _read_bind.get()
+        if (
+            bind is None
+            and key is not None
+            and not self._flushing
+            and not getattr(clause, "is_dml", False)
+        ):
+            engines = current_app.extensions.get("read_engines", {})
+            # fall back to live data until the first snapshot has been taken
+            if key == ANALYTICS_BIND and not (
+                key in engines and _database_file_exists(engines[key])
+            ):
+                key = READ_BIND
+            if key in engines:
+                return engines[key]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
 
 # Initialize the SQLAlchemy object globally
 # It will later be linked to the Flask app via `init_app`
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 
 
 def init_db(app):
@@ -15,6 +179,423 @@ def init_db(app):
         db.create_all()
 
 
+def init_read_engines(app):
+    """Create the read-only engines configured in `SQLALCHEMY_READ_BINDS`.
+
+    They are kept apart from Flask-SQLAlchemy's binds because no model lives
+    on them, so `db.create_all()` must not touch them. The engines are stored
+    in `app.extensions["read_engines"]`.
+
+    Args:
+        app (Flask): The Flask application instance.
+    """
+    engines = {}
+    for key, options in app.config.get("SQLALCHEMY_READ_BINDS", {}).items():
+        options = dict(options)
+        engines[key] = create_engine(options.pop("url"), **options)
+    app.extensions["read_engines"] = engines
+
+
+def init_shards(app):
+    """Create the engines of the shards configured in `SQLALCHEMY_SHARDS`.
+
+    Each shard is a complete database with the schema of the primary one.
+    Every user is assigned to one shard (see `backend.services.shard_service`)
+    and the requests of that user run against that shard only, so users of
+    different shards write to different files in parallel. Teams live in the
+    shard of the user who created them; the team directory routes their
+    requests there, and members of other shards are copied onto it (see
+    `mirror_user`). The engines are stored in
+    `app.extensions["shard_engines"]`; without shards, everything stays in
+    the primary database.
+
+    Args:
+        app (Flask): The Flask application instance.
+    """
+    engines = {}
+    for name, options in app.config.get("SQLALCHEMY_SHARDS", {}).items():
+        if name == DEFAULT_SHARD:
+            raise ValueError(f"{DEFAULT_SHARD!r} is the primary database")
+        options = dict(options)
+        engines[name] = create_engine(options.pop("url"), **options)
+    app.extensions["shard_engines"] = engines
+
+    @app.before_request
+    def start_request_shard():
+        g.shard_token = _shard.set(None)
+
+    @app.teardown_request
+    def reset_request_shard(exception):
+        token = g.pop("shard_token", None)
+        if token is not None:
+            _shard.reset(token)
+
+
+def create_shard_schemas(app):
+    """Create the missing tables in every shard, except the directory tables.
+
+    Args:
+        app (Flask): The Flask application instance.
+    """
+    tables = [
+        table for table in db.metadata.sorted_tables if not table.info.get("directory")
+    ]
+    for engine in app.extensions.get("shard_engines", {}).values():
+        db.metadata.create_all(engine, tables=tables)
+
+
+def _schema_rules(table):
+    """The foreign keys (with their ON DELETE rules) and nullable columns."""
+    foreign_keys = {
+        (
+            tuple(fk["constrained_columns"]),
+            fk["referred_table"],
+            (fk.get("options", {}).get("ondelete") or "").upper(),
+        )
+        for fk in table["foreign_keys"]
+    }
+    nullable = {name for name, is_nullable in table["columns"] if is_nullable}
+    return foreign_keys, nullable
+
+
+def outdated_tables(connection, tables):
+    """Return the tables whose foreign keys or nullable columns differ from the models.
+
+    Args:
+        connection (Connection): A connection to the database.
+        tables (list[Table]): The model tables to compare.
+
+    Returns:
+        list[Table]: The tables that exist with other rules.
+    """
+    inspector = inspect(connection)
+    outdated = []
+    for table in tables:
+        if not inspector.has_table(table.name):
+            continue
+        expected = {
+            "foreign_keys": [
+                {
+                    "constrained_columns": [
+                        element.parent.name for element in fk.elements
+                    ],
+                    "referred_table": fk.referred_table.name,
+                    "options": {"ondelete": fk.ondelete},
+                }
+                for fk in table.foreign_key_constraints
+            ],
+            "columns": [(column.name, column.nullable) for column in table.columns],
+        }
+        actual = {
+            "foreign_keys": inspector.get_foreign_keys(table.name),
+            "columns": [
+                (column["name"], column["nullable"])
+                for column in inspector.get_columns(table.name)
+            ],
+        }
+        if _schema_rules(expected) != _schema_rules(actual):
+            outdated.append(table)
+    return outdated
+
+
+def rebuild_table(connection, table):
+    """Recreate a table with the model's definition, keeping its rows.
+
+    SQLite cannot alter constraints in place. The caller runs this in a
+    transaction, with foreign key enforcement off and the views that read
+    the table dropped. The AUTOINCREMENT counter is kept.
+
+    Args:
+        connection (Connection): A connection inside the rebuild transaction.
+        table (Table): The model table.
+    """
+    new_name = f"{table.name}_new"
+    sequence = (
+        connection.scalar(
+            text("SELECT seq FROM sqlite_sequence WHERE name = :name"),
+            {"name": table.name},
+        )
+        if inspect(connection).has_table("sqlite_sequence")
+        else None
+    )
+    existing = {
+        column["name"] for column in inspect(connection).get_columns(table.name)
+    }
+    ddl = str(CreateTable(table).compile(dialect=connection.dialect))
+    connection.exec_driver_sql(
+        ddl.replace(f"CREATE TABLE {table.name} ", f"CREATE TABLE {new_name} ", 1)
+    )
+    columns = ", ".join(
+        column.name for column in table.columns if column.name in existing
+    )
+    connection.exec_driver_sql(
+        f"INSERT INTO {new_name} ({columns}) SELECT {columns} FROM {table.name}"
+    )
+    connection.exec_driver_sql(f"DROP TABLE {table.name}")
+    connection.exec_driver_sql(f"ALTER TABLE {new_name} RENAME TO {table.name}")
+    for index in table.indexes:
+        index.create(connection)
+    if sequence and table.dialect_options["sqlite"]["autoincrement"]:
+        connection.execute(
+            text("UPDATE sqlite_sequence SET seq = MAX(seq, :seq) WHERE name = :name"),
+            {"seq": sequence, "name": table.name},
+        )
+
+
+def apply_delete_rules(connection):
+    """Resolve rows whose referenced row is gone by their ON DELETE rules.
+
+    Databases written without foreign key enforcement can hold such rows,
+    e.g. time entries of deleted tasks. Rows of a CASCADE foreign key are
+    deleted and the columns of a SET NULL one cleared, until the deleted
+    rows leave no new dangling ones. Rows of other foreign keys are kept.
+    The caller runs this with foreign key enforcement off.
+
+    Args:
+        connection (Connection): A connection to the database.
+
+    Returns:
+        tuple[dict[str, int], list[tuple]]: Rows resolved per table and the
+        `PRAGMA foreign_key_check` rows that no rule covers.
+    """
+    resolved = {}
+    foreign_keys = {}
+    while True:
+        problems = connection.exec_driver_sql("PRAGMA foreign_key_check").all()
+        skipped = []
+        for table, rowid, _, fkid in problems:
+            if table not in foreign_keys:
+                foreign_keys[table] = connection.exec_driver_sql(
+                    f'PRAGMA foreign_key_list("{table}")'
+                ).all()
+            key = [row for row in foreign_keys[table] if row[0] == fkid]
+            rule = key[0][6].upper()
+            if rowid is None or rule not in ("CASCADE", "SET NULL"):
+                skipped.append((table, rowid, key[0][2], fkid))
+                continue
+            if rule == "CASCADE":
+                connection.exec_driver_sql(
+                    f'DELETE FROM "{table}" WHERE rowid = ?', (rowid,)
+                )
+            else:
+                columns = ", ".join(f'"{row[3]}" = NULL' for row in key)
+                connection.exec_driver_sql(
+                    f'UPDATE "{table}" SET {columns} WHERE rowid = ?', (rowid,)
+                )
+            resolved[table] = resolved.get(table, 0) + 1
+        if len(skipped) == len(problems):
+            return resolved, skipped
+
+
+def upgrade_foreign_keys(engine, tables):
+    """Rebuild the tables of a create_all() database that predate the ON DELETE rules.
+
+    Alembic managed databases get the same change from a migration. Views
+    are dropped for the rebuild and recreated unchanged.
+
+    Args:
+        engine (Engine): The engine of the database (or shard).
+        tables (list[Table]): The model tables to check.
+
+    Rows left dangling by older releases are resolved with
+    `apply_delete_rules` instead of failing the upgrade.
+
+    Returns:
+        tuple[list[str], dict[str, int], list[tuple]]: Names of the rebuilt
+        tables, and the result of `apply_delete_rules`.
+    """
+    with engine.connect() as connection:
+        connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+        outdated = outdated_tables(connection, tables)
+        if not outdated:
+            return [], {}, []
+
+        # dropping a referenced table would run the ON DELETE rules of the
+        # referencing ones; the pragma only takes effect outside a transaction
+        connection.exec_driver_sql("PRAGMA foreign_keys = OFF")
+        try:
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+            try:
+                views = connection.execute(
+                    text("SELECT name, sql FROM sqlite_master WHERE type = 'view'")
+                ).all()
+                for name, _ in views:
+                    connection.exec_driver_sql(f'DROP VIEW "{name}"')
+                for table in outdated:
+                    rebuild_table(connection, table)
+                for _, sql in views:
+                    connection.exec_driver_sql(sql)
+                resolved, skipped = apply_delete_rules(connection)
+            except BaseException:
+                connection.exec_driver_sql("ROLLBACK")
+                raise
+            connection.exec_driver_sql("COMMIT")
+        finally:
+            connection.exec_driver_sql("PRAGMA foreign_keys = ON")
+    return [table.name for table in outdated], resolved, skipped
+
+
+def upgrade_schemas(app):
+    """Apply `upgrade_foreign_keys` to the primary database and every shard.
+
+    The primary database is skipped when Alembic manages it.
+
+    Args:
+        app (Flask): The Flask application instance.
+    """
+    tables = [
+        table for table in db.metadata.sorted_tables if not table.info.get("directory")
+    ]
+    with app.app_context():
+        engines = [] if inspect(db.engine).has_table("alembic_version") else [db.engine]
+    engines.extend(app.extensions.get("shard_engines", {}).values())
+    for engine in engines:
+        rebuilt, resolved, skipped = upgrade_foreign_keys(engine, tables)
+        if rebuilt:
+            app.logger.info(
+                "rebuilt tables with the current foreign keys: %s", ", ".join(rebuilt)
+            )
+        if resolved:
+            app.logger.warning(
+                "applied the ON DELETE rules to dangling rows: %s", resolved
+            )
+        if skipped:
+            app.logger.warning(
+                "kept %d rows without their referenced row: %s",
+                len(skipped),
+                skipped[:10],
+            )
+
+
+def dispose_engines(app, close=True):
+    """Drop the pooled connections of all engines of the app.
+
+    SQLite connections must not be shared between processes. A forked worker
+    calls this with `close=False` first thing: the connections it inherited
+    are forgotten without being closed under the process that still uses
+    them, and the worker opens its own ones on demand.
+
+    Args:
+        app (Flask): The Flask application instance.
+        close (bool, optional): Close the pooled connections instead of only
+            discarding them.
+    """
+    with app.app_context():
+        engines = list(db.engines.values())
+    engines.extend(app.extensions.get("shard_engines", {}).values())
+    engines.extend(app.extensions.get("read_engines", {}).values())
+    for engine in engines:
+        engine.dispose(close=close)
+
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas):
+    """Run the configured PRAGMA statements on a raw SQLite connection.
+
+    Args:
+        dbapi_connection: The raw DBAPI connection that was just opened.
+        pragmas (dict): Mapping of pragma name to value, applied in order.
+    """
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    for name, value in pragmas.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+def init_sqlite_profile(app):
+    """Apply the app's SQLite pragma profile to every new connection.
+
+    SQLite settings such as foreign keys, the busy timeout or the cache size
+    only live for the connection that set them, so they are applied in a
+    `connect` event on each SQLite engine of the app. Must be called after
+    `db.init_app(app)`, `init_shards(app)` and `init_read_engines(app)` and
+    before the first connection is opened.
+
+    The read-only engines additionally get `query_only` and explicit BEGIN
+    statements, so all reads of one session share a single snapshot.
+
+    Args:
+        app (Flask): The Flask application instance.
+    """
+    pragmas = app.config.get("SQLITE_PRAGMAS", DEFAULT_SQLITE_PRAGMAS)
+    # the journal mode is a property of the file and set by the writer
+    reader_pragmas = {k: v for k, v in pragmas.items() if k != "journal_mode"}
+    reader_pragmas["query_only"] = "ON"
+
+    def on_connect(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, pragmas)
+
+    def on_reader_connect(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, reader_pragmas)
+        # let SQLAlchemy emit BEGIN itself instead of the driver's lazy begin
+        dbapi_connection.isolation_level = None
+
+    def on_reader_begin(connection):
+        connection.exec_driver_sql("BEGIN")
+
+    with app.app_context():
+        engines = list(db.engines.values())
+    engines.extend(app.extensions.get("shard_engines", {}).values())
+    for engine in engines:
+        if engine.dialect.name == "sqlite":
+            event.listen(engine, "connect", on_connect)
+
+    for engine in app.extensions.get("read_engines", {}).values():
+        if engine.dialect.name == "sqlite":
+            event.listen(engine, "connect", on_reader_connect)
+            event.listen(engine, "begin", on_reader_begin)
+
+
+def is_sqlite_busy(error):
+    """Check whether an error was raised because SQLite was locked by another writer.
+
+    Args:
+        error (Exception): The raised exception.
+
+    Returns:
+        bool: True for SQLITE_BUSY / SQLITE_LOCKED errors.
+    """
+    if not isinstance(error, OperationalError):
+        return False
+    message = str(error.orig).lower()
+    return "database is locked" in message or "database is busy" in message
+
+
+def retry_on_busy(func):
+    """Retry a database write with exponential backoff when SQLite reports busy.
+
+    The session is rolled back before every retry, so the wrapped function
+    must be safe to run again from the start. Retries and the initial delay
+    come from `SQLITE_BUSY_RETRIES` and `SQLITE_BUSY_BACKOFF`.
+
+    Args:
+        func (callable): Service function that commits to the database.
+
+    Returns:
+        callable: The wrapped function.
+    """
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        retries = current_app.config.get("SQLITE_BUSY_RETRIES", 3)
+        delay = current_app.config.get("SQLITE_BUSY_BACKOFF", 0.05)
+        for attempt in range(retries + 1):
+            try:
+                return func(*args, **kwargs)
+            except OperationalError as error:
+                db.session.rollback()
+                if attempt == retries or not is_sqlite_busy(error):
+                    raise
+                current_app.logger.warning(
+                    "SQLite busy in %s, retrying in %.2fs", func.__name__, delay
+                )
+                time.sleep(delay)
+                delay *= 2
+
+    return wrapper
+
+
 class Base(db.Model):
     """Abstract base class for all SQLAlchemy models."""
 
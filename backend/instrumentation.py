@@ -0,0 +1,152 @@
+import re
+import time
+from collections import Counter
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+from backend.database import db
+
+_LITERALS = [
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    # IN lists of any length have the same shape
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(?)"),
+    (re.compile(r"\s+"), " "),
+]
+
+
+class RequestQueryStats:
+    """SQL statistics of a single request.
+
+    Attributes:
+        count (int): Number of statements executed.
+        total_ms (float): Time spent in the database in milliseconds.
+        shapes (Counter): Executions per normalized statement.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.shapes = Counter()
+
+    def record(self, statement, elapsed_ms):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.shapes[normalize_statement(statement)] += 1
+
+    def repeated_shapes(self, threshold):
+        """Return the statement shapes executed more than `threshold` times.
+
+        Args:
+            threshold (int): Highest number of executions that is still fine.
+
+        Returns:
+            list[tuple[str, int]]: Shapes with their counts, most frequent first.
+        """
+        return [
+            (shape, count)
+            for shape, count in self.shapes.most_common()
+            if count > threshold
+        ]
+
+
+def normalize_statement(statement):
+    """Reduce a SQL statement to its shape by removing literals and parameters.
+
+    Args:
+        statement (str): SQL statement as sent to the driver.
+
+    Returns:
+        str: The statement with literals replaced by `?` and IN lists collapsed.
+    """
+    for pattern, replacement in _LITERALS:
+        statement = pattern.sub(replacement, statement)
+    return statement.strip()
+
+
+def request_label():
+    """Return a short label ("GET teams.get_full_teams") for the current request."""
+    return f"{request.method} {request.endpoint or request.path}"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+    started = conn.info["query_start_time"].pop()
+    if not has_request_context() or "sql_stats" not in g:
+        return
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    g.sql_stats.record(statement, elapsed_ms)
+
+    if elapsed_ms > current_app.config.get("SQL_SLOW_QUERY_MS", 200):
+        current_app.logger.warning(
+            "Slow query (%.1f ms) in %s: %s",
+            elapsed_ms,
+            request_label(),
+            normalize_statement(statement),
+            stack_info=True,
+        )
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute is skipped for failed statements
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start_time"):
+        connection.info["query_start_time"].pop()
+
+
+def init_sql_instrumentation(app):
+    """Record the SQL statements of every request and report them per request.
+
+    Each response gets a `Server-Timing` header with the number of queries
+    and the time spent in the database. Requests that run the same statement
+    shape more than `SQL_N_PLUS_ONE_THRESHOLD` times are logged as N+1
+    suspects, statements slower than `SQL_SLOW_QUERY_MS` are logged with the
+    stack that issued them.
+
+    Args:
+        app (Flask): The Flask application instance.
+    """
+    if not app.config.get("SQL_INSTRUMENTATION", True):
+        return
+
+    with app.app_context():
+        engines = list(db.engines.values())
+    engines += list(app.extensions.get("shard_engines", {}).values())
+    engines += list(app.extensions.get("read_engines", {}).values())
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+    @app.before_request
+    def start_sql_stats():
+        g.sql_stats = RequestQueryStats()
+
+    @app.after_request
+    def report_sql_stats(response):
+        stats = g.get("sql_stats")
+        if stats is None:
+            return response
+
+        response.headers.add(
+            "Server-Timing",
+            f'db;dur={stats.total_ms:.1f};desc="{stats.count} queries"',
+        )
+
+        threshold = app.config.get("SQL_N_PLUS_ONE_THRESHOLD", 10)
+        repeated = stats.repeated_shapes(threshold)
+        if repeated:
+            response.headers["X-N-Plus-One"] = str(len(repeated))
+            for shape, count in repeated:
+                app.logger.warning(
+                    "Possible N+1 in %s: statement ran %d times: %s",
+                    request_label(),
+                    count,
+                    shape,
+                )
+        return response
@@ -0,0 +1,333 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+
+from flask import g, request
+from sqlalchemy import event
+
+from backend.models.notification import Notification
+
+# name -> (type, help); rendered in this order
+METRICS = {
+    "clockwise_http_requests_total": (
+        "counter",
+        "HTTP requests by blueprint, endpoint, method and status code.",
+    ),
+    "clockwise_http_request_duration_seconds": (
+        "histogram",
+        "HTTP request latency by blueprint and endpoint.",
+    ),
+    "clockwise_db_queries_total": (
+        "counter",
+        "SQL statements executed by blueprint and endpoint.",
+    ),
+    "clockwise_export_bytes_total": (
+        "counter",
+        "Bytes of exported PDF and CSV files.",
+    ),
+    "clockwise_notifications_written_total": (
+        "counter",
+        "Notifications inserted into the database by type.",
+    ),
+    "clockwise_active_timers": (
+        "gauge",
+        "Time entries that are currently running.",
+    ),
+}
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# identifies this worker in the shared store, also when a pid is reused
+INSTANCE = f"{os.getpid()}-{int(time.time() * 1000)}"
+
+
+def _new_instance():
+    # workers forked from a preloaded app must not overwrite each other's rows
+    global INSTANCE
+    INSTANCE = f"{os.getpid()}-{int(time.time() * 1000)}"
+
+
+os.register_at_fork(after_in_child=_new_instance)
+
+
+class MetricsRegistry:
+    """In-process counters and histograms of one worker.
+
+    Values are cumulative for the lifetime of the process. `samples()`
+    flattens them into Prometheus samples so they can be written to the
+    shared store and summed across workers.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters = defaultdict(float)
+        self._histograms = {}
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] += amount
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            if key not in self._histograms:
+                self._histograms[key] = [[0] * len(self.buckets), 0.0, 0]
+            histogram = self._histograms[key]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram[0][index] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def samples(self):
+        """Return all values as Prometheus samples.
+
+        Returns:
+            list[tuple[str, dict, float]]: Sample name, labels and value.
+        """
+        with self._lock:
+            samples = [
+                (name, dict(labels), value)
+                for (name, labels), value in self._counters.items()
+            ]
+            for (name, labels), (counts, total, count) in self._histograms.items():
+                for bound, bucket_count in zip(self.buckets, counts):
+                    bucket_labels = dict(labels, le=_format_value(bound))
+                    samples.append((f"{name}_bucket", bucket_labels, bucket_count))
+                samples.append((f"{name}_bucket", dict(labels, le="+Inf"), count))
+                samples.append((f"{name}_sum", dict(labels), total))
+                samples.append((f"{name}_count", dict(labels), count))
+        return samples
+
+
+class MetricsStore:
+    """SQLite file shared by all workers of a host.
+
+    Every worker replaces its own rows with its cumulative values, so a scrape
+    can sum them up without the workers talking to each other.
+
+    Args:
+        path (str): Path of the SQLite file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=5)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS samples ("
+            " instance TEXT NOT NULL, name TEXT NOT NULL, labels TEXT NOT NULL,"
+            " value REAL NOT NULL, PRIMARY KEY (instance, name, labels))"
+        )
+        return connection
+
+    def write(self, instance, samples):
+        connection = self._connect()
+        try:
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO samples VALUES (?, ?, ?, ?)",
+                    [
+                        (instance, name, json.dumps(labels, sort_keys=True), value)
+                        for name, labels, value in samples
+                    ],
+                )
+        finally:
+            connection.close()
+
+    def prune(self, pid=None, started_before=None):
+        """Remove the rows of workers that no longer run.
+
+        Args:
+            pid (int, optional): Process id of an exited worker.
+            started_before (float, optional): Unix time; rows of workers
+                started earlier are removed.
+        """
+        connection = self._connect()
+        try:
+            with connection:
+                if pid is not None:
+                    connection.execute(
+                        "DELETE FROM samples WHERE instance LIKE ?", (f"{pid}-%",)
+                    )
+                if started_before is not None:
+                    connection.execute(
+                        "DELETE FROM samples WHERE CAST(substr(instance,"
+                        " instr(instance, '-') + 1) AS INTEGER) < ?",
+                        (int(started_before * 1000),),
+                    )
+        finally:
+            connection.close()
+
+    def read(self):
+        """Return the samples of all workers summed per name and labels.
+
+        Returns:
+            list[tuple[str, dict, float]]: Sample name, labels and value.
+        """
+        connection = self._connect()
+        try:
+            rows = connection.execute(
+                "SELECT name, labels, SUM(value) FROM samples GROUP BY name, labels"
+            ).fetchall()
+        finally:
+            connection.close()
+        return [(name, json.loads(labels), value) for name, labels, value in rows]
+
+
+registry = MetricsRegistry()
+_last_flush = 0.0
+
+
+def _format_value(value):
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render_metrics(samples):
+    """Render samples in the Prometheus text exposition format.
+
+    Args:
+        samples (list[tuple[str, dict, float]]): Sample name, labels and value.
+
+    Returns:
+        str: The exposition text.
+    """
+    by_metric = defaultdict(list)
+    for name, labels, value in samples:
+        base = name
+        for suffix in ("_bucket", "_sum", "_count"):
+            if name.endswith(suffix) and name[: -len(suffix)] in METRICS:
+                base = name[: -len(suffix)]
+        by_metric[base].append((name, labels, value))
+
+    lines = []
+    for base, (metric_type, help_text) in METRICS.items():
+        lines.append(f"# HELP {base} {help_text}")
+        lines.append(f"# TYPE {base} {metric_type}")
+        for name, labels, value in sorted(
+            by_metric.get(base, []), key=_sample_sort_key
+        ):
+            label_text = ",".join(
+                f'{key}="{_escape(val)}"' for key, val in sorted(labels.items())
+            )
+            label_text = "{" + label_text + "}" if label_text else ""
+            lines.append(f"{name}{label_text} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def _sample_sort_key(sample):
+    name, labels, _ = sample
+    other = sorted((k, v) for k, v in labels.items() if k != "le")
+    le = labels.get("le")
+    bound = float("inf") if le in (None, "+Inf") else float(le)
+    return (other, name, bound)
+
+
+def flush(app, force=False):
+    """Write this worker's values to the shared store.
+
+    Args:
+        app (Flask): The Flask application instance.
+        force (bool, optional): Write even if the flush interval has not passed.
+    """
+    global _last_flush
+
+    now = time.monotonic()
+    if not force and now - _last_flush < app.config.get("METRICS_FLUSH_INTERVAL", 5):
+        return
+    _last_flush = now
+    try:
+        MetricsStore(app.config["METRICS_DB_PATH"]).write(INSTANCE, registry.samples())
+    except sqlite3.Error:
+        app.logger.exception("Writing metrics failed")
+
+
+def prune_metrics(app, pid=None, started_before=None):
+    """Drop the values of workers that are gone, see `MetricsStore.prune`.
+
+    Called by the gunicorn master, so recycled and crashed workers do not
+    keep their rows in the store forever.
+
+    Args:
+        app (Flask): The Flask application instance.
+        pid (int, optional): Process id of an exited worker.
+        started_before (float, optional): Unix time; workers started earlier
+            are dropped.
+    """
+    if not app.config.get("METRICS_ENABLED", True):
+        return
+    try:
+        MetricsStore(app.config["METRICS_DB_PATH"]).prune(pid, started_before)
+    except sqlite3.Error:
+        app.logger.exception("Pruning metrics failed")
+
+
+def record_export(kind, size):
+    """Count the bytes of an exported file.
+
+    Args:
+        kind (str): Export format, e.g. "pdf" or "csv".
+        size (int): Size of the export in bytes.
+    """
+    registry.inc("clockwise_export_bytes_total", size, format=kind)
+
+
+def _count_notification(mapper, connection, target):
+    registry.inc("clockwise_notifications_written_total", type=target.type or "")
+
+
+def init_metrics(app):
+    """Collect request, query and export metrics for the `/metrics` endpoint.
+
+    Args:
+        app (Flask): The Flask application instance.
+    """
+    if not app.config.get("METRICS_ENABLED", True):
+        return
+
+    event.listen(Notification, "after_insert", _count_notification)
+
+    @app.before_request
+    def start_request_timer():
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.pop("metrics_start", None)
+        if started is None or request.endpoint == "metrics.metrics":
+            return response
+
+        labels = {
+            "blueprint": request.blueprint or "app",
+            "endpoint": request.endpoint or "unmatched",
+        }
+        registry.inc(
+            "clockwise_http_requests_total",
+            method=request.method,
+            status=str(response.status_code),
+            **labels,
+        )
+        registry.observe(
+            "clockwise_http_request_duration_seconds",
+            time.perf_counter() - started,
+            **labels,
+        )
+        sql_stats = g.get("sql_stats")
+        if sql_stats is not None:
+            registry.inc("clockwise_db_queries_total", sql_stats.count, **labels)
+
+        flush(app)
+        return response
@@ -11,6 +11,8 @@ Modules:
     time_entry (TimeEntry): Contains the TimeEntry model.
     notification (Notification): Contains the Notification model.
     category (Category): Contains the Category model.
+    user_shard (UserShard): Contains the UserShard directory model.
+    team_shard (TeamShard): Contains the TeamShard directory model.
 
 Exports:
     User: The User model class.
@@ -19,8 +21,11 @@ Exports:
     Project: The Project model class.
     Task: The Task model class.
     TimeEntry: The TimeEntry model class.
+    TimeEntryHistory: TimeEntry mapped onto the hot and archived time entries.
     Notification: The Notification model class.
     Category: The Category model class.
+    UserShard: The UserShard directory model class.
+    TeamShard: The TeamShard directory model class.
 """
 
 from backend.models.user import User
@@ -28,9 +33,13 @@ from backend.models.user_team import UserTeam
 from backend.models.team import Team
 from backend.models.project import Project
 from backend.models.task import Task
-from backend.models.time_entry import TimeEntry
+from backend.models.time_entry import TimeEntry, history_entity
 from backend.models.notification import Notification
 from backend.models.category import Category
+from backend.models.user_shard import UserShard
+from backend.models.team_shard import TeamShard
+
+TimeEntryHistory = history_entity()
 
 __all__ = [
     "User",
@@ -39,6 +48,9 @@ __all__ = [
     "Project",
     "Task",
     "TimeEntry",
+    "TimeEntryHistory",
     "Notification",
     "Category",
+    "UserShard",
+    "TeamShard",
 ]
@@ -21,12 +21,24 @@ class Notification(db.Model):
     """
 
     __tablename__ = "notifications"
+    __table_args__ = (
+        db.Index(
+            "ix_notifications_user_id_is_read_created_at",
+            "user_id",
+            "is_read",
+            "created_at",
+        ),
+    )
 
     #   Attributes
     id = db.Column(db.Integer, primary_key=True, index=True)
-    user_id = db.Column(db.Integer, db.ForeignKey("users.user_id"), nullable=False)
+    user_id = db.Column(
+        db.Integer, db.ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False
+    )
     project_id = db.Column(
-        db.Integer, db.ForeignKey("projects.project_id"), nullable=True
+        db.Integer,
+        db.ForeignKey("projects.project_id", ondelete="SET NULL"),
+        nullable=True,
     )
     message = db.Column(db.String, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -1,9 +1,11 @@
 import enum
 from datetime import datetime
 
-from sqlalchemy import Enum
+from sqlalchemy import Enum, event, func
+from sqlalchemy.orm import object_session
 
 from backend.database import db
+from backend.models.task import Task
 
 
 class ProjectType(enum.Enum):
@@ -32,7 +34,8 @@ class Project(db.Model):
         is_course (bool): Statement if Project is a Course or not.
         credit_points (int, optional): The credit points of the course, if it is a course.
         status (bool): Statement if project is active or not.
-        user_id (int): Foreign key of the user the project belongs to.
+        user_id (int): Foreign key of the user the project belongs to, None once
+            the admin of a team project left without a successor.
         team_id (int): Foreign key of the team the project belongs to.
         tasks (relationship): The tasks the project contains.
         team (relationship): The team the project belongs to.
@@ -41,6 +44,10 @@ class Project(db.Model):
     """
 
     __tablename__ = "projects"
+    __table_args__ = (
+        db.Index("ix_projects_team_id", "team_id"),
+        db.Index("ix_projects_user_id", "user_id"),
+    )
 
     project_id = db.Column(db.Integer, primary_key=True, index=True)
     name = db.Column(db.String, nullable=False)
@@ -57,24 +64,80 @@ class Project(db.Model):
     )
 
     # Foreign Keys
-    user_id = db.Column(db.Integer, db.ForeignKey("users.user_id"), nullable=False)
-    team_id = db.Column(db.Integer, db.ForeignKey("teams.team_id"), nullable=True)
+    user_id = db.Column(
+        db.Integer, db.ForeignKey("users.user_id", ondelete="SET NULL"), nullable=True
+    )
+    team_id = db.Column(
+        db.Integer, db.ForeignKey("teams.team_id", ondelete="CASCADE"), nullable=True
+    )
 
     tasks = db.relationship(
-        "Task", back_populates="project", cascade="all, delete-orphan"
+        "Task",
+        back_populates="project",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     team = db.relationship("Team", back_populates="project")
     user = db.relationship("User", back_populates="project")
-    notifications = db.relationship("Notification", back_populates="project")
+    notifications = db.relationship(
+        "Notification", back_populates="project", passive_deletes=True
+    )
+
+    # Task totals preloaded by listing queries (see project_service.load_projects_with_totals)
+    _total_duration_seconds = None
+    _task_count = None
+
+    def set_task_totals(self, total_seconds, task_count):
+        """
+        Attach task aggregates that were computed by a grouped SQL query.
+
+        Args:
+            total_seconds (int): Sum of the tasks' total_duration_seconds.
+            task_count (int): Number of tasks in the project.
+        """
+        self._total_duration_seconds = int(total_seconds or 0)
+        self._task_count = int(task_count or 0)
+
+    @property
+    def total_duration_seconds(self):
+        """Returns the summed duration of all tasks in seconds.
+
+        Uses the preloaded aggregate if available, otherwise runs a single SUM query
+        instead of loading every task.
+        """
+        if self._total_duration_seconds is not None:
+            return self._total_duration_seconds
+
+        session = object_session(self)
+        if session is None or self.project_id is None:
+            return sum(task.total_duration_seconds or 0 for task in self.tasks)
+
+        return (
+            session.query(func.coalesce(func.sum(Task.total_duration_seconds), 0))
+            .filter(Task.project_id == self.project_id)
+            .scalar()
+        )
+
+    @property
+    def task_count(self):
+        """Returns the number of tasks in the project."""
+        if self._task_count is not None:
+            return self._task_count
+
+        session = object_session(self)
+        if session is None or self.project_id is None:
+            return len(self.tasks)
+
+        return (
+            session.query(func.count(Task.task_id))
+            .filter(Task.project_id == self.project_id)
+            .scalar()
+        )
 
     @property
     def duration_readable(self):
         """Returns time spent in human-readable form (e.g. '1h 2min 3s')."""
-        total_seconds = sum(
-            task.total_duration_seconds or 0
-            for task in self.tasks
-            if task.total_duration_seconds
-        )
+        total_seconds = self.total_duration_seconds
 
         hours = total_seconds // 3600
         minutes = (total_seconds % 3600) // 60
@@ -90,3 +153,16 @@ class Project(db.Model):
             str: A string representation of the project object.
         """
         return f"<Project(id={self.project_id}, name={self.name}, team={self.team_id}, limit={self.time_limit_hours}, current={self.current_hours}, readable={self.duration_readable})>"
+
+
+@event.listens_for(Project, "expire")
+def _clear_task_totals(project, attrs):
+    """Drop the preloaded task totals together with the expired attributes."""
+    project._total_duration_seconds = None
+    project._task_count = None
+
+
+@event.listens_for(Project, "refresh")
+def _clear_task_totals_on_refresh(project, context, attrs):
+    """Drop the preloaded task totals when the project is reloaded."""
+    _clear_task_totals(project, attrs)
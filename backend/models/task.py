@@ -40,16 +40,33 @@ class Task(db.Model):
     """
 
     __tablename__ = "tasks"
+    __table_args__ = (
+        db.Index("ix_tasks_project_id", "project_id"),
+        db.Index("ix_tasks_member_id", "member_id"),
+        db.Index("ix_tasks_user_id", "user_id"),
+        db.Index("ix_tasks_admin_id", "admin_id"),
+        db.Index("ix_tasks_due_date", "due_date"),
+    )
 
     task_id = db.Column(db.Integer, primary_key=True)
     project_id = db.Column(
-        db.Integer, db.ForeignKey("projects.project_id"), nullable=True
+        db.Integer,
+        db.ForeignKey("projects.project_id", ondelete="CASCADE"),
+        nullable=True,
+    )
+    user_id = db.Column(
+        db.Integer, db.ForeignKey("users.user_id", ondelete="SET NULL"), nullable=True
+    )
+    admin_id = db.Column(
+        db.Integer, db.ForeignKey("users.user_id", ondelete="SET NULL"), nullable=True
+    )
+    member_id = db.Column(
+        db.Integer, db.ForeignKey("users.user_id", ondelete="SET NULL"), nullable=True
     )
-    user_id = db.Column(db.Integer, db.ForeignKey("users.user_id"), nullable=True)
-    admin_id = db.Column(db.Integer, db.ForeignKey("users.user_id"), nullable=True)
-    member_id = db.Column(db.Integer, db.ForeignKey("users.user_id"), nullable=True)
     category_id = db.Column(
-        db.Integer, db.ForeignKey("categories.category_id"), nullable=True
+        db.Integer,
+        db.ForeignKey("categories.category_id", ondelete="SET NULL"),
+        nullable=True,
     )
     title = db.Column(db.String, nullable=True)
     description = db.Column(db.String, nullable=True)
@@ -60,7 +77,10 @@ class Task(db.Model):
     total_duration_seconds = db.Column(db.Integer, default=0)
 
     time_entries = db.relationship(
-        "TimeEntry", back_populates="task", cascade="all, delete-orphan"
+        "TimeEntry",
+        back_populates="task",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     assigned_user = db.relationship(
         "User", foreign_keys=[user_id], back_populates="assigned_task"
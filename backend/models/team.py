@@ -23,8 +23,12 @@ class Team(db.Model):
     description = db.Column(db.String, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.now)
     # - Relationships:
-    members = db.relationship("UserTeam", back_populates="team", cascade="all, delete")
-    project = db.relationship("Project", back_populates="team", cascade="all, delete")
+    members = db.relationship(
+        "UserTeam", back_populates="team", cascade="all, delete", passive_deletes=True
+    )
+    project = db.relationship(
+        "Project", back_populates="team", cascade="all, delete", passive_deletes=True
+    )
 
     # - Validation
     def is_valid(self):
@@ -0,0 +1,30 @@
+from backend.database import db
+
+
+class TeamShard(db.Model):
+    """
+    Directory entry assigning a team to the shard that holds the team's data.
+
+    Like `UserShard`, the directory lives in the primary database only and
+    allocates the team ids, so they are unique across all shards and the
+    requests of a team can be routed by its id.
+
+    Attributes:
+        team_id (int): The unique identifier of the team (primary key).
+        shard (str): Name of the shard, "default" for the primary database.
+    """
+
+    __tablename__ = "team_shards"
+    __table_args__ = {"info": {"directory": True}}
+
+    team_id = db.Column(db.Integer, primary_key=True)
+    shard = db.Column(db.String, nullable=False)
+
+    def __repr__(self) -> str:
+        """
+        Returns a string representation of the directory entry.
+
+        Returns:
+            str: A string representation of the directory entry.
+        """
+        return f"<TeamShard(team_id={self.team_id}, shard={self.shard})>"
@@ -1,12 +1,24 @@
 from datetime import datetime, timedelta
 
+from sqlalchemy import DDL, event, text
+from sqlalchemy.orm import aliased
+
 from backend.database import db
 
+# all time entries: the hot table and the archived month partitions
+HISTORY_VIEW = "time_entry_history"
+
 
 class TimeEntry(db.Model):
     """
     Represents a time tracking entry linked to a user for a specific task.
 
+    The table is the hot tier: running entries and those of the recent months.
+    Older entries are moved into month partitions by
+    `backend.services.time_partition_service.compact_time_entries`; queries
+    over the whole history use `backend.models.TimeEntryHistory` instead. AUTOINCREMENT
+    keeps ids of archived entries from being handed out again.
+
     Attributes:
         time_entry_id (int): Primary key.
         user_id (int): Foreign key referencing the user who created the entry.
@@ -20,10 +32,20 @@ class TimeEntry(db.Model):
     """
 
     __tablename__ = "time_entries"
+    __table_args__ = (
+        db.Index("ix_time_entries_user_id_start_time", "user_id", "start_time"),
+        db.Index("ix_time_entries_user_id_end_time", "user_id", "end_time"),
+        db.Index("ix_time_entries_task_id", "task_id"),
+        {"sqlite_autoincrement": True},
+    )
 
     time_entry_id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey("users.user_id"), nullable=False)
-    task_id = db.Column(db.Integer, db.ForeignKey("tasks.task_id"), nullable=False)
+    user_id = db.Column(
+        db.Integer, db.ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False
+    )
+    task_id = db.Column(
+        db.Integer, db.ForeignKey("tasks.task_id", ondelete="CASCADE"), nullable=False
+    )
     start_time = db.Column(db.DateTime, nullable=True)
     end_time = db.Column(db.DateTime, nullable=True)
     duration_seconds = db.Column(db.Integer, nullable=True)
@@ -65,3 +87,48 @@ class TimeEntry(db.Model):
             "duration": str(timedelta(seconds=self.duration_seconds or 0)),
             "comment": self.comment,
         }
+
+
+def history_view_ddl(partitions=()):
+    """Return the CREATE VIEW statement of the history view.
+
+    Args:
+        partitions (list[str]): Names of the month partition tables.
+
+    Returns:
+        str: The statement, a UNION ALL of the hot table and the partitions.
+    """
+    columns = ", ".join(column.name for column in TimeEntry.__table__.columns)
+    selects = " UNION ALL ".join(
+        f"SELECT {columns} FROM {table}"
+        for table in (TimeEntry.__tablename__, *partitions)
+    )
+    return f"CREATE VIEW IF NOT EXISTS {HISTORY_VIEW} AS {selects}"
+
+
+event.listen(TimeEntry.__table__, "after_create", DDL(history_view_ddl()))
+event.listen(
+    TimeEntry.__table__, "before_drop", DDL(f"DROP VIEW IF EXISTS {HISTORY_VIEW}")
+)
+
+
+def history_entity():
+    """Return TimeEntry mapped onto the history view.
+
+    For reads that reach past the hot tier; the loaded objects are TimeEntry
+    instances. Archived entries have to be moved back with `thaw_time_entry`
+    before they can be changed. Aliasing configures the mappers, so it is
+    created in `backend.models` once all models are defined.
+
+    Returns:
+        AliasedClass: The entity, exported as `backend.models.TimeEntryHistory`.
+    """
+    columns = TimeEntry.__table__.columns
+    view = (
+        text(
+            f"SELECT {', '.join(column.name for column in columns)} FROM {HISTORY_VIEW}"
+        )
+        .columns(*columns)
+        .subquery(HISTORY_VIEW)
+    )
+    return aliased(TimeEntry, view, name="TimeEntryHistory")
@@ -41,20 +41,43 @@ class User(db.Model, UserMixin):
     last_active = db.Column(db.DateTime, default=datetime.now)
     profile_picture = db.Column(db.String, nullable=True)
 
-    teams = db.relationship("UserTeam", back_populates="user")
-    project = db.relationship("Project", back_populates="user")
+    # Child rows are removed (or detached) by ON DELETE rules in the database
+    teams = db.relationship(
+        "UserTeam", back_populates="user", cascade="all, delete", passive_deletes=True
+    )
+    # personal projects are deleted by user_service.delete_user, team projects
+    # are handed over to another member
+    project = db.relationship("Project", back_populates="user", passive_deletes=True)
     assigned_task = db.relationship(
-        "Task", foreign_keys="Task.user_id", back_populates="assigned_user"
+        "Task",
+        foreign_keys="Task.user_id",
+        back_populates="assigned_user",
+        passive_deletes=True,
     )
     admin_tasks = db.relationship(
-        "Task", foreign_keys="Task.admin_id", back_populates="admin"
+        "Task",
+        foreign_keys="Task.admin_id",
+        back_populates="admin",
+        passive_deletes=True,
     )
     member_tasks = db.relationship(
-        "Task", foreign_keys="Task.member_id", back_populates="member"
+        "Task",
+        foreign_keys="Task.member_id",
+        back_populates="member",
+        passive_deletes=True,
+    )
+    time_entries = db.relationship(
+        "TimeEntry", back_populates="user", cascade="all, delete", passive_deletes=True
+    )
+    notifications = db.relationship(
+        "Notification",
+        back_populates="user",
+        cascade="all, delete",
+        passive_deletes=True,
+    )
+    categories = db.relationship(
+        "Category", back_populates="user", cascade="all, delete", passive_deletes=True
     )
-    time_entries = db.relationship("TimeEntry", back_populates="user")
-    notifications = db.relationship("Notification", back_populates="user")
-    categories = db.relationship("Category", back_populates="user")
 
     def get_id(self):
         """
@@ -0,0 +1,33 @@
+from backend.database import db
+
+
+class UserShard(db.Model):
+    """
+    Directory entry assigning a user to the shard that holds the user's data.
+
+    The directory lives in the primary database only and also allocates the
+    user ids, so they are unique across all shards.
+
+    Attributes:
+        user_id (int): The unique identifier of the user (primary key).
+        username (str): The user's username, unique across all shards.
+        email (str): The user's email address, unique across all shards.
+        shard (str): Name of the shard, "default" for the primary database.
+    """
+
+    __tablename__ = "user_shards"
+    __table_args__ = {"info": {"directory": True}}
+
+    user_id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String, unique=True, nullable=False)
+    email = db.Column(db.String, unique=True, nullable=False)
+    shard = db.Column(db.String, nullable=False)
+
+    def __repr__(self) -> str:
+        """
+        Returns a string representation of the directory entry.
+
+        Returns:
+            str: A string representation of the directory entry.
+        """
+        return f"<UserShard(user_id={self.user_id}, shard={self.shard})>"
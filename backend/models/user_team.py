@@ -18,8 +18,16 @@ class UserTeam(db.Model):
 
     __tablename__ = "user_teams"
 
-    user_id = db.Column(db.Integer, db.ForeignKey("users.user_id"), primary_key=True)
-    team_id = db.Column(db.Integer, db.ForeignKey("teams.team_id"), primary_key=True)
+    user_id = db.Column(
+        db.Integer,
+        db.ForeignKey("users.user_id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    team_id = db.Column(
+        db.Integer,
+        db.ForeignKey("teams.team_id", ondelete="CASCADE"),
+        primary_key=True,
+    )
     role = db.Column(db.String, nullable=False, default="member")
     joined_at = db.Column(db.DateTime, default=datetime.now)
 
@@ -0,0 +1,189 @@
+import cProfile
+import hmac
+import os
+import pstats
+import random
+import re
+import threading
+import tracemalloc
+from datetime import datetime
+
+from flask import g, request
+
+# cProfile and tracemalloc are process wide (sys.monitoring since 3.12,
+# one allocation trace per process), so only one request is profiled at a time
+_profile_lock = threading.Lock()
+
+PROFILE_MODES = ("cpu", "memory")
+
+# files written by _output_path, their names sort by time
+PROFILE_FILE_PATTERN = re.compile(r"^\d{8}-\d{6}-\d{6}-")
+
+
+def collapsed_stacks(stats):
+    """Convert profiler statistics into collapsed stacks for flamegraph tools.
+
+    cProfile only records caller/callee pairs, not full stacks, so the stacks
+    are rebuilt by walking the call graph from its roots. The self time of a
+    function is split exactly between its direct callers, but the callees of a
+    function that is called from several places are repeated under each of
+    them, so deep shared helpers are over-counted.
+
+    Args:
+        stats (pstats.Stats): Statistics of a profiled run.
+
+    Returns:
+        list[str]: Lines of the form "root;caller;function <microseconds>".
+    """
+    callees = {}
+    for function, (_, _, _, _, callers) in stats.stats.items():
+        for caller, (_, _, inline_time, _) in callers.items():
+            callees.setdefault(caller, []).append((function, inline_time))
+
+    def label(function):
+        filename, line, name = function
+        return f"{name} ({os.path.basename(filename)}:{line})"
+
+    lines = []
+
+    def walk(function, stack, self_time):
+        stack = stack + [label(function)]
+        micros = int(self_time * 1_000_000)
+        if micros:
+            lines.append(f"{';'.join(stack)} {micros}")
+        for callee, inline_time in callees.get(function, []):
+            if label(callee) not in stack:
+                walk(callee, stack, inline_time)
+
+    for function, (_, _, inline_time, _, callers) in stats.stats.items():
+        if not callers:
+            walk(function, [], inline_time)
+    return lines
+
+
+def _requested_mode(app):
+    """Return the profile mode asked for by an authorized request, or None."""
+    token = app.config.get("PROFILING_TOKEN")
+    mode = request.headers.get("X-Profile") or request.args.get("profile")
+    if not token or mode not in PROFILE_MODES:
+        return None
+    given = request.headers.get("X-Profile-Token") or request.args.get(
+        "profile_token", ""
+    )
+    if not hmac.compare_digest(given.encode(), token.encode()):
+        return None
+    return mode
+
+
+def _output_path(app, extension):
+    directory = app.config["PROFILING_DIR"]
+    os.makedirs(directory, exist_ok=True)
+    endpoint = (request.endpoint or "unmatched").replace(".", "-")
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    return os.path.join(directory, f"{stamp}-{endpoint}.{extension}")
+
+
+def _write_cpu_profile(app, profiler):
+    stats_path = _output_path(app, "prof")
+    profiler.dump_stats(stats_path)
+    stats = pstats.Stats(profiler)
+    collapsed_path = stats_path[: -len(".prof")] + ".collapsed"
+    with open(collapsed_path, "w") as file:
+        file.write("\n".join(collapsed_stacks(stats)) + "\n")
+    return stats_path
+
+
+def _write_memory_profile(app, snapshot):
+    path = _output_path(app, "allocations.txt")
+    limit = app.config.get("PROFILING_TOP_ALLOCATIONS", 25)
+    snapshot = snapshot.filter_traces(
+        (tracemalloc.Filter(False, tracemalloc.__file__),)
+    )
+    top = snapshot.statistics("lineno")[:limit]
+    with open(path, "w") as file:
+        # the path only, the query string may carry the profile token
+        file.write(f"{request.method} {request.path}\n")
+        for stat in top:
+            file.write(f"{stat}\n")
+    return path
+
+
+def _prune_profiles(app):
+    """Delete the oldest profile files beyond `PROFILING_MAX_FILES`."""
+    limit = app.config.get("PROFILING_MAX_FILES", 200)
+    directory = app.config["PROFILING_DIR"]
+    names = sorted(
+        name for name in os.listdir(directory) if PROFILE_FILE_PATTERN.match(name)
+    )
+    for name in names[: max(len(names) - limit, 0)]:
+        try:
+            os.remove(os.path.join(directory, name))
+        except FileNotFoundError:
+            pass
+
+
+def init_profiling(app):
+    """Profile single requests on demand and a sample of all requests.
+
+    - `X-Profile: cpu` (or `?profile=cpu`) runs the request under cProfile and
+      stores a `.prof` file plus a `.collapsed` flamegraph input.
+    - `X-Profile: memory` records the top allocation sites with tracemalloc.
+    Both need `X-Profile-Token` (or `?profile_token=`) to match
+    `PROFILING_TOKEN`. With `PROFILING_SAMPLE_RATE` set to N, one in N
+    requests is profiled with cProfile automatically. Files are written to
+    `PROFILING_DIR` and the response names them in `X-Profile-File`; only
+    the newest `PROFILING_MAX_FILES` files are kept.
+
+    Args:
+        app (Flask): The Flask application instance.
+    """
+
+    @app.before_request
+    def start_profiling():
+        mode = _requested_mode(app)
+        sample_rate = app.config.get("PROFILING_SAMPLE_RATE", 0)
+        if mode is None and sample_rate > 0 and random.randrange(sample_rate) == 0:
+            mode = "cpu"
+        if mode is None or not _profile_lock.acquire(blocking=False):
+            return
+
+        g.profile_mode = mode
+        if mode == "cpu":
+            g.profiler = cProfile.Profile()
+            g.profiler.enable()
+        else:
+            tracemalloc.start()
+
+    @app.after_request
+    def finish_profiling(response):
+        mode = g.pop("profile_mode", None)
+        if mode is None:
+            return response
+
+        try:
+            if mode == "cpu":
+                profiler = g.pop("profiler")
+                profiler.disable()
+                path = _write_cpu_profile(app, profiler)
+            else:
+                snapshot = tracemalloc.take_snapshot()
+                tracemalloc.stop()
+                path = _write_memory_profile(app, snapshot)
+            _prune_profiles(app)
+        finally:
+            _profile_lock.release()
+
+        response.headers["X-Profile-File"] = os.path.basename(path)
+        return response
+
+    @app.teardown_request
+    def abort_profiling(exception):
+        # after_request is skipped when the view raised
+        mode = g.pop("profile_mode", None)
+        if mode is None:
+            return
+        if mode == "cpu":
+            g.pop("profiler").disable()
+        else:
+            tracemalloc.stop()
+        _profile_lock.release()
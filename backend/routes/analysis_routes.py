@@ -4,6 +4,13 @@ from io import BytesIO
 from flask import Blueprint, request, jsonify, make_response, send_file, current_app
 from flask_login import login_required, current_user
 
+from backend.database import read_only
+from backend.metrics import record_export
+from backend.services.snapshot_service import (
+    analytics_snapshot,
+    get_snapshot_refreshed_at,
+)
+
 from backend.services.analysis_service import (
     aggregate_time_by_day_project_task,
     notify_weekly_status,
@@ -22,12 +29,37 @@ from backend.services.analysis_service import (
     progress_per_project,
     actual_target_comparison,
 )
+from backend.structured_logging import get_logger
 
 analysis_bp = Blueprint("analysis", __name__, url_prefix="/api/analysis")
+log = get_logger(__name__)
+
+
+@analysis_bp.route("/snapshot")
+@login_required
+def api_snapshot_status():
+    """
+    Report how current the analytics snapshot is.
+
+    Returns:
+        JSON response with:
+            - refreshed_at (str or None): When the snapshot data was taken.
+            - age_seconds (int or None): Age of the snapshot data.
+    """
+    refreshed_at = get_snapshot_refreshed_at()
+    if refreshed_at is None:
+        return jsonify({"refreshed_at": None, "age_seconds": None})
+    return jsonify(
+        {
+            "refreshed_at": refreshed_at.isoformat(),
+            "age_seconds": int((datetime.now() - refreshed_at).total_seconds()),
+        }
+    )
 
 
 @analysis_bp.route("/project-progress")
 @login_required
+@analytics_snapshot
 def api_project_progress():
     """
     Get the progress ratio per project based on completed tasks.
@@ -42,6 +74,7 @@ def api_project_progress():
 
 @analysis_bp.route("/actual-vs-planned")
 @login_required
+@read_only()
 def api_actual_vs_planned():
     """
     Compare actual worked hours against planned target hours per project.
@@ -56,12 +89,13 @@ def api_actual_vs_planned():
     comparison = actual_target_comparison(
         time_entries, targets, notify=True, user_id=current_user.user_id
     )
-    print(comparison)
+    log.debug("analysis.actual_vs_planned", comparison=comparison)
     return jsonify(comparison)
 
 
 @analysis_bp.route("/weekly-time-stacked")
 @login_required
+@analytics_snapshot
 def api_weekly_time_stacked():
     """
     Retrieves weekly time entries grouped by project and task, stacked per day.
@@ -104,6 +138,7 @@ def api_weekly_time_stacked():
 
 @analysis_bp.route("/export/pdf")
 @login_required
+@analytics_snapshot
 def export_pdf():
     """
     Exports time entries to a downloadable PDF.
@@ -133,6 +168,7 @@ def export_pdf():
             return "Invalid date format (expected YYYY-MM-DD)", 400
 
     pdf_bytes = export_time_entries_pdf(time_entries)
+    record_export("pdf", len(pdf_bytes))
 
     return send_file(
         BytesIO(pdf_bytes),
@@ -144,6 +180,7 @@ def export_pdf():
 
 @analysis_bp.route("/export/csv")
 @login_required
+@analytics_snapshot
 def export_csv():
     """
     Exports time entries to a downloadable CSV file.
@@ -172,6 +209,7 @@ def export_csv():
             return "Invalid date format. Use YYYY-MM-DD.", 400
 
     csv_text = export_time_entries_csv(entries)
+    record_export("csv", len(csv_text.encode()))
 
     response = make_response(csv_text)
     response.headers["Content-Disposition"] = "attachment; filename=time_entries.csv"
@@ -181,6 +219,7 @@ def export_csv():
 
 @analysis_bp.route("/overall-progress")
 @login_required
+@analytics_snapshot
 def api_overall_progress():
     """
     Get overall progress across all active projects based on completed tasks.
@@ -0,0 +1,50 @@
+import hmac
+
+from flask import Blueprint, Response, current_app, request
+
+from backend.database import db, read_only, shard_names, use_shard
+from backend.metrics import MetricsStore, flush, render_metrics
+from backend.models.time_entry import TimeEntry
+
+metrics_bp = Blueprint("metrics", __name__)
+
+
+@metrics_bp.route("/metrics", methods=["GET"])
+def metrics():
+    """
+    Expose the metrics of all workers in the Prometheus text format.
+
+    The scraper has to send `METRICS_TOKEN` as a bearer token; the endpoint
+    does not exist while the token is unset.
+
+    Returns:
+        Response: Plain text exposition of counters, histograms and gauges,
+        404 if the endpoint is disabled or 401 if the token does not match.
+    """
+    app = current_app._get_current_object()
+    token = app.config.get("METRICS_TOKEN")
+    if not token:
+        return "", 404
+    given = request.headers.get("Authorization", "").removeprefix("Bearer ")
+    if not hmac.compare_digest(given.encode(), token.encode()):
+        return "", 401
+
+    flush(app, force=True)
+    samples = MetricsStore(app.config["METRICS_DB_PATH"]).read()
+
+    active_timers = 0
+    with read_only():
+        for shard in shard_names(app):
+            with use_shard(shard):
+                active_timers += (
+                    db.session.query(TimeEntry.time_entry_id)
+                    .filter(
+                        TimeEntry.end_time.is_(None), TimeEntry.start_time.isnot(None)
+                    )
+                    .count()
+                )
+    samples.append(("clockwise_active_timers", {}, active_timers))
+
+    return Response(
+        render_metrics(samples), mimetype="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -4,9 +4,11 @@ from flask_login import login_required, current_user
 
 from backend.database import db
 from backend.models import Notification
+from backend.structured_logging import get_logger
 
 # Blueprint for notification-related endpoints
 notification_bp = Blueprint("notifications", __name__)
+log = get_logger(__name__)
 
 
 @notification_bp.route("/notifications", methods=["GET"])
@@ -67,13 +69,16 @@ def mark_notification_as_read(notification_id):
         403 if unauthorized,
         404 if notification not found or unauthorized.
     """
-    print(">>> REACHED")
     if not current_user.is_authenticated:
         return jsonify({"error": "Not logged in"}), 403
 
     notification = Notification.query.get(notification_id)
     if not notification or notification.user_id != current_user.user_id:
-        print(">>> Found notification:", notification)
+        log.debug(
+            "notification.mark_read_rejected",
+            notification_id=notification_id,
+            user_id=current_user.user_id,
+        )
         return jsonify({"error": "No Messags found"}), 404
 
     if notification.is_read:
@@ -100,13 +105,12 @@ def delete_notification(notification_id):
                403 if unauthorized,
                404 if notification not found or unauthorized.
     """
-    print(">>> REACHED")
     if not current_user.is_authenticated:
         return "", 403
 
     notification = Notification.query.get(notification_id)
     if notification and notification.user_id == current_user.user_id:  # <- Fix hier
-        print(">>> Found notification:", notification)
+        log.debug("notification.deleted", notification_id=notification_id)
         db.session.delete(notification)
         db.session.commit()
         return "", 302
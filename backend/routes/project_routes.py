@@ -12,7 +12,8 @@ from flask import (
 )
 from flask_login import current_user, login_required
 
-from backend.database import db
+from backend.database import db, read_only
+from backend.metrics import record_export
 from backend.models import UserTeam, Team
 from backend.models.project import Project, ProjectType, ProjectStatus
 from backend.services.project_service import (
@@ -21,11 +22,15 @@ from backend.services.project_service import (
     delete_project,
     update_project,
     get_info,
+    get_visible_projects,
     export_project_info_csv,
     export_project_info_pdf,
 )
+from backend.services.snapshot_service import analytics_snapshot
+from backend.structured_logging import get_logger
 
 project_bp = Blueprint("project", __name__)
+log = get_logger(__name__)
 
 
 @project_bp.route("/project/create", methods=["GET", "POST"])
@@ -191,7 +196,7 @@ def api_projects():
     """
     if request.method == "POST":
         data = request.get_json()
-        print("POST /api/projects -> data:", data)
+        log.debug("project.create_requested", payload=data)
 
         name = data.get("name")
         description = data.get("description")
@@ -218,8 +223,10 @@ def api_projects():
 
         # prevent creating projects in unrelated teams
         if team_id:
-            print(
-                f"Checking membership: user_id={current_user.user_id}, team_id={team_id}"
+            log.debug(
+                "project.team_membership_checked",
+                user_id=current_user.user_id,
+                team_id=team_id,
             )
             is_member = UserTeam.query.filter_by(
                 user_id=current_user.user_id, team_id=team_id
@@ -250,27 +257,18 @@ def api_projects():
             return {"project_id": result["project_id"]}, 200
         return {"error": result.get("error", "Project creation failed")}, 400
 
-    # fetch all team projects the user is involved in
-    team_ids = [
-        row.team_id
-        for row in UserTeam.query.filter_by(user_id=current_user.user_id).all()
-    ]
-    own_projects = Project.query.filter(Project.user_id == current_user.user_id)
-
-    if team_ids:
-        team_projects = Project.query.filter(Project.team_id.in_(team_ids))
-        all_projects = own_projects.union(team_projects).all()
-    else:
-        all_projects = own_projects.all()
-
+    status_enum = None
     show_status = request.args.get("status")
     if show_status:
         try:
             status_enum = ProjectStatus[show_status]
-            all_projects = [p for p in all_projects if p.status == status_enum]
         except KeyError:
             return {"error": "Invalid status filter"}, 400
 
+    # own projects and team projects with task totals in one query
+    with read_only():
+        all_projects = get_visible_projects(current_user.user_id, status=status_enum)
+
     return {
         "projects": [
             {
@@ -281,6 +279,7 @@ def api_projects():
                 "time_limit_hours": p.time_limit_hours,
                 "current_hours": p.current_hours or 0,
                 "duration_readable": p.duration_readable,
+                "task_count": p.task_count,
                 "due_date": p.due_date.isoformat() if p.due_date else None,
                 "team_id": p.team_id,
                 "status": p.status.name if hasattr(p.status, "name") else str(p.status),
@@ -352,13 +351,15 @@ def api_project_detail(project_id):
         return {"success": True}
 
     if request.method == "DELETE":
-        db.session.delete(project)
-        db.session.commit()
+        result = delete_project(project_id)
+        if result.get("scheduled"):
+            return {"success": True, "scheduled": True}, 202
         return {"success": True}
 
 
 @project_bp.route("/api/projects/export/projects/pdf", methods=["GET"])
 @login_required
+@analytics_snapshot
 def export_projects_pdf():
     """
     Export all project data as a downloadable PDF.
@@ -367,8 +368,15 @@ def export_projects_pdf():
         Response: PDF file containing exported project data.
     """
     projects_data = get_info()
-    print("Exported project info:", projects_data)
     pdf_bytes = export_project_info_pdf(projects_data)
+    record_export("pdf", len(pdf_bytes))
+    log.info(
+        "projects.exported",
+        format="pdf",
+        bytes=len(pdf_bytes),
+        projects=lambda: len(projects_data["own_projects"])
+        + len(projects_data["team_projects"]),
+    )
 
     return send_file(
         BytesIO(pdf_bytes),
@@ -380,6 +388,7 @@ def export_projects_pdf():
 
 @project_bp.route("/api/projects/export/projects/csv", methods=["GET"])
 @login_required
+@analytics_snapshot
 def export_projects_csv():
     """
     Export all project data as a downloadable CSV.
@@ -388,8 +397,16 @@ def export_projects_csv():
         Response: CSV file containing exported project data.
     """
     projects_data = get_info()
-    print("Exported project info:", projects_data)
     csv_text = export_project_info_csv(projects_data)
+    size = len(csv_text.encode())
+    record_export("csv", size)
+    log.info(
+        "projects.exported",
+        format="csv",
+        bytes=size,
+        projects=lambda: len(projects_data["own_projects"])
+        + len(projects_data["team_projects"]),
+    )
 
     response = make_response(csv_text)
     response.headers["Content-Disposition"] = (
@@ -1,25 +1,59 @@
+from functools import wraps
+
 from flask import Blueprint, request, jsonify
 from flask_login import current_user, login_required
 
-from backend.database import db
+from backend.database import db, read_only, use_shard
 from backend.models import Project, Team, UserTeam, Notification, User
+from backend.services.shard_service import (
+    find_user_id,
+    mirror_user,
+    shard_for_team,
+    shard_for_user,
+)
 from backend.services.team_service import (
     create_new_team,
     delete_team_and_related,
     check_admin,
+    get_team_overview,
     remove_member_from_team,
 )
 
 # import the service function with a new name
 from backend.services.team_service import get_team_members as get_team_members_service
 from backend.services.team_service import get_user_teams as get_user_teams_service
+from backend.structured_logging import get_logger
 
 # Create a Flask Blueprint for team-related routes
 team_bp = Blueprint("teams", __name__)
+log = get_logger(__name__)
+
+
+def on_team_shard(view):
+    """
+    Run a view of one team on the shard that holds the team's data.
+
+    Goes below `login_required`, which routes the request to the shard of
+    the current user first.
+
+    Args:
+        view (callable): View function taking the team_id.
+
+    Returns:
+        callable: The wrapped view.
+    """
+
+    @wraps(view)
+    def wrapper(team_id, *args, **kwargs):
+        with use_shard(shard_for_team(team_id)):
+            return view(team_id, *args, **kwargs)
+
+    return wrapper
 
 
 @team_bp.route("/", methods=["GET"])
 @login_required
+@read_only()
 def get_user_teams():
     """
     Returns all teams the authenticated user is a member of.
@@ -71,20 +105,17 @@ def get_user_details(user_id):
     Returns:
         Response: JSON with user information or error message.
     """
-    print(f"DEBUG: get_user_details called for user_id: {user_id}")
     if not current_user.is_authenticated:
-        print("DEBUG: User not authenticated in get_user_details.")
         return jsonify({"error": "Not authenticated"}), 401
 
     try:
-        user = User.query.filter_by(user_id=user_id).first()
-        print(f"DEBUG: User query result for {user_id}: {user}")
+        with use_shard(shard_for_user(user_id)):
+            user = User.query.filter_by(user_id=user_id).first()
 
         if not user:
-            print(f"DEBUG: User not found in DB for user_id: {user_id}")
+            log.debug("team.user_details_not_found", user_id=user_id)
             return jsonify({"error": "User not found"}), 404
 
-        print(f"DEBUG: Found user: {user.username} (ID: {user.user_id})")
         return (
             jsonify(
                 {
@@ -96,16 +127,21 @@ def get_user_details(user_id):
         )
 
     except Exception as e:
-        print(f"DEBUG: Exception in get_user_details: {e}")
+        log.exception("team.user_details_failed", user_id=user_id)
         return jsonify({"error": str(e)}), 500
 
 
 @team_bp.route("/<int:team_id>/add-member", methods=["PATCH"])
 @login_required
+@on_team_shard
 def add_team_member(team_id):
     """
     Add a new user to the specified team.
 
+    Users are found through the shard directory, so users of every shard can
+    join. A user of another shard gets a copy on the team's shard, and the
+    notification goes to the user's own shard.
+
     Args:
         team_id (int): ID of the target team.
 
@@ -123,14 +159,10 @@ def add_team_member(team_id):
         if not raw_user_input:
             return jsonify({"error": "No user_id or username provided"}), 400
 
-        # Resolve user_id via username
-        if str(raw_user_input).isdigit():
-            new_member_id = int(raw_user_input)
-        else:
-            user = User.query.filter_by(username=raw_user_input.strip()).first()
-            if not user:
-                return jsonify({"error": f"User '{raw_user_input}' not found"}), 404
-            new_member_id = user.user_id
+        # Resolve user_id via username, ids have to exist too
+        new_member_id = find_user_id(raw_user_input)
+        if new_member_id is None:
+            return jsonify({"error": f"User '{raw_user_input}' not found"}), 404
 
         role = data.get("role", "member").strip().lower()
 
@@ -152,20 +184,22 @@ def add_team_member(team_id):
         if existing:
             return jsonify({"error": "User is already a member"}), 400
 
+        mirror_user(new_member_id)
         new_member = UserTeam(user_id=new_member_id, team_id=team_id, role=role)
         db.session.add(new_member)
         db.session.commit()
 
         team_name = Team.query.filter_by(team_id=team_id).first().name
-        notification = Notification(
-            user_id=new_member_id,
-            project_id=None,
-            message=f"You were added to the team '{team_name}'",
-            type="team",
-        )
-        print(f"Creating notification for user {new_member_id}")
-        db.session.add(notification)
-        db.session.commit()
+        with use_shard(shard_for_user(new_member_id)):
+            notification = Notification(
+                user_id=new_member_id,
+                project_id=None,
+                message=f"You were added to the team '{team_name}'",
+                type="team",
+            )
+            log.debug("team.member_notified", user_id=new_member_id, team_id=team_id)
+            db.session.add(notification)
+            db.session.commit()
 
         return jsonify({"message": "Member added successfully"}), 200
 
@@ -176,6 +210,7 @@ def add_team_member(team_id):
 
 @team_bp.route("/<int:team_id>/remove-member", methods=["PATCH"])
 @login_required
+@on_team_shard
 def remove_team_member(team_id):
     """
     Remove a user from the specified team.
@@ -198,13 +233,9 @@ def remove_team_member(team_id):
             return jsonify({"error": "No user_id or username provided"}), 400
 
         # Get target user ID (from username or ID)
-        if str(raw_user_input).isdigit():
-            member_id = int(raw_user_input)
-        else:
-            user = User.query.filter_by(username=raw_user_input.strip()).first()
-            if not user:
-                return jsonify({"error": f"User '{raw_user_input}' not found"}), 404
-            member_id = user.user_id
+        member_id = find_user_id(raw_user_input)
+        if member_id is None:
+            return jsonify({"error": f"User '{raw_user_input}' not found"}), 404
 
         # Admin check
         admin_relation = UserTeam.query.filter_by(
@@ -234,6 +265,7 @@ def remove_team_member(team_id):
 
 @team_bp.route("/<int:team_id>/members", methods=["GET"])  # Corrected route path
 @login_required
+@on_team_shard
 def get_team_members(team_id):
     """
     Get all members of a team.
@@ -250,6 +282,7 @@ def get_team_members(team_id):
 
 @team_bp.route("/<int:team_id>", methods=["DELETE"])
 @login_required
+@on_team_shard
 def delete_team(team_id):
     """
     Delete a team if the user is an admin.
@@ -272,6 +305,7 @@ def delete_team(team_id):
 # unnötig, da anders gelöst?
 @team_bp.route("/<int:team_id>/assign_project", methods=["POST"])
 @login_required
+@on_team_shard
 def api_assign_project_to_team(team_id):
     """
     Assign an existing project to a team.
@@ -302,6 +336,7 @@ def api_assign_project_to_team(team_id):
 
 @team_bp.route("/full", methods=["GET"])
 @login_required
+@read_only()
 def get_full_teams():
     """
     Returns full team data for the current user.
@@ -316,29 +351,11 @@ def get_full_teams():
     if not current_user.is_authenticated:
         return jsonify({"error": "Not authenticated"}), 401
 
-    user_teams = (
-        db.session.query(Team)
-        .join(UserTeam)
-        .filter(UserTeam.user_id == current_user.user_id)
-        .all()
-    )
-
     result = []
-    for team in user_teams:
-        members = []
-        for userteam in team.members:
-            members.append(
-                {
-                    "user_id": userteam.user.user_id,
-                    "username": userteam.user.username,
-                    "first_name": userteam.user.first_name,
-                    "last_name": userteam.user.last_name,
-                    "role": userteam.role,
-                }
-            )
-
+    for entry in get_team_overview(current_user.user_id):
+        team = entry["team"]
         projects = []
-        for project in team.project:
+        for project in entry["projects"]:
             projects.append(
                 {
                     "project_id": project.project_id,
@@ -361,7 +378,7 @@ def get_full_teams():
                 "name": team.name,
                 "description": team.description,
                 "created_at": team.created_at.isoformat() if team.created_at else None,
-                "members": members,
+                "members": entry["members"],
                 "projects": projects,
             }
         )
@@ -21,6 +21,7 @@ from backend.services.time_entry_service import (
     resume_time_entry,
     update_durations_for_task_and_project,
 )
+from backend.services.time_partition_service import thaw_time_entry
 
 time_entry_bp = Blueprint("time_entries", __name__, url_prefix="/api/time_entries")
 
@@ -90,7 +91,7 @@ def update_entry(entry_id):
     Returns:
         JSON with success or error message.
     """
-    time_entry = TimeEntry.query.get(entry_id)
+    time_entry = thaw_time_entry(entry_id)
 
     if time_entry:
         task = time_entry.task
@@ -118,7 +119,7 @@ def delete_entry(entry_id):
     Returns:
         JSON with success or error message.
     """
-    time_entry = TimeEntry.query.get(entry_id)
+    time_entry = thaw_time_entry(entry_id)
 
     if time_entry:
         task = time_entry.task
@@ -0,0 +1,133 @@
+import enum
+from datetime import date
+
+from flask import has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional, Flask's stdlib json provider stays in place
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # optional, clients asking for it get JSON
+    msgpack = None
+
+MSGPACK_MIMETYPES = ("application/msgpack", "application/x-msgpack")
+
+# dumps() keyword arguments orjson can follow; others fall back to json.dumps
+_ORJSON_KWARGS = {"default", "sort_keys", "indent", "separators", "ensure_ascii"}
+
+
+def _msgpack_default(value):
+    # same representation as orjson's JSON output
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    return DefaultJSONProvider.default(value)
+
+
+def wants_msgpack():
+    """Return the MessagePack type the client prefers over JSON, if any.
+
+    Returns:
+        str or None: The requested MessagePack mimetype, None for JSON.
+    """
+    best = request.accept_mimetypes.best_match(
+        ("application/json",) + MSGPACK_MIMETYPES
+    )
+    return best if best in MSGPACK_MIMETYPES else None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson, with MessagePack on request.
+
+    orjson serializes datetimes (ISO 8601), enums (their value), UUIDs and
+    dataclasses natively and returns bytes, so `jsonify` skips the pure
+    Python encoder and the str -> bytes copy. Keys are sorted and non-string
+    keys converted like with the stdlib provider. Types orjson does not know
+    (Decimal, Markup) go through Flask's default hook.
+
+    With `msgpack_enabled`, responses are packed as MessagePack when the
+    `Accept` header prefers `application/msgpack` to JSON.
+
+    Args:
+        app (Flask): The Flask application instance.
+        msgpack_enabled (bool): Offer MessagePack responses.
+    """
+
+    def __init__(self, app, msgpack_enabled=False):
+        super().__init__(app)
+        self.msgpack_enabled = msgpack_enabled and msgpack is not None
+
+    def _options(self, indent=None, sort_keys=None):
+        options = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys if sort_keys is None else sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps_bytes(self, obj, **kwargs):
+        """Serialize `obj` to UTF-8 JSON bytes.
+
+        Args:
+            obj: The data to serialize.
+            **kwargs: `json.dumps` arguments; unsupported ones (e.g. `cls`)
+                use the stdlib encoder.
+
+        Returns:
+            bytes: The JSON document.
+        """
+        unsupported = kwargs.keys() - _ORJSON_KWARGS
+        if unsupported or kwargs.get("indent") not in (None, 2):
+            return super().dumps(obj, **kwargs).encode()
+        return orjson.dumps(
+            obj,
+            default=kwargs.get("default", self.default),
+            option=self._options(kwargs.get("indent"), kwargs.get("sort_keys")),
+        )
+
+    def dumps(self, obj, **kwargs):
+        return self.dumps_bytes(obj, **kwargs).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        mimetype = (
+            wants_msgpack() if self.msgpack_enabled and has_request_context() else None
+        )
+        if mimetype:
+            response = self._app.response_class(
+                msgpack.packb(obj, default=_msgpack_default), mimetype=mimetype
+            )
+        else:
+            indent = (self.compact is None and self._app.debug) or self.compact is False
+            response = self._app.response_class(
+                orjson.dumps(obj, default=self.default, option=self._options(indent))
+                + b"\n",
+                mimetype=self.mimetype,
+            )
+        if self.msgpack_enabled:
+            response.vary.add("Accept")
+        return response
+
+
+def init_serialization(app):
+    """Switch `jsonify` and `request.get_json` to orjson if it is installed.
+
+    Call it before the Jinja environment is created, which captures the
+    provider's `dumps` for the `tojson` filter.
+
+    Args:
+        app (Flask): The Flask application instance.
+    """
+    if orjson is None or not app.config.get("ORJSON_ENABLED", True):
+        return
+    app.json = OrjsonProvider(app, app.config.get("MSGPACK_ENABLED", True))
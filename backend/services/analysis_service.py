@@ -4,18 +4,22 @@ from datetime import datetime, timedelta
 from io import StringIO, BytesIO
 
 from flask_login import current_user
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
 from sqlalchemy import or_
+from sqlalchemy.orm import joinedload
 
 from backend.database import db
-from backend.models import TimeEntry, Task, Project, Notification
+from backend.models import TimeEntryHistory, Task, Project, Notification
 from backend.services.notification_service import (
     notify_weekly_goal_achieved,
     already_notified_this_week,
 )
+from backend.structured_logging import get_logger
+from backend.tracing import traced
 
+log = get_logger(__name__)
 
+
+@traced()
 def export_time_entries_pdf(time_entries):
     """
     Export time entries as PDF Bytes.
@@ -26,6 +30,10 @@ def export_time_entries_pdf(time_entries):
     Returns:
         bytes: PDF data
     """
+    # reportlab is heavy to import and only needed for PDF exports
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
     buffer = BytesIO()
     c = canvas.Canvas(buffer, pagesize=letter)
     width, height = letter
@@ -58,6 +66,7 @@ def export_time_entries_pdf(time_entries):
     return pdf
 
 
+@traced()
 def export_time_entries_csv(time_entries):
     """
     Export time entries as CSV string.
@@ -88,6 +97,7 @@ def export_time_entries_csv(time_entries):
     return output.getvalue()
 
 
+@traced()
 def load_time_entries():
     """
     Load all time entries for the current logged-in user.
@@ -101,7 +111,12 @@ def load_time_entries():
     """
     if not current_user.is_authenticated:
         return []
-    entries = TimeEntry.query.filter_by(user_id=current_user.user_id).all()
+    entries = (
+        db.session.query(TimeEntryHistory)
+        .filter_by(user_id=current_user.user_id)
+        .options(joinedload(TimeEntryHistory.task).joinedload(Task.project))
+        .all()
+    )
     result = []
     for entry in entries:
         result.append(
@@ -115,6 +130,7 @@ def load_time_entries():
     return result
 
 
+@traced()
 def load_tasks():
     """
     Load all tasks visible to the current user:
@@ -133,13 +149,17 @@ def load_tasks():
         return []
 
     # Show solo, assigned, and admin‐created tasks
-    tasks = Task.query.filter(
-        or_(
-            Task.user_id == current_user.user_id,
-            Task.member_id == current_user.user_id,
-            Task.admin_id == current_user.user_id,
+    tasks = (
+        Task.query.filter(
+            or_(
+                Task.user_id == current_user.user_id,
+                Task.member_id == current_user.user_id,
+                Task.admin_id == current_user.user_id,
+            )
         )
-    ).all()
+        .options(joinedload(Task.project))
+        .all()
+    )
 
     result = []
     for task in tasks:
@@ -159,6 +179,7 @@ def load_tasks():
     return result
 
 
+@traced()
 def load_projects():
     """
     Load all projects for the current logged-in user.
@@ -171,6 +192,7 @@ def load_projects():
     return Project.query.filter_by(user_id=current_user.user_id).all()
 
 
+@traced()
 def filter_time_entries_by_date(time_entries, start_date, end_date):
     """
     Filter time entries to those between start_date and end_date inclusive.
@@ -187,6 +209,7 @@ def filter_time_entries_by_date(time_entries, start_date, end_date):
     return filtered
 
 
+@traced()
 def aggregate_weekly_time(time_entries, week_start_date):
     """
     Aggregate worked hours per project for each day of the given week.
@@ -219,6 +242,7 @@ def aggregate_weekly_time(time_entries, week_start_date):
     return project_hours
 
 
+@traced()
 def calendar_events(time_entries):
     """
     Convert time entries to calendar event format for frontend calendar rendering.
@@ -247,6 +271,7 @@ def calendar_events(time_entries):
     return events
 
 
+@traced()
 def progress_per_project(tasks):
     """
     Calculate progress per project as the ratio of completed tasks.
@@ -274,6 +299,7 @@ def progress_per_project(tasks):
     return result
 
 
+@traced()
 def actual_target_comparison(time_entries, target, notify=False, user_id=None):
     """
     Compare actual worked hours against target hours per project and optionally notify when goal is reached.
@@ -310,6 +336,7 @@ def actual_target_comparison(time_entries, target, notify=False, user_id=None):
     return comparison
 
 
+@traced()
 def load_target_times():
     """
     Loads the target planned hours per project for the current user.
@@ -323,6 +350,7 @@ def load_target_times():
     return {p.name: p.time_limit_hours for p in projects}
 
 
+@traced()
 def tasks_in_month(tasks, year, month):
     """
     Filters a list of tasks to include only those that start in the specified month and year.
@@ -347,6 +375,7 @@ def tasks_in_month(tasks, year, month):
     return filtered
 
 
+@traced()
 def calendar_due_dates():
     """
     Loads all project and task due dates and formats them as calendar events.
@@ -383,6 +412,7 @@ def calendar_due_dates():
     return events
 
 
+@traced()
 def calendar_worked_time():
     """
     Generates one calendar event per task per day with the total worked duration in hours, minutes, and seconds.
@@ -395,10 +425,20 @@ def calendar_worked_time():
             - 'color' (str): A fixed color hex code for styling the event.
             - 'extendedProps' (dict): Additional data, such as the project name.
     """
-    time_entries = load_time_entries()
-    if not time_entries:
-        return []
+    return worked_time_events(load_time_entries())
+
+
+@traced()
+def worked_time_events(time_entries):
+    """
+    Groups time entries into one all-day calendar event per task and day.
+
+    Args:
+        time_entries (list of dict): Time entries with the keys 'start', 'end', 'task' and 'project'.
 
+    Returns:
+        list: Calendar event dictionaries as described in `calendar_worked_time`.
+    """
     grouped = defaultdict(
         lambda: defaultdict(lambda: {"duration": [], "project": None})
     )
@@ -432,6 +472,7 @@ def calendar_worked_time():
     return events
 
 
+@traced()
 def aggregate_time_by_day_project_task(entries, week_start):
     """
     Aggregates time entries by (project, task) and weekday within a given week.
@@ -459,6 +500,7 @@ def aggregate_time_by_day_project_task(entries, week_start):
     return result
 
 
+@traced()
 def overall_progress(tasks):
     """
     Calculates the overall progress across all active projects based on completed tasks.
@@ -482,6 +524,7 @@ def overall_progress(tasks):
     return done / total if total > 0 else 0
 
 
+@traced()
 def notify_weekly_status(user_id, current_date=None):
     """
     Send weekly notifications per project about worked hours vs planned hours.
@@ -565,4 +608,8 @@ def notify_weekly_status(user_id, current_date=None):
             db.session.add(notification)
             db.session.commit()
 
-            print(f"Weekly status notification for project '{project.name}' sent.")
+            log.info(
+                "notification.weekly_status_sent",
+                user_id=user_id,
+                project_id=project.project_id,
+            )
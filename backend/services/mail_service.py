@@ -1,6 +1,38 @@
-from flask_mail import Mail, Message
+from flask import current_app
 
-mail = Mail()
+_mail = None
+
+
+def _mail_extension():
+    global _mail
+    if _mail is None:
+        from flask_mail import Mail
+
+        _mail = Mail()
+    return _mail
+
+
+def get_mail():
+    """Return the Flask-Mail extension of the current app.
+
+    flask_mail and the `email` package are imported on the first email
+    instead of at startup, and the extension registers itself on the app
+    that sends it.
+
+    Returns:
+        flask_mail.Mail: The mail extension.
+    """
+    mail = _mail_extension()
+    if "mail" not in current_app.extensions:
+        mail.init_app(current_app)
+    return mail
+
+
+def __getattr__(name):
+    # `mail_service.mail` without importing flask_mail when the module loads
+    if name == "mail":
+        return _mail_extension()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def send_forgot_password(email, reset_url):
@@ -13,6 +45,8 @@ def send_forgot_password(email, reset_url):
     Returns:
         None
     """
+    from flask_mail import Message
+
     message = Message(
         subject="Reset Your Password",
         recipients=[email],
@@ -24,4 +58,4 @@ def send_forgot_password(email, reset_url):
 <p>If you were not, you can ignore this message.</p>
 <p>Best regards,<br>your Clockwise team</p>
 """
-    mail.send(message)
+    get_mail().send(message)
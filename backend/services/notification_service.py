@@ -2,6 +2,9 @@ from datetime import datetime, timedelta
 
 from backend.database import db
 from backend.models.notification import Notification
+from backend.structured_logging import get_logger
+
+log = get_logger(__name__)
 
 
 def create_notification(user_id, message, notif_type="info", project_id=None):
@@ -82,7 +85,12 @@ def notify_progress_deviation(user_id, project_name, deviation_percentage):
     """
     message = f"Your progress in '{project_name}' deviates by {deviation_percentage}% from your weekly goal."
     create_notification(user_id, message, notif_type="progress")
-    print(f"Abweichung erkannt: {project_name} weicht um {deviation_percentage}% ab.")
+    log.info(
+        "notification.progress_deviation",
+        user_id=user_id,
+        project=project_name,
+        deviation_percentage=deviation_percentage,
+    )
 
 
 # Used in: project_routes.py
@@ -1,16 +1,22 @@
 import csv
+import threading
+from collections import defaultdict
 from datetime import datetime
 from io import BytesIO
 from io import StringIO
 
+from flask import current_app
 from flask_login import current_user
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
+from sqlalchemy import func, or_, select
 
-from backend.database import db
-from backend.models import Project, Task, UserTeam
+from backend.database import current_shard, db, use_shard
+from backend.models import Project, Task, TimeEntry, TimeEntryHistory, UserTeam
 from backend.models.project import ProjectStatus, ProjectType
 from backend.services.notification_service import notify_project_created
+from backend.services.time_partition_service import (
+    delete_archived_project_time_entries,
+)
+from backend.tracing import traced
 
 
 def calculate_time_limit_from_credits(credit_points):
@@ -25,6 +31,7 @@ def calculate_time_limit_from_credits(credit_points):
     return credit_points * 30
 
 
+@traced()
 def create_project(
     name,
     description,
@@ -88,6 +95,7 @@ def create_project(
     return {"success": True, "project_id": new_project.project_id}
 
 
+@traced()
 def get_project(project_id):
     """GEt a project by its ID.
 
@@ -104,9 +112,14 @@ def get_project(project_id):
     return {"success": True, "project": project}
 
 
+@traced()
 def delete_project(project_id):
     """Delete a project by its ID.
 
+    Tasks and time entries are removed by the database (ON DELETE CASCADE).
+    Projects with more time entries than PROJECT_PURGE_THRESHOLD are handed to
+    a background purge that deletes them in bounded chunks.
+
     Args:
         project_id (int): The unique ID of the project.
 
@@ -117,11 +130,148 @@ def delete_project(project_id):
     if not project:
         return {"error": "Project not found."}
 
+    threshold = current_app.config.get("PROJECT_PURGE_THRESHOLD", 5000)
+    if count_project_time_entries(project_id) > threshold:
+        schedule_project_purge(project_id)
+        return {
+            "success": True,
+            "scheduled": True,
+            "message": "Project deletion scheduled.",
+        }
+
     db.session.delete(project)
     db.session.commit()
     return {"success": True, "message": "Project deleted successfully."}
 
 
+@traced()
+def count_project_time_entries(project_id):
+    """Count the time entries of all tasks in a project.
+
+    Args:
+        project_id (int): The unique ID of the project.
+
+    Returns:
+        int: Number of time entries.
+    """
+    return (
+        db.session.query(func.count(TimeEntryHistory.time_entry_id))
+        .join(Task, Task.task_id == TimeEntryHistory.task_id)
+        .filter(Task.project_id == project_id)
+        .scalar()
+    )
+
+
+@traced()
+def purge_project(project_id, chunk_size=1000):
+    """Delete a project, its tasks and all its time entries in bounded chunks.
+
+    Every chunk is committed separately, so the database write lock is only
+    held for a short time and other requests can proceed in between.
+
+    Args:
+        project_id (int): The unique ID of the project.
+        chunk_size (int): Maximum number of rows deleted per transaction.
+
+    Returns:
+        dict: Number of deleted time entries and tasks.
+    """
+    deleted_entries = 0
+    while True:
+        chunk = (
+            select(TimeEntry.time_entry_id)
+            .join(Task, Task.task_id == TimeEntry.task_id)
+            .where(Task.project_id == project_id)
+            .limit(chunk_size)
+        )
+        deleted = TimeEntry.query.filter(TimeEntry.time_entry_id.in_(chunk)).delete(
+            synchronize_session=False
+        )
+        db.session.commit()
+        deleted_entries += deleted
+        if deleted < chunk_size:
+            break
+
+    # the archived entries too, the tasks would cascade into all of them
+    while True:
+        deleted = delete_archived_project_time_entries(project_id, chunk_size)
+        db.session.commit()
+        deleted_entries += deleted
+        if deleted < chunk_size:
+            break
+
+    deleted_tasks = 0
+    while True:
+        chunk = (
+            select(Task.task_id).where(Task.project_id == project_id).limit(chunk_size)
+        )
+        deleted = Task.query.filter(Task.task_id.in_(chunk)).delete(
+            synchronize_session=False
+        )
+        db.session.commit()
+        deleted_tasks += deleted
+        if deleted < chunk_size:
+            break
+
+    Project.query.filter(Project.project_id == project_id).delete(
+        synchronize_session=False
+    )
+    db.session.commit()
+
+    return {"time_entries": deleted_entries, "tasks": deleted_tasks}
+
+
+def release_projects_of_user(user_id):
+    """Delete the personal projects of a leaving user and hand over the team projects.
+
+    A team project goes to another member of its team, team admins and the
+    longest members first. Projects of a team without other members keep no
+    admin (user_id None). Tasks and time entries of the deleted projects are
+    removed by ON DELETE CASCADE. The caller is responsible for committing.
+
+    Args:
+        user_id (int): ID of the user being deleted.
+    """
+    Project.query.filter(Project.user_id == user_id, Project.team_id.is_(None)).delete(
+        synchronize_session="fetch"
+    )
+
+    successor = (
+        select(UserTeam.user_id)
+        .where(UserTeam.team_id == Project.team_id, UserTeam.user_id != user_id)
+        .order_by(UserTeam.role != "admin", UserTeam.joined_at, UserTeam.user_id)
+        .limit(1)
+        .scalar_subquery()
+    )
+    Project.query.filter(
+        Project.user_id == user_id, Project.team_id.is_not(None)
+    ).update({Project.user_id: successor}, synchronize_session="fetch")
+
+
+def schedule_project_purge(project_id):
+    """Run purge_project for a project in a background thread.
+
+    Args:
+        project_id (int): The unique ID of the project.
+    """
+    app = current_app._get_current_object()
+    chunk_size = app.config.get("PROJECT_PURGE_CHUNK_SIZE", 1000)
+    shard = current_shard()
+
+    def run():
+        with app.app_context(), use_shard(shard):
+            try:
+                purge_project(project_id, chunk_size=chunk_size)
+            except Exception:
+                db.session.rollback()
+                app.logger.exception("Purge of project %s failed", project_id)
+
+    threading.Thread(
+        target=run, name=f"project-purge-{project_id}", daemon=True
+    ).start()
+
+
+@traced()
 def update_project(project_id, data):
     """Update a project with provided data.
 
@@ -149,6 +299,7 @@ def update_project(project_id, data):
     return {"success": True, "message": "Project updated successfully."}
 
 
+@traced()
 def update_total_duration_for_project(project_id):
     """
     Recalculate and update the current_hours field of a project
@@ -164,11 +315,10 @@ def update_total_duration_for_project(project_id):
     if not project:
         return {"error": "Project not found"}
 
-    tasks = Task.query.filter_by(project_id=project_id).all()
-    total_seconds = sum(
-        task.total_duration_seconds or 0
-        for task in tasks
-        if task.total_duration_seconds is not None
+    total_seconds = (
+        db.session.query(func.coalesce(func.sum(Task.total_duration_seconds), 0))
+        .filter(Task.project_id == project_id)
+        .scalar()
     )
 
     total_hours = total_seconds / 3600.0
@@ -184,6 +334,111 @@ def update_total_duration_for_project(project_id):
     }
 
 
+@traced()
+def adjust_project_hours(project_id, delta_seconds):
+    """
+    Shift the current_hours counter of a project by a number of seconds.
+
+    Runs a single UPDATE instead of recomputing the sum over all tasks.
+    The caller is responsible for committing.
+
+    Args:
+        project_id (int): ID of the project to update.
+        delta_seconds (int): Seconds to add (negative values subtract).
+    """
+    if not delta_seconds:
+        return
+
+    Project.query.filter(Project.project_id == project_id).update(
+        {
+            Project.current_hours: func.max(
+                func.round(
+                    func.coalesce(Project.current_hours, 0) + delta_seconds / 3600.0,
+                    3,
+                ),
+                0,
+            )
+        },
+        synchronize_session="fetch",
+    )
+
+
+def project_totals_subquery(project_ids=None):
+    """
+    Build a grouped subquery with the summed task duration and task count per project.
+
+    Args:
+        project_ids (Select, optional): Restricts the aggregation to these projects,
+            so only their tasks are read (via the tasks.project_id index).
+
+    Returns:
+        Subquery: Columns 'project_id', 'total_seconds' and 'task_count'.
+    """
+    query = db.session.query(
+        Task.project_id.label("project_id"),
+        func.coalesce(func.sum(Task.total_duration_seconds), 0).label("total_seconds"),
+        func.count(Task.task_id).label("task_count"),
+    )
+    if project_ids is not None:
+        query = query.filter(Task.project_id.in_(project_ids))
+    else:
+        query = query.filter(Task.project_id.isnot(None))
+
+    return query.group_by(Task.project_id).subquery()
+
+
+@traced()
+def load_projects_with_totals(query):
+    """
+    Execute a project query joined to the task aggregates in a single statement.
+
+    The aggregates are attached to each project, so `duration_readable` and
+    `task_count` do not load the project's tasks.
+
+    Args:
+        query (Query): A query selecting Project entities.
+
+    Returns:
+        list[Project]: The projects with preloaded task totals.
+    """
+    project_ids = query.with_entities(Project.project_id).order_by(None)
+    totals = project_totals_subquery(project_ids.subquery().select())
+    rows = (
+        query.outerjoin(totals, totals.c.project_id == Project.project_id)
+        .add_columns(totals.c.total_seconds, totals.c.task_count)
+        .all()
+    )
+
+    projects = []
+    for project, total_seconds, task_count in rows:
+        project.set_task_totals(total_seconds, task_count)
+        projects.append(project)
+    return projects
+
+
+@traced()
+def get_visible_projects(user_id, status=None):
+    """
+    Get all projects owned by the user or belonging to one of the user's teams.
+
+    Args:
+        user_id (int): ID of the user.
+        status (ProjectStatus, optional): Only return projects with this status.
+
+    Returns:
+        list[Project]: Projects with preloaded task totals.
+    """
+    team_ids = select(UserTeam.team_id).where(UserTeam.user_id == user_id)
+    query = Project.query.filter(
+        or_(Project.user_id == user_id, Project.team_id.in_(team_ids))
+    )
+    if status is not None:
+        query = query.filter(Project.status == status)
+
+    return load_projects_with_totals(query)
+
+
+@traced()
 def serialize_projects(projects):
     """
     Serialize a list of Project objects to dicts with nested tasks and time entries.
@@ -194,6 +449,18 @@ def serialize_projects(projects):
     Returns:
         list: List of serialized project dicts.
     """
+    # archived entries included, for all tasks in one query
+    task_ids = [t.task_id for p in projects for t in p.tasks]
+    entries_by_task = defaultdict(list)
+    if task_ids:
+        for te in (
+            db.session.query(TimeEntryHistory)
+            .filter(TimeEntryHistory.task_id.in_(task_ids))
+            .order_by(TimeEntryHistory.time_entry_id)
+            .all()
+        ):
+            entries_by_task[te.task_id].append(te)
+
     serialized = []
     for p in projects:
         serialized.append(
@@ -222,7 +489,7 @@ def serialize_projects(projects):
                                 "duration_seconds": te.duration_seconds,
                                 "user_id": te.user_id,
                             }
-                            for te in t.time_entries
+                            for te in entries_by_task[t.task_id]
                         ],
                     }
                     for t in p.tasks
@@ -232,6 +499,7 @@ def serialize_projects(projects):
     return serialized
 
 
+@traced()
 def get_info():
     """
     Get serialized project data for current user and their team projects.
@@ -247,7 +515,8 @@ def get_info():
     ]
 
     team_projects = Project.query.filter(
-        Project.team_id.in_(team_ids), Project.user_id != current_user.user_id
+        Project.team_id.in_(team_ids),
+        Project.user_id.is_distinct_from(current_user.user_id),
     ).all()
 
     return {
@@ -256,6 +525,7 @@ def get_info():
     }
 
 
+@traced()
 def export_project_info_pdf(data):
     """
     Generate a PDF summary of projects, tasks, and time entries.
@@ -266,6 +536,10 @@ def export_project_info_pdf(data):
     Returns:
         bytes: PDF file content as byte string.
     """
+    # deferred: importing reportlab slows down every worker start
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
     buffer = BytesIO()
     c = canvas.Canvas(buffer, pagesize=letter)
     y = 750  # Position
@@ -366,6 +640,7 @@ def export_project_info_pdf(data):
     return buffer.read()
 
 
+@traced()
 def export_project_info_csv(data):
     """
     Export project, task, and time entry info as CSV.
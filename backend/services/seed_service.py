@@ -0,0 +1,380 @@
+import math
+import random
+from datetime import datetime, timedelta
+
+from werkzeug.security import generate_password_hash
+
+FIRST_NAMES = [
+    "Anna",
+    "Ben",
+    "Clara",
+    "David",
+    "Elif",
+    "Finn",
+    "Greta",
+    "Hannes",
+    "Ida",
+    "Jonas",
+    "Lea",
+    "Malte",
+    "Nora",
+    "Ole",
+    "Pia",
+    "Tim",
+]
+LAST_NAMES = [
+    "Becker",
+    "Fischer",
+    "Hoffmann",
+    "Klein",
+    "Koch",
+    "Meyer",
+    "Richter",
+    "Schmidt",
+    "Schulz",
+    "Wagner",
+    "Weber",
+    "Wolf",
+]
+CATEGORY_NAMES = [
+    "Vorlesung",
+    "Übung",
+    "Selbststudium",
+    "Meeting",
+    "Recherche",
+    "Schreiben",
+    "Programmieren",
+]
+COURSE_CREDITS = (3, 5, 6, 10)
+STATUS_WEIGHTS = {"todo": 3, "in_progress": 2, "done": 5}
+NOTIFICATION_TYPES = ("info", "task", "team", "progress")
+
+# time entries are written in chunks so a million of them never sit in memory
+ENTRY_CHUNK_SIZE = 50_000
+
+
+def _timestamp(value):
+    # the format SQLAlchemy stores DateTime columns in SQLite with
+    return value.isoformat(" ", "microseconds")
+
+
+def _next_id(cursor, table, column):
+    cursor.execute(f"SELECT COALESCE(MAX({column}), 0) FROM {table}")
+    return cursor.fetchone()[0] + 1
+
+
+def _session_hour(rng):
+    """Return the start hour of a work session, peaking in the early afternoon."""
+    return min(max(rng.gauss(13.5, 3.0), 7.0), 22.0)
+
+
+def _session_seconds(rng):
+    """Return a session length: log-normal around 45 minutes, 5 minutes to 4 hours."""
+    seconds = rng.lognormvariate(math.log(45 * 60), 0.6)
+    return int(min(max(seconds, 5 * 60), 4 * 3600))
+
+
+def seed_synthetic_data(
+    connection,
+    users=100,
+    teams=20,
+    projects_per_user=4,
+    tasks_per_project=8,
+    entries=100_000,
+    notifications_per_user=10,
+    years=2,
+    seed=0,
+    now=None,
+    password="synthetic",
+):
+    """Fill a database with a reproducible synthetic data set for scale tests.
+
+    All rows are written with `executemany` on the DB-API connection in a
+    single transaction, bypassing the ORM. New ids continue after the highest
+    existing ones, so the data can be added to a database that is already in
+    use; the same seed and `now` on the same starting database produce the
+    same rows. Task durations and project hours are recalculated from the
+    generated time entries at the end.
+
+    Args:
+        connection (sqlite3.Connection): DB-API connection to the database.
+        users (int, optional): Number of users.
+        teams (int, optional): Number of teams; each gets 3 to 8 members and a team project.
+        projects_per_user (int, optional): Solo projects per user, about a third are courses.
+        tasks_per_project (int, optional): Average number of tasks per project.
+        entries (int, optional): Number of time entries.
+        notifications_per_user (int, optional): Average notifications per user.
+        years (int, optional): How far back the time entries reach.
+        seed (int, optional): Seed of the random generator.
+        now (datetime, optional): End of the generated period, defaults to today.
+        password (str, optional): Password of all generated users.
+
+    Returns:
+        dict: Number of rows inserted per table.
+    """
+    rng = random.Random(seed)
+    now = now or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    start = now - timedelta(days=365 * years)
+    days = max((now - start).days, 1)
+    cursor = connection.cursor()
+
+    user_id = _next_id(cursor, "users", "user_id")
+    team_id = _next_id(cursor, "teams", "team_id")
+    category_id = _next_id(cursor, "categories", "category_id")
+    project_id = _next_id(cursor, "projects", "project_id")
+    task_id = _next_id(cursor, "tasks", "task_id")
+
+    password_hash = generate_password_hash(password)
+    user_rows = []
+    for number in range(users):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        created_at = _timestamp(start - timedelta(days=rng.randrange(1, 60)))
+        username = f"synthetic_{seed}_{user_id + number}"
+        user_rows.append(
+            (
+                user_id + number,
+                username,
+                f"{username}@example.com",
+                password_hash,
+                first,
+                last,
+                created_at,
+                created_at,
+            )
+        )
+    user_ids = [row[0] for row in user_rows]
+
+    # categories are per user
+    category_rows, categories_of = [], {}
+    for uid in user_ids:
+        names = rng.sample(CATEGORY_NAMES, rng.randint(2, 5))
+        categories_of[uid] = list(range(category_id, category_id + len(names)))
+        category_rows += [(category_id + i, name, uid) for i, name in enumerate(names)]
+        category_id += len(names)
+
+    team_rows, membership_rows, members_of = [], [], {}
+    for number in range(teams if users else 0):
+        tid = team_id + number
+        members = rng.sample(user_ids, min(len(user_ids), rng.randint(3, 8)))
+        members_of[tid] = members
+        team_rows.append((tid, f"Team {tid}", "Synthetic team", _timestamp(start)))
+        membership_rows += [
+            (uid, tid, "admin" if index == 0 else "member", _timestamp(start))
+            for index, uid in enumerate(members)
+        ]
+
+    # project rows and the users that can track time on each project
+    project_rows, project_users = [], []
+
+    def add_project(owner, tid, name, is_course):
+        credit_points = rng.choice(COURSE_CREDITS) if is_course else None
+        time_limit = credit_points * 30 if is_course else rng.choice((20, 40, 80, 120))
+        created_at = start + timedelta(days=rng.randrange(max(days - 30, 1)))
+        due_date = created_at + timedelta(days=rng.randint(30, 240))
+        status = "active" if due_date > now or rng.random() < 0.2 else "inactive"
+        project_rows.append(
+            (
+                project_id + len(project_rows),
+                name,
+                "Synthetic project",
+                time_limit,
+                0.0,
+                _timestamp(created_at),
+                _timestamp(due_date),
+                "TeamProject" if tid else "SoloProject",
+                is_course,
+                credit_points,
+                status,
+                owner,
+                tid,
+            )
+        )
+        project_users.append(members_of[tid] if tid else [owner])
+
+    for uid in user_ids:
+        for number in range(projects_per_user):
+            is_course = rng.random() < 0.35
+            kind = "Kurs" if is_course else "Projekt"
+            add_project(uid, None, f"{kind} {number + 1}", is_course)
+    for tid, members in members_of.items():
+        add_project(members[0], tid, f"Teamprojekt {tid}", False)
+
+    # tasks, each with the user whose time entries it collects
+    task_rows, task_owners = [], []
+    statuses, status_weights = zip(*STATUS_WEIGHTS.items())
+    for project, trackers in zip(project_rows, project_users):
+        pid, owner, tid = project[0], project[11], project[12]
+        for _ in range(max(1, int(rng.expovariate(1 / tasks_per_project)))):
+            tracker = rng.choice(trackers)
+            # only the assigned member may track a team task, also the admin
+            member = tracker if tid else None
+            category = (
+                rng.choice(categories_of[tracker]) if rng.random() < 0.7 else None
+            )
+            created_at = datetime.fromisoformat(project[5])
+            task_rows.append(
+                (
+                    task_id + len(task_rows),
+                    pid,
+                    None if tid else owner,
+                    owner if tid else None,
+                    member,
+                    category,
+                    f"Aufgabe {len(task_rows) + 1}",
+                    None,
+                    project[6],
+                    rng.choices(statuses, status_weights)[0],
+                    _timestamp(created_at + timedelta(days=rng.randrange(14))),
+                    False,
+                    0,
+                )
+            )
+            task_owners.append(tracker)
+    # a few tasks without a project, as created by the quick timer
+    for uid in user_ids:
+        task_rows.append(
+            (
+                task_id + len(task_rows),
+                None,
+                uid,
+                None,
+                None,
+                None,
+                "Untitled Task",
+                None,
+                None,
+                "in_progress",
+                _timestamp(start),
+                True,
+                0,
+            )
+        )
+        task_owners.append(uid)
+
+    notification_rows = []
+    for uid in user_ids:
+        for _ in range(rng.randint(0, 2 * notifications_per_user)):
+            notif_type = rng.choice(NOTIFICATION_TYPES)
+            notification_rows.append(
+                (
+                    uid,
+                    rng.choice(project_rows)[0] if notif_type == "progress" else None,
+                    f"Synthetic {notif_type} notification",
+                    _timestamp(start + timedelta(seconds=rng.randrange(days * 86400))),
+                    notif_type,
+                    rng.random() < 0.6,
+                )
+            )
+
+    cursor.execute("BEGIN")
+    try:
+        cursor.executemany(
+            "INSERT INTO users (user_id, username, email, password_hash, first_name,"
+            " last_name, created_at, last_active) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            user_rows,
+        )
+        cursor.executemany(
+            "INSERT INTO categories (category_id, name, user_id) VALUES (?, ?, ?)",
+            category_rows,
+        )
+        cursor.executemany(
+            "INSERT INTO teams (team_id, name, description, created_at)"
+            " VALUES (?, ?, ?, ?)",
+            team_rows,
+        )
+        cursor.executemany(
+            "INSERT INTO user_teams (user_id, team_id, role, joined_at)"
+            " VALUES (?, ?, ?, ?)",
+            membership_rows,
+        )
+        cursor.executemany(
+            "INSERT INTO projects (project_id, name, description, time_limit_hours,"
+            " current_hours, created_at, due_date, type, is_course, credit_points,"
+            " status, user_id, team_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            project_rows,
+        )
+        cursor.executemany(
+            "INSERT INTO tasks (task_id, project_id, user_id, admin_id, member_id,"
+            " category_id, title, description, due_date, status, created_at,"
+            " created_from_tracking, total_duration_seconds)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            task_rows,
+        )
+        cursor.executemany(
+            "INSERT INTO notifications (user_id, project_id, message, created_at,"
+            " type, is_read) VALUES (?, ?, ?, ?, ?, ?)",
+            notification_rows,
+        )
+
+        # maintaining the indexes row by row is slower than building them once
+        cursor.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index'"
+            " AND tbl_name = 'time_entries' AND sql IS NOT NULL"
+        )
+        indexes = cursor.fetchall()
+        for name, _ in indexes:
+            cursor.execute(f"DROP INDEX {name}")
+
+        # busy tasks get more sessions than others, weekends fewer than weekdays
+        task_weights = [rng.paretovariate(1.5) for _ in task_rows]
+        session_days = [start + timedelta(days=day) for day in range(days)]
+        day_weights = [1.0 if day.weekday() < 5 else 0.3 for day in session_days]
+        remaining = entries if task_rows else 0
+        while remaining:
+            chunk = min(remaining, ENTRY_CHUNK_SIZE)
+            remaining -= chunk
+            rows = []
+            for index, day in zip(
+                rng.choices(range(len(task_rows)), task_weights, k=chunk),
+                rng.choices(session_days, day_weights, k=chunk),
+            ):
+                began = day + timedelta(seconds=int(_session_hour(rng) * 3600))
+                seconds = _session_seconds(rng)
+                rows.append(
+                    (
+                        task_owners[index],
+                        task_rows[index][0],
+                        _timestamp(began),
+                        _timestamp(began + timedelta(seconds=seconds)),
+                        seconds,
+                    )
+                )
+            cursor.executemany(
+                "INSERT INTO time_entries (user_id, task_id, start_time, end_time,"
+                " duration_seconds) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+
+        for _, sql in indexes:
+            cursor.execute(sql)
+
+        cursor.execute(
+            "UPDATE tasks SET total_duration_seconds = (SELECT"
+            " COALESCE(SUM(duration_seconds), 0) FROM time_entries"
+            " WHERE time_entries.task_id = tasks.task_id) WHERE task_id >= ?",
+            (task_id,),
+        )
+        cursor.execute(
+            "UPDATE projects SET current_hours = ROUND((SELECT"
+            " COALESCE(SUM(total_duration_seconds), 0) FROM tasks"
+            " WHERE tasks.project_id = projects.project_id) / 3600.0, 3)"
+            " WHERE project_id >= ?",
+            (project_id,),
+        )
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    return {
+        "users": len(user_rows),
+        "teams": len(team_rows),
+        "memberships": len(membership_rows),
+        "categories": len(category_rows),
+        "projects": len(project_rows),
+        "tasks": len(task_rows),
+        "time_entries": entries if task_rows else 0,
+        "notifications": len(notification_rows),
+    }
@@ -0,0 +1,348 @@
+from flask import current_app
+from sqlalchemy import insert, inspect, literal, select
+
+from backend.database import (
+    DEFAULT_SHARD,
+    current_shard,
+    db,
+    set_request_shard,
+    shard_names,
+    sharding_enabled,
+    use_shard,
+)
+from backend.models import Team, TeamShard, User, UserShard
+
+# password hash of user copies, which no password matches
+UNUSABLE_PASSWORD = "!"
+
+
+def shard_for_user(user_id):
+    """Return the name of the shard that holds a user's data.
+
+    Assignments never change, so found entries are cached per app.
+
+    Args:
+        user_id (int): The unique ID of the user.
+
+    Returns:
+        str: The shard name, DEFAULT_SHARD for users without directory entry.
+    """
+    if not sharding_enabled():
+        return DEFAULT_SHARD
+    cache = current_app.extensions.setdefault("user_shards", {})
+    shard = cache.get(user_id)
+    if shard is None:
+        shard = db.session.scalar(
+            select(UserShard.shard).where(UserShard.user_id == user_id)
+        )
+        if shard is None:
+            return DEFAULT_SHARD
+        cache[user_id] = shard
+    return shard
+
+
+def route_to_user_shard(user_id=None, username=None, email=None):
+    """Route the rest of the request to the shard of the identified user.
+
+    For requests without a logged-in user that act on one, e.g. the login or
+    a password reset. Unknown users leave the request on the default shard.
+
+    Args:
+        user_id (int, optional): The unique ID of the user.
+        username (str, optional): The user's username.
+        email (str, optional): The user's email address.
+    """
+    if not sharding_enabled():
+        return
+    if user_id is not None:
+        set_request_shard(shard_for_user(user_id))
+        return
+    set_request_shard(find_user_shard(username, email) or DEFAULT_SHARD)
+
+
+def find_user_shard(username=None, email=None):
+    """Look up the shard of a user by username or email in the directory.
+
+    Args:
+        username (str, optional): The user's username.
+        email (str, optional): The user's email address.
+
+    Returns:
+        str|None: The shard name, None for users without directory entry.
+    """
+    criterion = UserShard.username == username if username else UserShard.email == email
+    return db.session.scalar(select(UserShard.shard).where(criterion))
+
+
+def directory_entry_exists(username, email):
+    """Check whether a username or email is taken on any shard.
+
+    Args:
+        username (str): The desired username.
+        email (str): The desired email address.
+
+    Returns:
+        bool: True if a user of any shard has the username or email.
+    """
+    return (
+        db.session.scalar(
+            select(UserShard.user_id).where(
+                (UserShard.username == username) | (UserShard.email == email)
+            )
+        )
+        is not None
+    )
+
+
+def assign_shard(username, email):
+    """Allocate a user id in the directory and choose the user's shard.
+
+    The shard is picked round-robin by user id over `shard_names()`. The entry
+    is flushed, the caller commits it together with the new user.
+
+    Args:
+        username (str): The new user's username.
+        email (str): The new user's email address.
+
+    Returns:
+        UserShard: The directory entry with `user_id` and `shard` set.
+    """
+    entry = UserShard(username=username, email=email, shard=DEFAULT_SHARD)
+    db.session.add(entry)
+    db.session.flush()
+    names = shard_names()
+    entry.shard = names[entry.user_id % len(names)]
+    return entry
+
+
+def update_directory_entry(user_id, username, email):
+    """Keep the directory in line with a changed username or email.
+
+    Args:
+        user_id (int): The unique ID of the user.
+        username (str): The user's current username.
+        email (str): The user's current email address.
+    """
+    if sharding_enabled():
+        UserShard.query.filter_by(user_id=user_id).update(
+            {"username": username, "email": email}
+        )
+
+
+def find_user_id(user_input):
+    """Resolve a user id or username to the id of an existing user.
+
+    With sharding, the users of all shards are found through the directory.
+
+    Args:
+        user_input (int|str): A user id or a username.
+
+    Returns:
+        int|None: The user id, None if no such user exists.
+    """
+    user_input = str(user_input).strip()
+    if sharding_enabled():
+        user_id, username = UserShard.user_id, UserShard.username
+    else:
+        user_id, username = User.user_id, User.username
+    if user_input.isdigit():
+        criterion = user_id == int(user_input)
+    else:
+        criterion = username == user_input
+    return db.session.scalar(select(user_id).where(criterion))
+
+
+def mirror_user(user_id):
+    """Copy a user of another shard into the shard the current work runs on.
+
+    Team memberships and task assignments refer to their users by foreign
+    key, so the shard of a team needs a row for each member. The copy gets
+    an unusable password; logins always run on the user's own shard.
+
+    Args:
+        user_id (int): The unique ID of the user.
+    """
+    shard = shard_for_user(user_id)
+    if shard == current_shard():
+        return
+    # a column select, the session may hold the user of the other shard
+    if db.session.scalar(select(User.user_id).where(User.user_id == user_id)):
+        return
+    with use_shard(shard):
+        user = (
+            db.session.execute(select(User.__table__).where(User.user_id == user_id))
+            .mappings()
+            .one()
+        )
+    db.session.execute(
+        insert(User.__table__).values({**user, "password_hash": UNUSABLE_PASSWORD})
+    )
+
+
+def update_user_mirrors(user):
+    """Carry changed user details over to the copies on other shards.
+
+    Args:
+        user (User): The user with the changed details.
+    """
+    if not sharding_enabled():
+        return
+    values = {
+        "username": user.username,
+        "email": user.email,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "profile_picture": user.profile_picture,
+    }
+    for shard in mirror_shards(user.user_id):
+        with use_shard(shard):
+            User.query.filter_by(user_id=user.user_id).update(
+                values, synchronize_session=False
+            )
+
+
+def delete_user_mirrors(user_id):
+    """Remove the copies of a deleted user from the other shards.
+
+    Memberships and task assignments there follow the ON DELETE rules.
+
+    Args:
+        user_id (int): The unique ID of the user.
+    """
+    for shard in mirror_shards(user_id):
+        with use_shard(shard):
+            # the session may hold the user of the own shard, leave it alone
+            User.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+
+
+def mirror_shards(user_id):
+    """Return the shards, besides the user's own, that hold a copy of a user.
+
+    Args:
+        user_id (int): The unique ID of the user.
+
+    Returns:
+        list[str]: The shard names.
+    """
+    if not sharding_enabled():
+        return []
+    home = shard_for_user(user_id)
+    shards = []
+    for shard in shard_names():
+        if shard == home:
+            continue
+        with use_shard(shard):
+            if db.session.scalar(select(User.user_id).where(User.user_id == user_id)):
+                shards.append(shard)
+    return shards
+
+
+def delete_directory_entry(user_id):
+    """Remove a deleted user from the directory.
+
+    Args:
+        user_id (int): The unique ID of the user.
+    """
+    if sharding_enabled():
+        UserShard.query.filter_by(user_id=user_id).delete()
+        current_app.extensions.get("user_shards", {}).pop(user_id, None)
+
+
+def shard_for_team(team_id):
+    """Return the name of the shard that holds a team's data.
+
+    Assignments never change, so found entries are cached per app.
+
+    Args:
+        team_id (int): The unique ID of the team.
+
+    Returns:
+        str: The shard name; the current shard for teams without directory
+            entry, which predate it and live with their creator's users.
+    """
+    if not sharding_enabled():
+        return current_shard()
+    cache = current_app.extensions.setdefault("team_shards", {})
+    shard = cache.get(team_id)
+    if shard is None:
+        shard = db.session.scalar(
+            select(TeamShard.shard).where(TeamShard.team_id == team_id)
+        )
+        if shard is None:
+            return current_shard()
+        cache[team_id] = shard
+    return shard
+
+
+def assign_team_shard():
+    """Allocate a team id in the directory for a team on the current shard.
+
+    The entry is flushed, the caller commits it together with the new team.
+
+    Returns:
+        TeamShard: The directory entry with `team_id` and `shard` set.
+    """
+    entry = TeamShard(shard=current_shard())
+    db.session.add(entry)
+    db.session.flush()
+    return entry
+
+
+def delete_team_directory_entry(team_id):
+    """Remove a deleted team from the directory.
+
+    Args:
+        team_id (int): The unique ID of the team.
+    """
+    if sharding_enabled():
+        TeamShard.query.filter_by(team_id=team_id).delete()
+        current_app.extensions.get("team_shards", {}).pop(team_id, None)
+
+
+def sync_user_directory(app):
+    """Add directory entries for users of the primary database that have none.
+
+    Run at startup, so the users registered before sharding was enabled stay
+    on the default shard and new user ids do not collide with theirs.
+
+    Args:
+        app (Flask): The Flask application instance.
+    """
+    with app.app_context():
+        if not inspect(db.engine).has_table(UserShard.__tablename__):
+            return
+        with db.engine.begin() as connection:
+            connection.execute(
+                insert(UserShard).from_select(
+                    ["user_id", "username", "email", "shard"],
+                    select(
+                        User.user_id, User.username, User.email, literal(DEFAULT_SHARD)
+                    ).where(User.user_id.not_in(select(UserShard.user_id))),
+                )
+            )
+
+
+def sync_team_directory(app):
+    """Add directory entries for the teams of all shards that have none.
+
+    Run at startup, so new team ids do not collide with those of the teams
+    created before the directory existed. The primary database goes first;
+    a team whose id is already taken by one of another shard keeps no entry
+    and is only found by the users of its own shard.
+
+    Args:
+        app (Flask): The Flask application instance.
+    """
+    with app.app_context():
+        if not inspect(db.engine).has_table(TeamShard.__tablename__):
+            return
+        for shard in shard_names(app):
+            with use_shard(shard):
+                team_ids = db.session.scalars(select(Team.team_id)).all()
+            known = set(db.session.scalars(select(TeamShard.team_id)))
+            db.session.add_all(
+                TeamShard(team_id=team_id, shard=shard)
+                for team_id in team_ids
+                if team_id not in known
+            )
+            db.session.commit()
@@ -0,0 +1,231 @@
+import os
+import signal
+import sqlite3
+import time
+from datetime import datetime
+from functools import wraps
+
+from flask import after_this_request, current_app
+
+from backend.database import ANALYTICS_BIND, read_only
+
+# set by the gunicorn master, the forked refresh process must not act on them
+MASTER_SIGNALS = (
+    "SIGHUP",
+    "SIGQUIT",
+    "SIGINT",
+    "SIGTERM",
+    "SIGTTIN",
+    "SIGTTOU",
+    "SIGUSR1",
+    "SIGUSR2",
+    "SIGWINCH",
+    "SIGCHLD",
+)
+
+
+def refresh_analytics_snapshot(
+    source_path, target_path, pages=1024, sleep=0.01, progress=None
+):
+    """Copy the live database into the analytics snapshot with SQLite's backup API.
+
+    The copy is read in one read transaction, i.e. one WAL snapshot of the
+    live database. Writers keep committing meanwhile, and their commits
+    neither show up in the copy nor restart it, which the backup API would
+    otherwise do after every commit, possibly forever on a busy database. It is
+    written to a temporary file in batches of `pages` pages with a pause in
+    between, to spread the I/O. The finished copy is switched to rollback
+    journal mode (so it can be opened read-only without WAL files) and
+    atomically replaces the previous snapshot. Its modification time is set
+    to the moment the copy started, which is how old the data in it can be
+    at most.
+
+    Args:
+        source_path (str): Path of the live database file (in WAL mode).
+        target_path (str): Path of the analytics snapshot file.
+        pages (int, optional): Pages copied per backup step.
+        sleep (float, optional): Seconds to pause between two steps.
+        progress (callable, optional): Called after every step with the
+            status, the remaining and the total number of pages.
+
+    Returns:
+        datetime: Time the copy started.
+    """
+    started_at = time.time()
+    # one temporary file per process, a cron run may overlap the server's job
+    tmp_path = f"{target_path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    source = sqlite3.connect(
+        f"file:{source_path}?mode=ro", uri=True, isolation_level=None
+    )
+    target = sqlite3.connect(tmp_path)
+    try:
+        # the backup steps reuse an open read transaction of the source
+        source.execute("BEGIN")
+        source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        source.backup(target, pages=pages, sleep=sleep, progress=progress)
+        target.execute("PRAGMA journal_mode=DELETE")
+    finally:
+        target.close()
+        source.close()
+
+    os.utime(tmp_path, (started_at, started_at))
+    os.replace(tmp_path, target_path)
+    return datetime.fromtimestamp(started_at)
+
+
+def get_snapshot_refreshed_at(target_path=None):
+    """Return when the data in the analytics snapshot was taken.
+
+    Args:
+        target_path (str, optional): Snapshot path, defaults to the configured one.
+
+    Returns:
+        datetime|None: Start time of the last refresh, or None without a snapshot.
+    """
+    target_path = target_path or current_app.config["ANALYTICS_SNAPSHOT_PATH"]
+    try:
+        return datetime.fromtimestamp(os.path.getmtime(target_path))
+    except OSError:
+        return None
+
+
+def refresh_configured_snapshot(app):
+    """Refresh the analytics snapshot of an app with its configured settings.
+
+    Args:
+        app (Flask): The Flask application instance.
+
+    Returns:
+        datetime: Time the copy started.
+    """
+    return refresh_analytics_snapshot(
+        app.config["DATABASE_PATH"],
+        app.config["ANALYTICS_SNAPSHOT_PATH"],
+        pages=app.config.get("ANALYTICS_SNAPSHOT_PAGES", 1024),
+        sleep=app.config.get("ANALYTICS_SNAPSHOT_SLEEP", 0.01),
+    )
+
+
+def _schema_version(path):
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        return connection.execute("PRAGMA schema_version").fetchone()[0]
+    finally:
+        connection.close()
+
+
+def discard_stale_snapshot(app):
+    """Delete the analytics snapshot if the live database schema changed since.
+
+    The backup copies SQLite's schema version along with the pages, so a
+    snapshot taken before a migration or a schema upgrade at startup has an
+    older one and may lack tables and views the current code queries.
+    Analytics reads fall back to the live database until the next refresh.
+
+    Args:
+        app (Flask): The Flask application instance.
+
+    Returns:
+        bool: True if a stale snapshot was deleted.
+    """
+    source_path = app.config["DATABASE_PATH"]
+    target_path = app.config["ANALYTICS_SNAPSHOT_PATH"]
+    if not (os.path.exists(source_path) and os.path.exists(target_path)):
+        return False
+    try:
+        stale = _schema_version(target_path) != _schema_version(source_path)
+    except sqlite3.DatabaseError:
+        stale = True
+    if stale:
+        os.remove(target_path)
+    return stale
+
+
+def _refresh_forever(app, interval):
+    for name in MASTER_SIGNALS:
+        signal.signal(getattr(signal, name), signal.SIG_DFL)
+    parent = os.getppid()
+    # ends with the master, also if it is killed
+    while os.getppid() == parent:
+        try:
+            refresh_configured_snapshot(app)
+        except Exception:
+            app.logger.exception("Refreshing the analytics snapshot failed")
+        time.sleep(interval)
+
+
+def start_snapshot_process(app):
+    """Fork a child process that refreshes the snapshot every interval.
+
+    Started by the gunicorn master (see `backend.serving`), so one copy is
+    taken per interval however many workers serve requests. It is a process
+    rather than a thread because the master keeps forking workers, and a
+    fork taken while a thread holds a lock (logging, sqlite3) deadlocks
+    the worker. Other setups refresh with `flask refresh-analytics-snapshot`
+    from cron. Does nothing in tests or when `ANALYTICS_SNAPSHOT_INTERVAL`
+    is 0.
+
+    Args:
+        app (Flask): The Flask application instance.
+
+    Returns:
+        int|None: Process id of the refresh process, if started.
+    """
+    interval = app.config.get("ANALYTICS_SNAPSHOT_INTERVAL", 0)
+    if app.testing or interval <= 0:
+        return None
+
+    pid = os.fork()
+    if pid == 0:
+        try:
+            _refresh_forever(app, interval)
+        finally:
+            os._exit(0)
+    return pid
+
+
+def stop_snapshot_process(pid):
+    """Stop a process started by `start_snapshot_process`.
+
+    Args:
+        pid (int|None): Its process id; None is ignored.
+    """
+    if pid is None:
+        return
+    try:
+        os.kill(pid, signal.SIGTERM)
+    except ProcessLookupError:
+        pass
+
+
+def analytics_snapshot(func):
+    """Run a view against the analytics snapshot instead of the live database.
+
+    The response gets an `X-Snapshot-Refreshed-At` header telling the client
+    how current the data is. Without a snapshot the view reads live data
+    from the read-only engine.
+
+    Args:
+        func (callable): The view function.
+
+    Returns:
+        callable: The wrapped view function.
+    """
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        refreshed_at = get_snapshot_refreshed_at()
+        if refreshed_at is not None:
+
+            @after_this_request
+            def add_staleness_header(response):
+                response.headers["X-Snapshot-Refreshed-At"] = refreshed_at.isoformat()
+                return response
+
+        with read_only(ANALYTICS_BIND):
+            return func(*args, **kwargs)
+
+    return wrapper
@@ -1,18 +1,24 @@
 from datetime import timedelta
 
 from flask_login import current_user
+from sqlalchemy import func, select
 
 from backend.database import db
 from backend.models.category import Category
 from backend.models.project import Project
 from backend.models.task import Task, TaskStatus
+from backend.models import TimeEntryHistory
 from backend.models.time_entry import TimeEntry
 from backend.services.notification_service import (
     notify_task_assigned,
     notify_task_unassigned,
     notify_task_deleted,
 )
-from backend.services.project_service import update_total_duration_for_project
+from backend.services.project_service import (
+    adjust_project_hours,
+    update_total_duration_for_project,
+)
+from backend.services.time_partition_service import delete_archived_time_entries
 
 
 def create_task(
@@ -171,10 +177,12 @@ def update_task(task_id, **kwargs):
 
     # clear time entries if unassigned
     if "member_id" in kwargs and old_member_id and new_member_id is None:
-        TimeEntry.query.filter_by(task_id=task_id).delete()
+        removed_seconds = task.total_duration_seconds or 0
+        TimeEntry.query.filter_by(task_id=task_id).delete(synchronize_session="fetch")
+        delete_archived_time_entries(task_id)
         task.total_duration_seconds = 0
         if task.project_id:
-            update_total_duration_for_project(task.project_id)
+            adjust_project_hours(task.project_id, -removed_seconds)
 
     db.session.commit()
 
@@ -294,7 +302,7 @@ def get_tasks_without_time_entries(user_id):
     Returns:
         list[Task]: A list of Task objects.
     """
-    subquery = db.session.query(TimeEntry.task_id).distinct()
+    subquery = db.session.query(TimeEntryHistory.task_id).distinct()
 
     return Task.query.filter(
         ~Task.task_id.in_(subquery),
@@ -344,8 +352,11 @@ def update_total_duration_for_task(task_id):
     if not task:
         return {"error": "Task not found"}
 
-    total_seconds = sum(
-        entry.duration_seconds or 0 for entry in task.time_entries or []
+    total_seconds = (
+        db.session.query(func.sum(TimeEntryHistory.duration_seconds))
+        .filter(TimeEntryHistory.task_id == task_id)
+        .scalar()
+        or 0
     )
     task.total_duration_seconds = total_seconds
     db.session.commit()
@@ -360,32 +371,66 @@ def update_total_duration_for_task(task_id):
 
 def unassign_tasks_for_user_in_team(user_id, team_id):
     """
-    Unassigns all tasks in the team project that are currently assigned to the specified user.
+    Unassigns all tasks in the team's projects that are currently assigned to the specified user.
+
+    Runs two set-based UPDATE statements instead of loading and flushing every task.
 
     Args:
         user_id (int): ID of the user being removed.
-        team_id (int): ID of the team whose team project is affected.
+        team_id (int): ID of the team whose team projects are affected.
     """
-    team_project = Project.query.filter_by(team_id=team_id).first()
-    if not team_project:
-        return
+    team_project_ids = select(Project.project_id).where(Project.team_id == team_id)
 
-    tasks_as_member = Task.query.filter_by(
-        project_id=team_project.project_id, member_id=user_id
-    ).all()
-    for task in tasks_as_member:
-        task.member_id = None
+    Task.query.filter(
+        Task.project_id.in_(team_project_ids), Task.member_id == user_id
+    ).update({Task.member_id: None}, synchronize_session="fetch")
 
     # Also unassign tasks where user is mistakenly stored as owner (user_id)
-    tasks_as_owner = Task.query.filter_by(
-        project_id=team_project.project_id, user_id=user_id
-    ).all()
-    for task in tasks_as_owner:
-        task.user_id = None
+    Task.query.filter(
+        Task.project_id.in_(team_project_ids), Task.user_id == user_id
+    ).update({Task.user_id: None}, synchronize_session="fetch")
 
     db.session.commit()
 
 
+def subtract_time_entries_of_user(user_id):
+    """
+    Subtract the tracked time of a user from the task and project totals.
+
+    Used before the user is deleted: ON DELETE CASCADE removes the time
+    entries (archived ones included) but leaves the denormalised totals of
+    the tasks and projects that survive. The caller is responsible for committing.
+
+    Args:
+        user_id (int): ID of the user being deleted.
+    """
+    durations = (
+        db.session.query(
+            Task.task_id,
+            Task.project_id,
+            func.sum(TimeEntryHistory.duration_seconds),
+        )
+        .join(TimeEntryHistory, TimeEntryHistory.task_id == Task.task_id)
+        .filter(TimeEntryHistory.user_id == user_id)
+        .group_by(Task.task_id, Task.project_id)
+        .all()
+    )
+
+    for task_id, project_id, seconds in durations:
+        if not seconds:
+            continue
+        Task.query.filter(Task.task_id == task_id).update(
+            {
+                Task.total_duration_seconds: func.max(
+                    func.coalesce(Task.total_duration_seconds, 0) - seconds, 0
+                )
+            },
+            synchronize_session="fetch",
+        )
+        if project_id:
+            adjust_project_hours(project_id, -seconds)
+
+
 def is_user_authorized_for_task(task, user_id):
     """
     Check if the user is allowed to track time for this task.
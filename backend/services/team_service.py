@@ -1,14 +1,52 @@
-from backend.database import db
+from collections import defaultdict
+from datetime import datetime
+
+from sqlalchemy import select
+
+from backend.database import current_shard, db, shard_names, sharding_enabled, use_shard
 from backend.models.notification import Notification
 from backend.models.project import Project
 from backend.models.task import Task
 from backend.models.team import Team
+from backend.models.time_entry import TimeEntry
+from backend.models.user import User
 from backend.models.user_team import UserTeam
+from backend.services.project_service import load_projects_with_totals
+from backend.services.shard_service import (
+    assign_team_shard,
+    delete_team_directory_entry,
+)
 from backend.services.task_service import unassign_tasks_for_user_in_team
 
 
+def get_team_shards(user_id):
+    """Returns the shards that hold teams the user is a member of.
+
+    Teams live on the shard of the user who created them, so the members
+    from other shards find their teams there.
+
+    Args:
+        user_id (int): ID of the user.
+
+    Returns:
+        list: Shard names; only the current shard without sharding.
+    """
+    if not sharding_enabled():
+        return [current_shard()]
+
+    shards = []
+    for shard in shard_names():
+        with use_shard(shard):
+            membership = db.session.scalar(
+                select(UserTeam.team_id).where(UserTeam.user_id == user_id).limit(1)
+            )
+            if membership is not None:
+                shards.append(shard)
+    return shards
+
+
 def get_user_teams(user_id):
-    """Fetches all teams a user belongs to.
+    """Fetches all teams a user belongs to, on all shards.
 
     Args:
         user_id (int): ID of the user.
@@ -16,23 +54,24 @@ def get_user_teams(user_id):
     Returns:
         list: List of team dictionaries with ID, name, role, and creation date.
     """
-    user_teams = (
-        db.session.query(UserTeam)
-        .filter_by(user_id=user_id)
-        .join(Team)
-        .order_by(Team.created_at.desc())  # Most recently created teams first
-        .all()
-    )
-
-    return [
-        {
-            "team_id": ut.team.team_id,
-            "team_name": ut.team.name,
-            "role": ut.role,
-            "created_at": ut.team.created_at.isoformat(),
-        }
-        for ut in user_teams
-    ]
+    teams = []
+    for shard in get_team_shards(user_id):
+        with use_shard(shard):
+            user_teams = (
+                db.session.query(UserTeam).filter_by(user_id=user_id).join(Team).all()
+            )
+            teams.extend(
+                {
+                    "team_id": ut.team.team_id,
+                    "team_name": ut.team.name,
+                    "role": ut.role,
+                    "created_at": ut.team.created_at.isoformat(),
+                }
+                for ut in user_teams
+            )
+
+    # Most recently created teams first
+    return sorted(teams, key=lambda team: team["created_at"], reverse=True)
 
 
 def create_new_team(name, user_id):
@@ -48,6 +87,9 @@ def create_new_team(name, user_id):
     new_team = Team(
         name=name.strip()
     )  # Trim whitespace to prevent duplicate-looking teams
+    if sharding_enabled():
+        # the directory allocates the id, the team stays on the current shard
+        new_team.team_id = assign_team_shard().team_id
     db.session.add(new_team)
     db.session.commit()
 
@@ -134,50 +176,163 @@ def get_team_members(team_id):
 def delete_team_and_related(team_id):
     """Deletes a team, its members, projects, and related tasks.
 
+    Each table is cleaned up with one set-based DELETE (or UPDATE for
+    notifications) instead of one statement per project. The deletes fetch
+    the removed keys (RETURNING), so objects of the team that are loaded in
+    the session are marked deleted like with `session.delete`.
+
     Args:
         team_id (int): ID of the team.
 
     Returns:
         bool: True if deleted, False if not found.
     """
-    projects = Project.query.filter_by(team_id=team_id).all()
-    for project in projects:
-        # remove tasks before deleting project and team members
-        Task.query.filter_by(project_id=project.project_id).delete()
-
-    Project.query.filter_by(team_id=team_id).delete()
+    # load the team and its few projects (refreshing expired instances), so
+    # the objects callers hold keep their attributes once deleted
+    if db.session.get(Team, team_id) is None:
+        return False
+    Project.query.filter(Project.team_id == team_id).all()
+
+    project_ids = select(Project.project_id).where(Project.team_id == team_id)
+    task_ids = select(Task.task_id).where(Task.project_id.in_(project_ids))
+
+    # remove time entries and tasks before deleting projects and team members
+    TimeEntry.query.filter(TimeEntry.task_id.in_(task_ids)).delete(
+        synchronize_session="fetch"
+    )
+    Task.query.filter(Task.project_id.in_(project_ids)).delete(
+        synchronize_session="fetch"
+    )
+    Notification.query.filter(Notification.project_id.in_(project_ids)).update(
+        {Notification.project_id: None}, synchronize_session=False
+    )
+    Project.query.filter(Project.team_id == team_id).delete(synchronize_session="fetch")
+    UserTeam.query.filter(UserTeam.team_id == team_id).delete(
+        synchronize_session="fetch"
+    )
+    Team.query.filter(Team.team_id == team_id).delete(synchronize_session="fetch")
+    delete_team_directory_entry(team_id)
 
-    UserTeam.query.filter_by(team_id=team_id).delete()
-    team = Team.query.get(team_id)
-    if team:
-        db.session.delete(team)
-        db.session.commit()
-        return True
-    return False
+    db.session.commit()
+    return True
 
 
-def get_teams(user_id):
+def get_team_overview(user_id):
     """
-    Retrieve all teams a user is in, along with their projects.
+    Load all teams of a user with members and projects in a fixed number of queries.
+
+    One query fetches the teams together with the user's role, one fetches the
+    memberships with user summaries, and one fetches the projects with their
+    task totals, independent of how many teams or members there are. With
+    sharding, that is done on every shard that holds teams of the user.
 
     Args:
         user_id (int): ID of the user.
 
     Returns:
-        list: List of dicts containing team and project information.
+        list: List of dicts with keys 'team' (Team), 'role' (str),
+            'members' (list of dict) and 'projects' (list of Project).
     """
-    user_teams = db.session.query(UserTeam).filter_by(user_id=user_id).join(Team).all()
+    shards = get_team_shards(user_id)
+    if len(shards) == 1:
+        with use_shard(shards[0]):
+            return _load_team_overview(user_id)
+
+    overview = []
+    for shard in shards:
+        with use_shard(shard):
+            entries = _load_team_overview(user_id)
+        # projects of different shards can share an id, so they must not
+        # stay in the session's identity map together
+        for entry in entries:
+            for instance in (entry["team"], *entry["projects"]):
+                db.session.expunge(instance)
+        overview.extend(entries)
+
+    return sorted(
+        overview,
+        key=lambda entry: (
+            entry["team"].created_at or datetime.min,
+            entry["team"].team_id,
+        ),
+        reverse=True,
+    )
+
 
-    result = []
-    for ut in user_teams:
-        team = ut.team
-        projects = Project.query.filter_by(team_id=team.team_id).all()
-        result.append(
+def _load_team_overview(user_id):
+    """Load the teams of a user on the current shard, see `get_team_overview`."""
+    team_rows = (
+        db.session.query(Team, UserTeam.role)
+        .join(UserTeam, UserTeam.team_id == Team.team_id)
+        .filter(UserTeam.user_id == user_id)
+        .order_by(Team.created_at.desc(), Team.team_id.desc())
+        .all()
+    )
+    if not team_rows:
+        return []
+
+    team_ids = [team.team_id for team, _ in team_rows]
+
+    members = defaultdict(list)
+    member_rows = (
+        db.session.query(
+            UserTeam.team_id,
+            UserTeam.role,
+            User.user_id,
+            User.username,
+            User.first_name,
+            User.last_name,
+        )
+        .join(User, User.user_id == UserTeam.user_id)
+        .filter(UserTeam.team_id.in_(team_ids))
+        .order_by(UserTeam.joined_at, User.user_id)
+        .all()
+    )
+    for team_id, role, member_id, username, first_name, last_name in member_rows:
+        members[team_id].append(
             {
-                "team_id": team.team_id,
-                "team_name": team.name,
-                "role": ut.role,
-                "projects": projects,
+                "user_id": member_id,
+                "username": username,
+                "first_name": first_name,
+                "last_name": last_name,
+                "role": role,
             }
         )
-    return result
+
+    projects = defaultdict(list)
+    project_query = Project.query.filter(Project.team_id.in_(team_ids)).order_by(
+        Project.project_id
+    )
+    for project in load_projects_with_totals(project_query):
+        projects[project.team_id].append(project)
+
+    return [
+        {
+            "team": team,
+            "role": role,
+            "members": members[team.team_id],
+            "projects": projects[team.team_id],
+        }
+        for team, role in team_rows
+    ]
+
+
+def get_teams(user_id):
+    """
+    Retrieve all teams a user is in, along with their projects.
+
+    Args:
+        user_id (int): ID of the user.
+
+    Returns:
+        list: List of dicts containing team and project information.
+    """
+    return [
+        {
+            "team_id": entry["team"].team_id,
+            "team_name": entry["team"].name,
+            "role": entry["role"],
+            "projects": entry["projects"],
+        }
+        for entry in get_team_overview(user_id)
+    ]
@@ -1,14 +1,18 @@
 from datetime import datetime
 from sqlalchemy import func
 
-from backend.database import db
+from backend.database import db, retry_on_busy
 from backend.models.task import Task
+from backend.models import TimeEntryHistory
 from backend.models.time_entry import TimeEntry
 from backend.models.project import Project
 from backend.services.project_service import update_total_duration_for_project
 from backend.services.task_service import update_total_duration_for_task
+from backend.services.time_partition_service import thaw_time_entry
+from backend.tracing import traced
 
 
+@traced()
 def create_time_entry(
     user_id,
     task_id,
@@ -63,6 +67,7 @@ def create_time_entry(
     }
 
 
+@traced()
 def update_time_entry(time_entry_id, **kwargs):
     """
     Update a time entry with provided fields.
@@ -74,7 +79,7 @@ def update_time_entry(time_entry_id, **kwargs):
     Returns:
         dict: Success message or error.
     """
-    entry = TimeEntry.query.get(time_entry_id)
+    entry = thaw_time_entry(time_entry_id)
     if not entry:
         return {"error": "Time entry not found"}
 
@@ -102,6 +107,7 @@ def update_time_entry(time_entry_id, **kwargs):
     }
 
 
+@traced()
 def delete_time_entry(time_entry_id):
     """
     Delete a time entry by its ID.
@@ -112,7 +118,7 @@ def delete_time_entry(time_entry_id):
     Returns:
         dict: Success message or error.
     """
-    entry = TimeEntry.query.get(time_entry_id)
+    entry = thaw_time_entry(time_entry_id)
     if not entry:
         return {"error": "Time entry not found"}
 
@@ -124,7 +130,10 @@ def delete_time_entry(time_entry_id):
     if (
         related_task
         and related_task.created_from_tracking
-        and not related_task.time_entries
+        and db.session.query(TimeEntryHistory)
+        .filter_by(task_id=related_task.task_id)
+        .first()
+        is None
     ):
         db.session.delete(related_task)
         db.session.commit()
@@ -132,6 +141,7 @@ def delete_time_entry(time_entry_id):
     return {"success": True, "message": "Time entry deleted successfully"}
 
 
+@traced()
 def get_time_entry_by_id(time_entry_id):
     """
     Retrieve a time entry by its ID.
@@ -142,9 +152,14 @@ def get_time_entry_by_id(time_entry_id):
     Returns:
         TimeEntry or None: The corresponding entry or None.
     """
-    return TimeEntry.query.get(time_entry_id)
+    return (
+        db.session.query(TimeEntryHistory)
+        .filter_by(time_entry_id=time_entry_id)
+        .first()
+    )
 
 
+@traced()
 def get_time_entries_by_task(task_id):
     """
     Retrieve all time entries assigned to a specific task.
@@ -155,9 +170,10 @@ def get_time_entries_by_task(task_id):
     Returns:
         list[TimeEntry]: List of all associated time entries.
     """
-    return TimeEntry.query.filter_by(task_id=task_id).all()
+    return db.session.query(TimeEntryHistory).filter_by(task_id=task_id).all()
 
 
+@traced()
 def get_latest_time_entries_for_user(user_id, limit=10):
     """
     Retrieve latest tasks (based on recent time entries) with total duration per task
@@ -175,13 +191,15 @@ def get_latest_time_entries_for_user(user_id, limit=10):
             Task.task_id,
             Task.title,
             Project.name.label("project_name"),
-            func.sum(TimeEntry.duration_seconds).label("total_duration_seconds")
+            func.sum(TimeEntryHistory.duration_seconds).label("total_duration_seconds")
         )
-        .join(TimeEntry, TimeEntry.task_id == Task.task_id)
+        .join(TimeEntryHistory, TimeEntryHistory.task_id == Task.task_id)
         .outerjoin(Project, Task.project_id == Project.project_id)  # <–– Projekt dazunehmen
-        .filter(TimeEntry.user_id == user_id, TimeEntry.end_time.isnot(None))
+        .filter(
+            TimeEntryHistory.user_id == user_id, TimeEntryHistory.end_time.isnot(None)
+        )
         .group_by(Task.task_id, Task.title, Project.name)
-        .order_by(func.max(TimeEntry.end_time).desc())
+        .order_by(func.max(TimeEntryHistory.end_time).desc())
         .limit(limit)
         .all()
     )
@@ -198,6 +216,7 @@ def get_latest_time_entries_for_user(user_id, limit=10):
 
     return result
 
+@traced()
 def get_latest_project_time_entry_for_user(user_id):
     """
     Get the latest time entry for the user where the associated task is linked to a project.
@@ -209,14 +228,19 @@ def get_latest_project_time_entry_for_user(user_id):
         dict or None: Dictionary containing time_entry, task, and project, or None if not found.
     """
 
-    entry = (
-        TimeEntry.query.join(TimeEntry.task)
-        .filter(TimeEntry.user_id == user_id)
-        .filter(TimeEntry.end_time.isnot(None))
-        .filter(Task.project_id.isnot(None))
-        .order_by(TimeEntry.start_time.desc())
-        .first()
-    )
+    # usually found in the hot tier, the history is only searched otherwise
+    for model in (TimeEntry, TimeEntryHistory):
+        entry = (
+            db.session.query(model)
+            .join(model.task)
+            .filter(model.user_id == user_id)
+            .filter(model.end_time.isnot(None))
+            .filter(Task.project_id.isnot(None))
+            .order_by(model.start_time.desc())
+            .first()
+        )
+        if entry:
+            break
 
     if not entry:
         return None
@@ -231,6 +255,8 @@ def get_latest_project_time_entry_for_user(user_id):
     }
 
 
+@traced()
+@retry_on_busy
 def start_time_entry(user_id, task_id, comment=None):
     """
     Start a time entry for a task, marking the current time as start.
@@ -270,6 +296,8 @@ def start_time_entry(user_id, task_id, comment=None):
     }
 
 
+@traced()
+@retry_on_busy
 def stop_time_entry(time_entry_id):
     """
     Stop an active time entry and calculate its duration.
@@ -301,6 +329,8 @@ def stop_time_entry(time_entry_id):
     }
 
 
+@traced()
+@retry_on_busy
 def pause_time_entry(time_entry_id):
     """
     Pause a time entry by calculating current duration and clearing start_time to indicate it is paused.
@@ -333,6 +363,8 @@ def pause_time_entry(time_entry_id):
     }
 
 
+@traced()
+@retry_on_busy
 def resume_time_entry(time_entry_id):
     """
     Resume a paused time entry by setting a new start_time.
@@ -360,6 +392,7 @@ def resume_time_entry(time_entry_id):
     }
 
 
+@traced()
 def update_durations_for_task_and_project(task_id):
     """
     Recalculate and update the duration values for a task and its associated project (if any).
@@ -0,0 +1,360 @@
+import re
+from contextlib import contextmanager
+from datetime import datetime
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    MetaData,
+    PrimaryKeyConstraint,
+    String,
+    Table,
+    delete,
+    func,
+    insert,
+    inspect,
+    select,
+    text,
+)
+
+from backend.database import DEFAULT_SHARD, db, rebuild_table
+from backend.models.task import Task
+from backend.models.time_entry import HISTORY_VIEW, TimeEntry, history_view_ddl
+
+PARTITION_PREFIX = "time_entries_"
+PARTITION_PATTERN = re.compile(rf"^{PARTITION_PREFIX}(\d{{4}})_(\d{{2}})$")
+
+_partition_metadata = MetaData()
+# the referenced keys, partitions are kept out of db.metadata and create_all()
+Table("users", _partition_metadata, Column("user_id", Integer, primary_key=True))
+Table("tasks", _partition_metadata, Column("task_id", Integer, primary_key=True))
+
+
+def partition_name(month):
+    """Return the name of the partition table of a month, e.g. `time_entries_2025_03`.
+
+    Args:
+        month (datetime): Any point in time within the month.
+
+    Returns:
+        str: The table name.
+    """
+    return f"{PARTITION_PREFIX}{month.year:04d}_{month.month:02d}"
+
+
+def add_months(month, months):
+    """Return the first moment of the month `months` after (or before) `month`.
+
+    Args:
+        month (datetime): Any point in time within the start month.
+        months (int): Number of months to move, negative to go back.
+
+    Returns:
+        datetime: Midnight on the first day of the resulting month.
+    """
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def hot_tier_start(now, hot_months=2):
+    """Return the start of the oldest month that stays in the hot tier.
+
+    Args:
+        now (datetime): The current time.
+        hot_months (int): Months kept hot, including the current one.
+
+    Returns:
+        datetime: Entries that ended before this are archived.
+    """
+    return add_months(now, 1 - max(hot_months, 1))
+
+
+def partition_table(name):
+    """Return the table of a month partition.
+
+    Partitions only hold finished entries. They are WITHOUT ROWID tables
+    clustered by user and end time, so the history of one user is read from a
+    few adjacent pages.
+
+    Args:
+        name (str): The partition name, see `partition_name`.
+
+    Returns:
+        Table: The partition table.
+    """
+    table = _partition_metadata.tables.get(name)
+    if table is None:
+        table = Table(
+            name,
+            _partition_metadata,
+            Column("time_entry_id", Integer, nullable=False),
+            Column(
+                "user_id",
+                Integer,
+                ForeignKey("users.user_id", ondelete="CASCADE"),
+                nullable=False,
+            ),
+            Column(
+                "task_id",
+                Integer,
+                ForeignKey("tasks.task_id", ondelete="CASCADE"),
+                nullable=False,
+                index=True,
+            ),
+            Column("start_time", DateTime, nullable=True),
+            Column("end_time", DateTime, nullable=False),
+            Column("duration_seconds", Integer, nullable=True),
+            Column("comment", String, nullable=True),
+            PrimaryKeyConstraint("user_id", "end_time", "time_entry_id"),
+            Index(f"ix_{name}_time_entry_id", "time_entry_id", unique=True),
+            sqlite_with_rowid=False,
+        )
+    return table
+
+
+def list_partitions(connection):
+    """Return the names of the month partitions of a database, oldest first.
+
+    Args:
+        connection (Connection): A connection to the database.
+
+    Returns:
+        list[str]: The partition table names.
+    """
+    names = connection.scalars(
+        text(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE :prefix"
+        ),
+        {"prefix": PARTITION_PREFIX + "%"},
+    )
+    return sorted(name for name in names if PARTITION_PATTERN.match(name))
+
+
+def rebuild_history_view(connection, partitions):
+    """Recreate the history view over the hot table and the given partitions.
+
+    Args:
+        connection (Connection): A connection inside the compaction transaction.
+        partitions (list[str]): The partition table names.
+    """
+    connection.exec_driver_sql(f"DROP VIEW IF EXISTS {HISTORY_VIEW}")
+    connection.exec_driver_sql(history_view_ddl(partitions))
+
+
+@contextmanager
+def _immediate_transaction(engine):
+    # pysqlite would only open the transaction before the first INSERT and run
+    # the DDL in front of it outside, so take the write lock explicitly
+    with engine.connect() as connection:
+        connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.exec_driver_sql("ROLLBACK")
+            raise
+        connection.exec_driver_sql("COMMIT")
+
+
+def _has_autoincrement(connection):
+    sql = connection.scalar(
+        text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": TimeEntry.__tablename__},
+    )
+    return "AUTOINCREMENT" in (sql or "").upper()
+
+
+def _rebuild_with_autoincrement(connection):
+    # without AUTOINCREMENT SQLite reuses the ids above the largest one left
+    # in the table, which may belong to archived entries
+    connection.exec_driver_sql(f"DROP VIEW IF EXISTS {HISTORY_VIEW}")
+    rebuild_table(connection, TimeEntry.__table__)
+
+
+def compact_time_entries(engine, now=None, hot_months=2):
+    """Move the time entries that ended before the hot tier into month partitions.
+
+    Every month is moved in its own transaction, which also adds a newly
+    created partition to the history view, so readers never miss an entry
+    and the write lock is only held for one month at a time. Running and
+    paused entries always stay in the hot table. Partitions of months that
+    were compacted before receive the entries that were thawed or backdated
+    since. The first run converts the hot table to AUTOINCREMENT if it was
+    created without.
+
+    Args:
+        engine (Engine): The engine of the database (or shard) to compact.
+        now (datetime, optional): The current time, for tests.
+        hot_months (int): Months kept hot, including the current one.
+
+    Returns:
+        dict: Partition name -> number of entries moved into it.
+    """
+    hot = TimeEntry.__table__
+    cutoff = hot_tier_start(now or datetime.now(), hot_months)
+
+    with _immediate_transaction(engine) as connection:
+        if not _has_autoincrement(connection):
+            _rebuild_with_autoincrement(connection)
+            rebuild_history_view(connection, list_partitions(connection))
+
+    moved = {}
+    while True:
+        with _immediate_transaction(engine) as connection:
+            oldest = connection.scalar(
+                select(func.min(hot.c.end_time)).where(hot.c.end_time < cutoff)
+            )
+            if oldest is None:
+                break
+            month = add_months(oldest, 0)
+            in_month = (hot.c.end_time >= month) & (
+                hot.c.end_time < add_months(month, 1)
+            )
+            name = partition_name(month)
+            partition = partition_table(name)
+
+            partitions = list_partitions(connection)
+            if name not in partitions:
+                partition.create(connection)
+                rebuild_history_view(connection, sorted([*partitions, name]))
+            moved[name] = connection.execute(
+                insert(partition).from_select(
+                    [column.name for column in hot.columns],
+                    select(*hot.columns)
+                    .where(in_month)
+                    .order_by(hot.c.user_id, hot.c.end_time, hot.c.time_entry_id),
+                )
+            ).rowcount
+            connection.execute(delete(hot).where(in_month))
+    return moved
+
+
+def _engines(app):
+    with app.app_context():
+        engines = {DEFAULT_SHARD: db.engine}
+    engines.update(app.extensions.get("shard_engines", {}))
+    return engines
+
+
+def compact_all_time_entries(app):
+    """Compact the time entries of the primary database and of every shard.
+
+    Args:
+        app (Flask): The Flask application instance.
+
+    Returns:
+        dict: Database (DEFAULT_SHARD or shard name) -> result of
+            `compact_time_entries`.
+    """
+    hot_months = app.config.get("TIME_ENTRY_HOT_MONTHS", 2)
+    return {
+        name: compact_time_entries(engine, hot_months=hot_months)
+        for name, engine in _engines(app).items()
+    }
+
+
+def ensure_history_views(app):
+    """Create the history view in databases whose time entry table predates it.
+
+    Args:
+        app (Flask): The Flask application instance.
+    """
+    for engine in _engines(app).values():
+        with engine.begin() as connection:
+            if inspect(connection).has_table(TimeEntry.__tablename__):
+                connection.exec_driver_sql(
+                    history_view_ddl(list_partitions(connection))
+                )
+
+
+def thaw_time_entry(time_entry_id):
+    """Load a time entry for a change, moving it back to the hot tier if archived.
+
+    The entry stays hot until the next compaction, which archives it again
+    if it still ended before the hot tier. The move is part of the session's
+    transaction and committed with the change.
+
+    Args:
+        time_entry_id (int): ID of the time entry.
+
+    Returns:
+        TimeEntry or None: The entry, or None if it exists in neither tier.
+    """
+    hot = TimeEntry.__table__
+    is_hot = db.session.scalar(
+        select(hot.c.time_entry_id).where(hot.c.time_entry_id == time_entry_id)
+    )
+    if is_hot is None:
+        connection = db.session.connection()
+        for name in reversed(list_partitions(connection)):
+            partition = partition_table(name)
+            moved = db.session.execute(
+                insert(hot).from_select(
+                    [column.name for column in hot.columns],
+                    select(*partition.columns).where(
+                        partition.c.time_entry_id == time_entry_id
+                    ),
+                )
+            ).rowcount
+            if moved:
+                db.session.execute(
+                    delete(partition).where(partition.c.time_entry_id == time_entry_id)
+                )
+                break
+    return db.session.get(TimeEntry, time_entry_id)
+
+
+def delete_archived_time_entries(task_id):
+    """Delete the archived time entries of a task, in the session's transaction.
+
+    Deleting the task itself needs no call, the partitions cascade like the
+    hot table.
+
+    Args:
+        task_id (int): ID of the task.
+
+    Returns:
+        int: Number of deleted entries.
+    """
+    deleted = 0
+    for name in list_partitions(db.session.connection()):
+        partition = partition_table(name)
+        deleted += db.session.execute(
+            delete(partition).where(partition.c.task_id == task_id)
+        ).rowcount
+    return deleted
+
+
+def delete_archived_project_time_entries(project_id, limit):
+    """Delete up to `limit` archived time entries of a project's tasks.
+
+    For deleting a large project in bounded transactions (see
+    `project_service.purge_project`), the cascade would remove all archived
+    entries together with the first chunk of tasks. Runs in the session's
+    transaction.
+
+    Args:
+        project_id (int): ID of the project.
+        limit (int): Maximum number of entries to delete.
+
+    Returns:
+        int: Number of deleted entries.
+    """
+    tasks = select(Task.task_id).where(Task.project_id == project_id)
+    deleted = 0
+    for name in list_partitions(db.session.connection()):
+        if deleted >= limit:
+            break
+        partition = partition_table(name)
+        chunk = (
+            select(partition.c.time_entry_id)
+            .where(partition.c.task_id.in_(tasks))
+            .limit(limit - deleted)
+        )
+        deleted += db.session.execute(
+            delete(partition).where(partition.c.time_entry_id.in_(chunk))
+        ).rowcount
+    return deleted
@@ -6,10 +6,21 @@ from werkzeug.security import check_password_hash
 from werkzeug.security import generate_password_hash
 from werkzeug.utils import secure_filename
 
-from backend.database import db
+from backend.database import db, sharding_enabled, use_shard
 from backend.models import User
 from backend.services.mail_service import send_forgot_password
 from backend.services.profile_picture_service import create_profile_picture
+from backend.services.project_service import release_projects_of_user
+from backend.services.shard_service import (
+    assign_shard,
+    delete_directory_entry,
+    delete_user_mirrors,
+    directory_entry_exists,
+    route_to_user_shard,
+    update_directory_entry,
+    update_user_mirrors,
+)
+from backend.services.task_service import subtract_time_entries_of_user
 from backend.services.token_service import generate_reset_token
 
 
@@ -33,7 +44,9 @@ def register_user(
         (User.username == username) | (User.email == email)
     ).first()
 
-    if existing_user:
+    if existing_user or (
+        sharding_enabled() and directory_entry_exists(username, email)
+    ):
         return {"error": "Username or e-mail already exists."}
 
     hashed_pw = generate_password_hash(password)
@@ -59,8 +72,16 @@ def register_user(
         profile_picture=profile_picture_path,  # optional
     )
 
-    db.session.add(new_user)
-    db.session.commit()
+    if sharding_enabled():
+        # the directory allocates the id, the user row goes to the user's shard
+        entry = assign_shard(username, email)
+        new_user.user_id = entry.user_id
+        with use_shard(entry.shard):
+            db.session.add(new_user)
+            db.session.commit()
+    else:
+        db.session.add(new_user)
+        db.session.commit()
 
     return {"success": True, "message": "User registered successfully"}
 
@@ -75,6 +96,7 @@ def login_user(username, password):
     Returns:
         dict: Success and user object if login is successful, else an error message.
     """
+    route_to_user_shard(username=username)
     user = User.query.filter_by(username=username).first()
 
     if user and check_password_hash(user.password_hash, password):
@@ -93,6 +115,7 @@ def new_password(user_id, password):
     Returns:
         dict: Success if password changed, else an error.
     """
+    route_to_user_shard(user_id=user_id)
     user = User.query.filter_by(user_id=user_id).first()
     if user:
         user.password_hash = generate_password_hash(password)
@@ -111,6 +134,7 @@ def password_forget(email):
     Returns:
         dict: Success if reset email is sent, else an error.
     """
+    route_to_user_shard(email=email)
     user = User.query.filter_by(email=email).first()
     if not user:
         return {"error": "E-Mail not found"}
@@ -134,7 +158,13 @@ def delete_user(user_id):
     user = User.query.filter_by(user_id=user_id).first()
     if not user:
         return {"error": "User not found."}
+    release_projects_of_user(user_id)
+    subtract_time_entries_of_user(user_id)
+    # a loaded collection would detach the handed over projects again
+    db.session.expire(user, ["project"])
     db.session.delete(user)
+    delete_user_mirrors(user_id)
+    delete_directory_entry(user_id)
     db.session.commit()
     return {"success": True, "message": "User deleted successfully"}
 
@@ -172,6 +202,10 @@ def edit_user(
     if last_name and last_name != existing_user.last_name:
         existing_user.last_name = last_name
 
+    update_directory_entry(
+        user_id, username=existing_user.username, email=existing_user.email
+    )
+
     if password:
         existing_user.password_hash = generate_password_hash(password)
 
@@ -179,6 +213,7 @@ def edit_user(
         filepath = create_profile_picture(existing_user, profile_picture)
         existing_user.profile_picture = filepath.replace("\\", "/")
 
+    update_user_mirrors(existing_user)
     db.session.commit()
 
     return {"success": True, "message": "User updated successfully"}
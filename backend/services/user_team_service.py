@@ -1,12 +1,20 @@
-from backend.database import db
+from backend.database import db, use_shard
 from backend.models import User, Team, UserTeam, Notification
 from backend.services.notification_service import notify_user_added_to_team
+from backend.services.shard_service import find_user_id, mirror_user, shard_for_user
+from backend.structured_logging import get_logger
+
+log = get_logger(__name__)
 
 
 def add_member(username, teamname, role):
     """
     Add a user as a member to a specific team.
 
+    With sharding, the user is found through the directory and a user of
+    another shard gets a copy on the team's shard (see `mirror_user`); the
+    notifications go to the user's own shard.
+
     Args:
         username (str): The username of the user to add.
         teamname (str): The name of the team to which the user will be added.
@@ -15,40 +23,41 @@ def add_member(username, teamname, role):
     Returns:
         dict: A dictionary with success or error message.
     """
-    existing_user = User.query.filter(User.username == username).first()
+    user_id = find_user_id(username)
     existing_team = Team.query.filter(Team.name == teamname).first()
-    if not existing_user:
+    if user_id is None:
         return {"error": "Username doesn't exists."}
 
     if not existing_team:
         return {"error": "Team doesn't exists."}
 
     existing_user_team = UserTeam.query.filter_by(
-        user_id=existing_user.user_id, team_id=existing_team.team_id
+        user_id=user_id, team_id=existing_team.team_id
     ).first()
     if existing_user_team:
         return {"error": "User is already a member of this team."}
 
-    user_id = existing_user.user_id
     team_id = existing_team.team_id
 
+    mirror_user(user_id)
     new_user_team = UserTeam(user_id=user_id, team_id=team_id, role=role)
 
     db.session.add(new_user_team)
 
     db.session.commit()
     team_name = Team.query.filter_by(team_id=team_id).first().name
-    notification = Notification(
-        user_id=user_id,
-        project_id=None,
-        message=f"You were added to the team '{team_name}'",
-        type="team",
-    )
-    print(f"Creating notification for user {user_id}")
-    db.session.add(notification)
-    db.session.commit()
-
-    notify_user_added_to_team(user_id, teamname)
+    with use_shard(shard_for_user(user_id)):
+        notification = Notification(
+            user_id=user_id,
+            project_id=None,
+            message=f"You were added to the team '{team_name}'",
+            type="team",
+        )
+        log.debug("team.member_notified", user_id=user_id, team_id=team_id)
+        db.session.add(notification)
+        db.session.commit()
+
+        notify_user_added_to_team(user_id, teamname)
     return {"success": True, "message": "Member was added successfully"}
 
 
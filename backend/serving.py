@@ -0,0 +1,123 @@
+"""Production serving with gunicorn: preforked, preloaded, threaded workers.
+
+The app is built once in the master process and the workers are forked
+from it, so the imported modules and compiled templates are shared
+copy-on-write. Each worker first drops the database connections it
+inherited and then serves requests with a pool of threads. The master
+starts a process refreshing the analytics snapshot and drops the metrics
+of exited workers.
+
+Run it with `flask --app app serve` or `python -m backend.serving`; the
+settings come from `SERVER_*` in `config.Config` and can be overridden by
+the command line options. Signals to the master process:
+
+- HUP: start fresh workers and stop the old ones after their requests.
+  The preloaded app is kept, so code changes need USR2 instead.
+- USR2: start a new master with freshly imported code next to the old
+  one; then send QUIT to the old master.
+- TTIN / TTOU: one worker more / less.
+- TERM / QUIT: graceful / immediate shutdown.
+"""
+
+import time
+
+from gunicorn.app.base import BaseApplication
+
+from backend.database import dispose_engines
+from backend.metrics import prune_metrics
+from backend.services.snapshot_service import (
+    start_snapshot_process,
+    stop_snapshot_process,
+)
+
+
+class PreforkServer(BaseApplication):
+    """A gunicorn application serving an already built Flask app.
+
+    Args:
+        app (Flask): The application, built before the workers are forked.
+        options (dict): gunicorn settings, see `gunicorn_options`.
+    """
+
+    def __init__(self, app, options):
+        self.application = app
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        return self.application
+
+
+def gunicorn_options(app, **overrides):
+    """Translate the app's `SERVER_*` settings into gunicorn settings.
+
+    Args:
+        app (Flask): The Flask application instance.
+        **overrides: Settings replacing the configured ones, e.g. `workers=2`;
+            None values are ignored.
+
+    Returns:
+        dict: gunicorn setting name -> value.
+    """
+    config = app.config
+    options = {
+        "bind": config["SERVER_BIND"],
+        "workers": config["SERVER_WORKERS"],
+        "threads": config["SERVER_THREADS"],
+        "timeout": config["SERVER_TIMEOUT"],
+        "graceful_timeout": config["SERVER_GRACEFUL_TIMEOUT"],
+        "keepalive": config["SERVER_KEEPALIVE"],
+        "max_requests": config["SERVER_MAX_REQUESTS"],
+    }
+    options.update(
+        (key, value) for key, value in overrides.items() if value is not None
+    )
+    options["bind"] = [options["bind"]]
+    # spread the recycling so the workers do not restart all at once
+    options["max_requests_jitter"] = options["max_requests"] // 10
+    options["worker_class"] = "gthread"
+    options["preload_app"] = True
+    options["post_fork"] = lambda server, worker: dispose_engines(app, close=False)
+
+    snapshot = {}
+
+    def when_ready(server):
+        # one analytics snapshot refresh for all workers
+        snapshot["pid"] = start_snapshot_process(app)
+        # metrics of the workers of a previous master
+        prune_metrics(app, started_before=time.time())
+
+    def on_exit(server):
+        stop_snapshot_process(snapshot.get("pid"))
+
+    options["when_ready"] = when_ready
+    options["on_exit"] = on_exit
+    options["child_exit"] = lambda server, worker: prune_metrics(app, pid=worker.pid)
+    return options
+
+
+def serve(app, **overrides):
+    """Serve the app until the master process is stopped.
+
+    Args:
+        app (Flask): The Flask application instance.
+        **overrides: Settings replacing the configured ones, see
+            `gunicorn_options`.
+    """
+    # close what building the app opened, before any worker inherits it
+    dispose_engines(app)
+    PreforkServer(app, gunicorn_options(app, **overrides)).run()
+
+
+if __name__ == "__main__":
+    from flask.cli import ScriptInfo
+
+    from app import create_app, serve_command
+
+    serve_command.main(
+        obj=ScriptInfo(create_app=create_app), prog_name="python -m backend.serving"
+    )
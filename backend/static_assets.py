@@ -0,0 +1,204 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+
+from flask import request, send_from_directory
+
+from backend.compression import load_brotli
+
+# encodings in order of preference -> suffix of the precompressed file
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+
+# images and fonts are already compressed
+COMPRESSIBLE_SUFFIXES = (".css", ".js", ".mjs", ".map", ".svg", ".json", ".txt")
+
+# below this the saving is smaller than a single network packet
+MIN_COMPRESS_SIZE = 512
+
+HASH_LENGTH = 12
+
+
+class AssetManifest:
+    """Content-hashed names of the static files, built once at startup.
+
+    `dashboard.css` becomes `dashboard.1a2b3c4d5e6f.css`. The hashed name
+    changes with the content, so it can be cached forever.
+
+    Args:
+        folder (str): The static folder.
+        exclude (list[str]): Subfolders that are not hashed, e.g. uploads that
+            change at runtime.
+    """
+
+    def __init__(self, folder, exclude=()):
+        self.folder = folder
+        # logical name -> hashed name, and hashed name -> logical name
+        self.urls = {}
+        self.files = {}
+        # logical name -> encodings with an up-to-date precompressed file
+        self.encodings = {}
+
+        for name in iter_static_files(folder, exclude):
+            path = os.path.join(folder, name)
+            hashed = hashed_name(name, file_digest(path))
+            self.urls[name] = hashed
+            self.files[hashed] = name
+            self.encodings[name] = [
+                encoding
+                for encoding, suffix in ENCODINGS.items()
+                if _is_fresh(path + suffix, path)
+            ]
+
+    def __len__(self):
+        return len(self.urls)
+
+    def __contains__(self, name):
+        return name in self.urls
+
+
+def iter_static_files(folder, exclude=()):
+    """Yield the static files relative to `folder`, with "/" as separator.
+
+    Precompressed variants and everything below an excluded subfolder are
+    skipped.
+
+    Args:
+        folder (str): The static folder.
+        exclude (list[str]): Subfolders relative to `folder`.
+
+    Yields:
+        str: The name as used in `url_for('static', filename=...)`.
+    """
+    excluded = {os.path.normpath(os.path.join(folder, name)) for name in exclude}
+    for root, directories, files in os.walk(folder):
+        directories[:] = sorted(
+            directory
+            for directory in directories
+            if os.path.normpath(os.path.join(root, directory)) not in excluded
+        )
+        for file_name in sorted(files):
+            if file_name.endswith(tuple(ENCODINGS.values())):
+                continue
+            path = os.path.relpath(os.path.join(root, file_name), folder)
+            yield path.replace(os.sep, "/")
+
+
+def file_digest(path):
+    with open(path, "rb") as file:
+        return hashlib.file_digest(file, "sha256").hexdigest()[:HASH_LENGTH]
+
+
+def hashed_name(name, digest):
+    """Insert the content hash before the extension, `a/b.css` -> `a/b.<hash>.css`."""
+    stem, extension = os.path.splitext(name)
+    return f"{stem}.{digest}{extension}"
+
+
+def _is_fresh(variant_path, path):
+    try:
+        return os.stat(variant_path).st_mtime >= os.stat(path).st_mtime
+    except FileNotFoundError:
+        return False
+
+
+def compress_static_files(folder, exclude=()):
+    """Write `.gz` and, with the brotli package installed, `.br` variants.
+
+    Only text formats above `MIN_COMPRESS_SIZE` are compressed, and a variant
+    is only kept if it is smaller than the original. The output does not
+    depend on the time, so unchanged files produce identical variants.
+
+    Args:
+        folder (str): The static folder.
+        exclude (list[str]): Subfolders that are not compressed.
+
+    Returns:
+        dict: Name -> encodings written for it.
+    """
+    compressors = {"gzip": lambda data: gzip.compress(data, 9, mtime=0)}
+    brotli = load_brotli()
+    if brotli is not None:
+        compressors["br"] = lambda data: brotli.compress(data, quality=11)
+
+    written = {}
+    for name in iter_static_files(folder, exclude):
+        if not name.endswith(COMPRESSIBLE_SUFFIXES):
+            continue
+        path = os.path.join(folder, name)
+        with open(path, "rb") as file:
+            data = file.read()
+        if len(data) < MIN_COMPRESS_SIZE:
+            continue
+        for encoding, compress in compressors.items():
+            compressed = compress(data)
+            variant_path = path + ENCODINGS[encoding]
+            if len(compressed) >= len(data):
+                if os.path.exists(variant_path):
+                    os.remove(variant_path)
+                continue
+            with open(variant_path, "wb") as file:
+                file.write(compressed)
+            written.setdefault(name, []).append(encoding)
+    return written
+
+
+def _accepted_encoding(encodings):
+    for encoding in ENCODINGS:
+        if encoding in encodings and request.accept_encodings[encoding] > 0:
+            return encoding
+    return None
+
+
+def init_static_assets(app):
+    """Serve static files under content-hashed URLs that never expire.
+
+    The static folder is hashed once at startup, and `url_for('static', ...)`
+    looks the hashed name up in memory, so rendering a template does not touch
+    the filesystem. Hashed URLs are served with
+    `Cache-Control: public, max-age=..., immutable`, and from the `.br` or
+    `.gz` file written by `flask compress-static` if the client accepts it.
+    Names that are not in the manifest (uploaded profile pictures, relative
+    imports inside CSS and JS) are served as before. Changes to a static file
+    take effect after a restart.
+
+    Args:
+        app (Flask): The Flask application instance.
+    """
+    if not app.config["STATIC_MANIFEST_ENABLED"]:
+        return
+
+    manifest = AssetManifest(app.static_folder, app.config["STATIC_MANIFEST_EXCLUDE"])
+    app.extensions["static_assets"] = manifest
+    max_age = app.config["STATIC_IMMUTABLE_MAX_AGE"]
+    send_static_file = app.view_functions["static"]
+
+    @app.url_defaults
+    def hashed_static_url(endpoint, values):
+        if endpoint == "static" and values.get("filename") in manifest:
+            values["filename"] = manifest.urls[values["filename"]]
+
+    def static(filename):
+        name = manifest.files.get(filename)
+        if name is None:
+            return send_static_file(filename=filename)
+
+        encodings = manifest.encodings[name]
+        encoding = _accepted_encoding(encodings)
+        response = send_from_directory(
+            manifest.folder,
+            name + ENCODINGS[encoding] if encoding else name,
+            # the type of the original, not application/gzip
+            mimetype=mimetypes.guess_type(name)[0] or "application/octet-stream",
+            max_age=max_age,
+            download_name=os.path.basename(name),
+        )
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        if encodings:
+            response.vary.add("Accept-Encoding")
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
+
+    app.view_functions["static"] = static
@@ -0,0 +1,136 @@
+import json
+import logging
+import random
+from datetime import datetime, timezone
+
+from backend.tracing import current_span
+
+
+class StructuredLogger:
+    """Logger for events with key/value fields that cost nothing when disabled.
+
+    Field values may be callables; they are only called (and the event is
+    only formatted) when the level is enabled and the event is sampled, so
+    expensive summaries can be passed as `lambda: ...`.
+
+    Example:
+        log = get_logger(__name__)
+        log.debug("project.create_requested", payload=lambda: request.get_json())
+        log.info("projects.exported", format="csv", bytes=len(csv_text))
+
+    Args:
+        logger (logging.Logger): The stdlib logger events are sent to.
+    """
+
+    def __init__(self, logger):
+        self.logger = logger
+
+    def log(self, level, event, sample=1.0, exc_info=False, **fields):
+        """Log an event if the level is enabled and the event is sampled.
+
+        Args:
+            level (int): Logging level, e.g. `logging.INFO`.
+            event (str): Dotted event name, e.g. "projects.exported".
+            sample (float, optional): Share of events that are kept (0 to 1).
+            exc_info (bool, optional): Attach the current exception.
+            **fields: Event data, callables are resolved lazily.
+        """
+        if not self.logger.isEnabledFor(level):
+            return
+        if sample < 1.0 and random.random() >= sample:
+            return
+        resolved = {
+            key: value() if callable(value) else value for key, value in fields.items()
+        }
+        if sample < 1.0:
+            resolved["sample_rate"] = sample
+        self.logger.log(level, event, exc_info=exc_info, extra={"fields": resolved})
+
+    def debug(self, event, **fields):
+        self.log(logging.DEBUG, event, **fields)
+
+    def info(self, event, **fields):
+        self.log(logging.INFO, event, **fields)
+
+    def warning(self, event, **fields):
+        self.log(logging.WARNING, event, **fields)
+
+    def error(self, event, **fields):
+        self.log(logging.ERROR, event, **fields)
+
+    def exception(self, event, **fields):
+        self.log(logging.ERROR, event, exc_info=True, **fields)
+
+
+def get_logger(name):
+    """Return a StructuredLogger for a module.
+
+    Args:
+        name (str): Logger name, usually `__name__`.
+
+    Returns:
+        StructuredLogger: The logger.
+    """
+    return StructuredLogger(logging.getLogger(name))
+
+
+def _record_fields(record):
+    fields = dict(getattr(record, "fields", {}))
+    span = current_span()
+    if span is not None:
+        fields.setdefault("trace_id", span.trace_id)
+        fields.setdefault("span_id", span.span_id)
+    return fields
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "event": record.getMessage(),
+        }
+        entry.update(_record_fields(record))
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class KeyValueFormatter(logging.Formatter):
+    """Format records as `time level logger event key=value ...` for terminals."""
+
+    def format(self, record):
+        fields = " ".join(
+            f"{key}={value!r}" for key, value in _record_fields(record).items()
+        )
+        line = (
+            f"{self.formatTime(record)} {record.levelname} {record.name} "
+            f"{record.getMessage()} {fields}"
+        ).rstrip()
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+def init_logging(app):
+    """Send the logs of the `backend` package to stderr in the configured format.
+
+    Args:
+        app (Flask): The Flask application instance.
+    """
+    handler = logging.StreamHandler()
+    if app.config.get("LOG_FORMAT", "text") == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(KeyValueFormatter())
+
+    logger = logging.getLogger("backend")
+    logger.setLevel(app.config.get("LOG_LEVEL", "INFO"))
+    for existing in list(logger.handlers):
+        if getattr(existing, "structured", False):
+            logger.removeHandler(existing)
+    handler.structured = True
+    logger.addHandler(handler)
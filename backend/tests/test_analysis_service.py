@@ -17,6 +17,7 @@ from backend.services.analysis_service import (
     tasks_in_month,
     aggregate_time_by_day_project_task,
     notify_weekly_status,
+    worked_time_events,
 )
 
 
@@ -248,6 +249,37 @@ def test_aggregate_time_by_day_project_task(sample_time_entries):
         assert all(isinstance(h, numbers.Real) for h in hours_list)
 
 
+def test_worked_time_events_sums_per_task_and_day():
+    """Test that entries of one task on one day become a single event.
+
+    Asserts:
+        Two sessions of a task on the same day are summed into one event.
+        A session on another day gets its own event.
+    """
+    day = datetime(2025, 3, 10, 9)
+    entries = [
+        {"start": day, "end": day + timedelta(hours=1), "task": "A", "project": "P"},
+        {
+            "start": day + timedelta(hours=2),
+            "end": day + timedelta(hours=2, minutes=30, seconds=5),
+            "task": "A",
+            "project": "P",
+        },
+        {
+            "start": day + timedelta(days=1),
+            "end": day + timedelta(days=1, minutes=10),
+            "task": "A",
+            "project": "P",
+        },
+    ]
+    events = worked_time_events(entries)
+    assert [(e["start"], e["title"]) for e in events] == [
+        ("2025-03-10", "A: 1h 30min 5s"),
+        ("2025-03-11", "A: 0h 10min 0s"),
+    ]
+    assert events[0]["extendedProps"] == {"project": "P"}
+
+
 @pytest.fixture
 def sample_project():
     """Creates a mock project with base attributes for testing."""
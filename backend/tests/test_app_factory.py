@@ -0,0 +1,149 @@
+import os
+import sqlite3
+import subprocess
+import sys
+
+from jinja2 import FileSystemBytecodeCache
+
+from app import create_app
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# imported on first use only: PDF exports, the first email, `flask db`, `flask serve`
+DEFERRED_MODULES = ("reportlab", "flask_mail", "flask_migrate", "alembic", "gunicorn")
+
+
+def import_profile(code, tmp_path):
+    """Run `code` in a fresh interpreter with `-X importtime`.
+
+    Args:
+        code (str): Python source to run from the repository root.
+        tmp_path (Path): Folder for the databases the app creates.
+
+    Returns:
+        dict: Imported module name -> cumulative import time in microseconds.
+    """
+    environment = dict(os.environ, DATABASE_FOLDER=str(tmp_path))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=REPO_DIR,
+        env=environment,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    profile = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:"):
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                profile[name.strip()] = int(cumulative)
+    return profile
+
+
+def table_names(path):
+    connection = sqlite3.connect(path)
+    names = {
+        row[0]
+        for row in connection.execute(
+            "SELECT name FROM sqlite_master WHERE type='table'"
+        )
+    }
+    connection.close()
+    return names
+
+
+def test_app_startup_defers_heavy_imports(tmp_path):
+    profile = import_profile(
+        "import app\n"
+        "assert 'app' not in vars(app), 'importing the module built an app'\n"
+        "app.create_app()",
+        tmp_path,
+    )
+
+    assert "app" in profile
+    loaded = [
+        name
+        for name in profile
+        if any(
+            name == module or name.startswith(module + ".")
+            for module in DEFERRED_MODULES
+        )
+    ]
+    slowest = sorted(profile.items(), key=lambda item: -item[1])[:10]
+    assert loaded == [], "slowest imports:\n" + "\n".join(
+        f"{us / 1000:8.1f} ms  {name}" for name, us in slowest
+    )
+
+
+def test_create_app_creates_missing_schema(tmp_path):
+    path = tmp_path / "fresh.db"
+
+    create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}"})
+
+    assert {"users", "projects", "tasks", "time_entries"} <= table_names(path)
+
+
+def test_create_app_leaves_alembic_managed_schema_alone(tmp_path):
+    path = tmp_path / "migrated.db"
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE alembic_version (version_num VARCHAR(32))")
+    connection.close()
+
+    create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}"})
+
+    assert table_names(path) == {"alembic_version"}
+
+
+def test_create_app_caches_compiled_templates(tmp_path):
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'app.db'}",
+            "JINJA_BYTECODE_CACHE_DIR": str(tmp_path),
+        }
+    )
+
+    with app.test_request_context():
+        app.jinja_env.get_template("homepage.html")
+
+    assert isinstance(app.jinja_env.bytecode_cache, FileSystemBytecodeCache)
+    assert any(name.endswith(".cache") for name in os.listdir(tmp_path))
+
+
+def test_db_commands_load_flask_migrate_on_demand(tmp_path):
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'app.db'}"})
+    assert "migrate" not in app.extensions
+
+    result = app.test_cli_runner().invoke(args=["db", "--help"])
+
+    assert result.exit_code == 0
+    assert "upgrade" in result.output
+    assert "migrate" in app.extensions
+
+
+def test_read_engines_and_snapshot_follow_an_overridden_database(tmp_path):
+    path = tmp_path / "app.db"
+    reader = {"url": f"sqlite:///file:{tmp_path / 'other.db'}?mode=ro&uri=true"}
+
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+            "ANALYTICS_SNAPSHOT_INTERVAL": 0,
+        }
+    )
+    overridden = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+            "SQLALCHEMY_READ_BINDS": {"reader": reader},
+            "ANALYTICS_SNAPSHOT_INTERVAL": 0,
+        }
+    )
+
+    assert app.config["DATABASE_PATH"] == str(path)
+    assert app.config["ANALYTICS_SNAPSHOT_PATH"] == str(tmp_path / "analytics.db")
+    engines = app.extensions["read_engines"]
+    assert engines["reader"].url.database == f"file:{path}"
+    assert engines["analytics"].url.database == f"file:{tmp_path / 'analytics.db'}"
+    assert overridden.extensions["read_engines"]["reader"].url.database == (
+        f"file:{tmp_path / 'other.db'}"
+    )
@@ -0,0 +1,130 @@
+import gzip
+import json
+import zlib
+from io import BytesIO
+
+import pytest
+from flask import Flask, Response, jsonify, send_file
+from werkzeug.http import parse_accept_header
+
+from backend.compression import init_compression, negotiate_encoding
+
+ROWS = [{"id": index, "name": f"Task {index}"} for index in range(200)]
+
+
+@pytest.fixture()
+def app():
+    app = Flask(__name__)
+    app.config.update(
+        {
+            "COMPRESSION_MIN_SIZE": 1024,
+            "COMPRESSION_LEVEL": 6,
+            "COMPRESSION_BROTLI_QUALITY": 4,
+            "COMPRESSION_MIMETYPES": ["application/json", "text/csv"],
+        }
+    )
+    init_compression(app)
+
+    @app.route("/rows")
+    def rows():
+        return jsonify(ROWS)
+
+    @app.route("/small")
+    def small():
+        return jsonify({"ok": True})
+
+    @app.route("/stream")
+    def stream():
+        def generate():
+            yield "id,name\n"
+            for row in ROWS:
+                yield f"{row['id']},{row['name']}\n"
+
+        return Response(generate(), mimetype="text/csv")
+
+    @app.route("/pdf")
+    def pdf():
+        return send_file(BytesIO(b"%PDF" * 1000), mimetype="application/pdf")
+
+    @app.route("/missing")
+    def missing():
+        return jsonify({"error": "x" * 2000}), 404
+
+    return app
+
+
+def test_large_json_is_gzipped_when_accepted(app):
+    response = app.test_client().get("/rows", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.vary
+    assert int(response.headers["Content-Length"]) == len(response.data)
+    assert json.loads(gzip.decompress(response.data)) == ROWS
+
+
+def test_response_is_plain_without_accept_encoding(app):
+    response = app.test_client().get("/rows")
+
+    assert "Content-Encoding" not in response.headers
+    assert "Accept-Encoding" in response.vary
+    assert response.get_json() == ROWS
+
+
+def test_small_and_error_responses_are_not_compressed(app):
+    client = app.test_client()
+
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    missing = client.get("/missing", headers={"Accept-Encoding": "gzip"})
+
+    assert "Content-Encoding" not in small.headers
+    assert "Content-Encoding" not in missing.headers
+
+
+def test_files_are_passed_through(app):
+    response = app.test_client().get("/pdf", headers={"Accept-Encoding": "gzip"})
+
+    assert "Content-Encoding" not in response.headers
+    assert response.data == b"%PDF" * 1000
+
+
+def test_streamed_response_is_compressed_chunk_by_chunk(app):
+    response = app.test_client().get(
+        "/stream", headers={"Accept-Encoding": "gzip"}, buffered=False
+    )
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers
+    chunks = list(response.response)
+    response.close()
+    # flushed per row: every chunk can be decoded as soon as it arrives
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    first = decompressor.decompress(chunks[0])
+    assert first == b"id,name\n"
+    rest = b"".join(decompressor.decompress(chunk) for chunk in chunks[1:])
+    assert first + rest == b"id,name\n" + b"".join(
+        f"{row['id']},{row['name']}\n".encode() for row in ROWS
+    )
+
+
+def test_compression_can_be_disabled():
+    app = Flask(__name__)
+    app.config["COMPRESSION_ENABLED"] = False
+    init_compression(app)
+
+    assert app.after_request_funcs == {}
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("gzip, deflate, br", "br"),
+        ("gzip;q=1.0, br;q=0.5", "gzip"),
+        ("*", "br"),
+        ("deflate", None),
+        ("gzip;q=0", None),
+    ],
+)
+def test_negotiate_encoding(header, expected):
+    accept = parse_accept_header(header)
+
+    assert negotiate_encoding(accept, ["br", "gzip"]) == expected
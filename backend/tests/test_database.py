@@ -0,0 +1,110 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.exc import OperationalError
+
+from backend.database import READ_BIND, RoutingSession, db, read_only, retry_on_busy
+from backend.models import Project, Team
+
+
+def busy_error():
+    return OperationalError(
+        "UPDATE time_entries", {}, sqlite3.OperationalError("database is locked")
+    )
+
+
+def test_sqlite_profile_is_applied_to_new_connections(app):
+    with db.engine.connect() as connection:
+        pragma = lambda name: connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+        assert pragma("journal_mode") == "wal"
+        assert pragma("foreign_keys") == 1
+        assert pragma("synchronous") == 1  # NORMAL
+        assert pragma("busy_timeout") == app.config["SQLITE_PRAGMAS"]["busy_timeout"]
+        assert pragma("temp_store") == 2  # MEMORY
+
+
+def test_retry_on_busy_retries_with_backoff(app, db_session, monkeypatch):
+    delays = []
+    monkeypatch.setattr("backend.database.time.sleep", delays.append)
+    calls = []
+
+    @retry_on_busy
+    def commit_timer():
+        calls.append(1)
+        if len(calls) < 3:
+            raise busy_error()
+        return {"success": True}
+
+    assert commit_timer() == {"success": True}
+    assert len(calls) == 3
+    assert delays == [
+        app.config["SQLITE_BUSY_BACKOFF"],
+        app.config["SQLITE_BUSY_BACKOFF"] * 2,
+    ]
+
+
+def test_retry_on_busy_gives_up(app, db_session, monkeypatch):
+    monkeypatch.setattr("backend.database.time.sleep", lambda delay: None)
+    calls = []
+
+    @retry_on_busy
+    def always_busy():
+        calls.append(1)
+        raise busy_error()
+
+    with pytest.raises(OperationalError):
+        always_busy()
+    assert len(calls) == app.config["SQLITE_BUSY_RETRIES"] + 1
+
+
+def test_retry_on_busy_does_not_retry_other_errors(app, db_session):
+    calls = []
+
+    @retry_on_busy
+    def broken():
+        calls.append(1)
+        raise OperationalError("SELECT", {}, sqlite3.OperationalError("no such table"))
+
+    with pytest.raises(OperationalError):
+        broken()
+    assert len(calls) == 1
+
+
+def test_routing_session_uses_reader_only_for_reads(app):
+    session = RoutingSession(db)
+    writer, reader = db.engines[None], app.extensions["read_engines"][READ_BIND]
+
+    assert session.get_bind(mapper=Project) is writer
+    with read_only():
+        assert session.get_bind(mapper=Project) is reader
+        assert session.get_bind(clause=update(Project)) is writer
+    assert session.get_bind(mapper=Project) is writer
+    session.close()
+
+
+def test_reader_engine_rejects_writes(app):
+    with app.extensions["read_engines"][READ_BIND].connect() as connection:
+        with pytest.raises(OperationalError):
+            connection.exec_driver_sql("INSERT INTO teams (name) VALUES ('nope')")
+
+
+def test_read_only_block_reads_from_one_snapshot(app):
+    session = RoutingSession(db)
+    count_teams = select(func.count(Team.team_id))
+    try:
+        with read_only():
+            before = session.scalar(count_teams)
+
+            with db.engines[None].begin() as connection:
+                connection.execute(Team.__table__.insert().values(name="Snapshot"))
+
+            assert session.scalar(count_teams) == before
+        session.rollback()
+        with read_only():
+            assert session.scalar(count_teams) == before + 1
+    finally:
+        session.close()
+        with db.engines[None].begin() as connection:
+            connection.execute(delete(Team).where(Team.name == "Snapshot"))
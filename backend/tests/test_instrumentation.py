@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from backend.database import db
+from backend.instrumentation import RequestQueryStats, normalize_statement
+from backend.models import Project, Task, TimeEntry
+from backend.services import analysis_service
+
+
+def run_request(app, queries):
+    """Run `queries` inside a request and return the finished response."""
+    with app.test_request_context("/"):
+        app.preprocess_request()
+        queries()
+        return app.process_response(app.make_response("ok"))
+
+
+def test_normalize_statement_collapses_literals_and_in_lists():
+    first = normalize_statement(
+        "SELECT * FROM tasks WHERE tasks.project_id IN (1, 2, 3) AND title = 'a'"
+    )
+    second = normalize_statement(
+        "SELECT *\n  FROM tasks WHERE tasks.project_id IN (7) AND title = 'it''s'"
+    )
+
+    assert (
+        first
+        == second
+        == ("SELECT * FROM tasks WHERE tasks.project_id IN (?) AND title = ?")
+    )
+
+
+def test_repeated_shapes_respects_threshold():
+    stats = RequestQueryStats()
+    for project_id in range(4):
+        stats.record(f"SELECT * FROM tasks WHERE project_id = {project_id}", 1.0)
+    stats.record("SELECT * FROM projects", 1.0)
+
+    assert stats.count == 5
+    assert stats.total_ms == 5.0
+    assert stats.repeated_shapes(3) == [("SELECT * FROM tasks WHERE project_id = ?", 4)]
+    assert stats.repeated_shapes(4) == []
+
+
+def test_request_reports_server_timing(app, db_session):
+    response = run_request(app, lambda: db.session.execute(select(Project)).all())
+
+    timing = response.headers["Server-Timing"]
+    assert timing.startswith("db;dur=")
+    assert 'desc="1 queries"' in timing
+    assert "X-N-Plus-One" not in response.headers
+
+
+def test_request_flags_n_plus_one(app, db_session, monkeypatch, caplog):
+    monkeypatch.setitem(app.config, "SQL_N_PLUS_ONE_THRESHOLD", 3)
+
+    def one_query_per_project():
+        for project_id in range(5):
+            db.session.get(Project, project_id)
+
+    response = run_request(app, one_query_per_project)
+
+    assert response.headers["X-N-Plus-One"] == "1"
+    assert "Possible N+1" in caplog.text
+
+
+def test_load_time_entries_is_not_n_plus_one(app, db_session, login_user, monkeypatch):
+    monkeypatch.setattr("backend.services.analysis_service.current_user", login_user)
+    monkeypatch.setitem(app.config, "SQL_N_PLUS_ONE_THRESHOLD", 1)
+    now = datetime.now()
+    for index in range(3):
+        project = Project(
+            name=f"P{index}", user_id=login_user.user_id, time_limit_hours=1
+        )
+        db_session.add(project)
+        db_session.commit()
+        task = Task(
+            title=f"T{index}", project_id=project.project_id, user_id=login_user.user_id
+        )
+        db_session.add(task)
+        db_session.commit()
+        db_session.add(
+            TimeEntry(
+                user_id=login_user.user_id,
+                task_id=task.task_id,
+                start_time=now - timedelta(hours=1),
+                end_time=now,
+            )
+        )
+    db_session.commit()
+    db_session.expire_all()
+
+    response = run_request(app, analysis_service.load_time_entries)
+
+    assert "X-N-Plus-One" not in response.headers
@@ -0,0 +1,116 @@
+import os
+
+import pytest
+
+from backend import metrics
+from backend.metrics import MetricsRegistry, MetricsStore, registry, render_metrics
+
+
+def test_histogram_samples_are_cumulative():
+    metrics = MetricsRegistry(buckets=(0.1, 1))
+    metrics.observe("clockwise_http_request_duration_seconds", 0.05, endpoint="home")
+    metrics.observe("clockwise_http_request_duration_seconds", 0.5, endpoint="home")
+    metrics.observe("clockwise_http_request_duration_seconds", 3, endpoint="home")
+
+    text = render_metrics(metrics.samples())
+
+    assert "# TYPE clockwise_http_request_duration_seconds histogram" in text
+    assert (
+        'clockwise_http_request_duration_seconds_bucket{endpoint="home",le="0.1"} 1\n'
+        'clockwise_http_request_duration_seconds_bucket{endpoint="home",le="1"} 2\n'
+        'clockwise_http_request_duration_seconds_bucket{endpoint="home",le="+Inf"} 3\n'
+    ) in text
+    assert 'clockwise_http_request_duration_seconds_count{endpoint="home"} 3' in text
+    assert 'clockwise_http_request_duration_seconds_sum{endpoint="home"} 3.55' in text
+
+
+def test_store_sums_all_workers(tmp_path):
+    store = MetricsStore(str(tmp_path / "metrics.db"))
+    first, second = MetricsRegistry(), MetricsRegistry()
+    first.inc("clockwise_export_bytes_total", 100, format="pdf")
+    second.inc("clockwise_export_bytes_total", 50, format="pdf")
+    second.inc("clockwise_export_bytes_total", 7, format="csv")
+
+    store.write("worker-1", first.samples())
+    store.write("worker-2", second.samples())
+    # a worker replaces its own rows with its newer totals
+    first.inc("clockwise_export_bytes_total", 1, format="pdf")
+    store.write("worker-1", first.samples())
+
+    assert sorted(store.read(), key=lambda sample: sample[1]["format"]) == [
+        ("clockwise_export_bytes_total", {"format": "csv"}, 7),
+        ("clockwise_export_bytes_total", {"format": "pdf"}, 151),
+    ]
+
+
+def test_store_prunes_exited_and_previous_workers(tmp_path):
+    store = MetricsStore(str(tmp_path / "metrics.db"))
+    samples = [("clockwise_export_bytes_total", {"format": "pdf"}, 1)]
+    store.write("41-1000", samples)
+    store.write("42-2000", samples)
+    store.write("43-3000", samples)
+
+    store.prune(pid=42)
+    assert store.read()[0][2] == 2
+    store.prune(started_before=2.5)
+    assert store.read()[0][2] == 1
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_forked_worker_gets_its_own_instance():
+    read_end, write_end = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.write(write_end, metrics.INSTANCE.encode())
+        os._exit(0)
+    os.close(write_end)
+    os.waitpid(pid, 0)
+    child_instance = os.read(read_end, 100).decode()
+    os.close(read_end)
+
+    assert child_instance.startswith(f"{pid}-")
+    assert child_instance != metrics.INSTANCE
+
+
+def test_metrics_endpoint_exposes_request_metrics(
+    app, client, db_session, tmp_path, monkeypatch
+):
+    monkeypatch.setitem(app.config, "METRICS_DB_PATH", str(tmp_path / "metrics.db"))
+    monkeypatch.setitem(app.config, "METRICS_TOKEN", "secret")
+    before = dict(
+        ((name, tuple(sorted(labels.items()))), value)
+        for name, labels, value in registry.samples()
+    )
+
+    assert client.get("/").status_code == 200
+    response = client.get("/metrics", headers={"Authorization": "Bearer secret"})
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    text = response.get_data(as_text=True)
+    key = (
+        "clockwise_http_requests_total",
+        (
+            ("blueprint", "app"),
+            ("endpoint", "home"),
+            ("method", "GET"),
+            ("status", "200"),
+        ),
+    )
+    line = (
+        'clockwise_http_requests_total{blueprint="app",endpoint="home",'
+        f'method="GET",status="200"}} {int(before.get(key, 0)) + 1}'
+    )
+    assert line in text
+    assert "clockwise_active_timers 0" in text
+    assert 'endpoint="metrics.metrics"' not in text
+
+
+def test_metrics_endpoint_requires_token(app, client, monkeypatch):
+    monkeypatch.setitem(app.config, "METRICS_TOKEN", None)
+    assert client.get("/metrics").status_code == 404
+
+    monkeypatch.setitem(app.config, "METRICS_TOKEN", "secret")
+    assert client.get("/metrics").status_code == 401
+    wrong = {"Authorization": "Bearer wrong"}
+    assert client.get("/metrics", headers=wrong).status_code == 401
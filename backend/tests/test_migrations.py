@@ -0,0 +1,201 @@
+import logging
+import sqlite3
+
+import pytest
+
+from alembic import op
+
+from app import create_app
+from backend.database import RoutingSession, db
+
+
+def rows(path, query):
+    connection = sqlite3.connect(path)
+    try:
+        connection.execute("PRAGMA foreign_keys = ON")
+        result = connection.execute(query).fetchall()
+        connection.commit()
+        return result
+    finally:
+        connection.close()
+
+
+@pytest.fixture(autouse=True)
+def routing_session(monkeypatch):
+    # the db_session fixture leaves db.session bound to one connection
+    monkeypatch.setattr(
+        db, "session", db._make_scoped_session({"class_": RoutingSession})
+    )
+
+
+@pytest.fixture(autouse=True)
+def logging_config():
+    # alembic's env.py applies logging.fileConfig, which disables the
+    # existing loggers and replaces the root handlers
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    loggers = list(logging.root.manager.loggerDict.values())
+    disabled = {
+        logger: logger.disabled
+        for logger in loggers
+        if isinstance(logger, logging.Logger)
+    }
+    yield
+    root.handlers[:] = handlers
+    root.setLevel(level)
+    for logger, was_disabled in disabled.items():
+        logger.disabled = was_disabled
+
+
+@pytest.fixture()
+def path(tmp_path):
+    return tmp_path / "legacy.db"
+
+
+@pytest.fixture()
+def app(path):
+    return create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+            "AUTO_CREATE_SCHEMA": False,
+            "METRICS_ENABLED": False,
+            "ANALYTICS_SNAPSHOT_INTERVAL": 0,
+        }
+    )
+
+
+def flask_db(app, *args):
+    with app.app_context():
+        result = app.test_cli_runner().invoke(args=["db", *args])
+    assert result.exit_code == 0, result.output
+    return result
+
+
+@pytest.fixture()
+def legacy(app, path):
+    """A database with the first release schema and a user with a project."""
+    flask_db(app, "upgrade", "0001_initial_schema")
+    connection = sqlite3.connect(path)
+    connection.executescript("""
+        INSERT INTO users (user_id, username, email, password_hash, first_name,
+                           last_name)
+        VALUES (1, 'legacy', 'legacy@example.com', 'hashed', 'Ada', 'Archer');
+        INSERT INTO projects (project_id, name, time_limit_hours, type, status,
+                              user_id)
+        VALUES (1, 'Legacy', 10, 'SoloProject', 'active', 1);
+        INSERT INTO tasks (task_id, project_id, title, status, created_at,
+                           created_from_tracking)
+        VALUES (1, 1, 'Legacy task', 'todo', '2025-01-01 00:00:00', 0);
+        INSERT INTO time_entries (time_entry_id, user_id, task_id,
+                                  duration_seconds)
+        VALUES (7, 1, 1, 3600);
+        """)
+    connection.commit()
+    connection.close()
+
+
+def test_upgrade_adds_the_on_delete_rules(app, path, legacy):
+    with pytest.raises(sqlite3.IntegrityError):
+        rows(path, "DELETE FROM projects WHERE project_id = 1")
+
+    flask_db(app, "upgrade")
+
+    assert rows(path, "SELECT COUNT(*) FROM time_entry_history") == [(1,)]
+    rows(path, "DELETE FROM projects WHERE project_id = 1")
+    assert rows(path, "SELECT COUNT(*) FROM tasks") == [(0,)]
+    assert rows(path, "SELECT COUNT(*) FROM time_entries") == [(0,)]
+    # ids of deleted entries are not reused
+    rows(
+        path,
+        "INSERT INTO projects (project_id, name, time_limit_hours, type, status)"
+        " VALUES (2, 'Ownerless', 10, 'TeamProject', 'active')",
+    )
+    assert rows(
+        path, "SELECT seq FROM sqlite_sequence WHERE name = 'time_entries'"
+    ) == [(7,)]
+    assert {
+        name
+        for (name,) in rows(
+            path,
+            "SELECT name FROM sqlite_master WHERE type = 'index'"
+            " AND tbl_name = 'tasks'",
+        )
+    } == {
+        "ix_tasks_project_id",
+        "ix_tasks_user_id",
+        "ix_tasks_admin_id",
+        "ix_tasks_member_id",
+        "ix_tasks_due_date",
+    }
+
+
+@pytest.fixture()
+def dangling(path, legacy):
+    """Rows the first release left behind: time of a deleted task, a lost category."""
+    connection = sqlite3.connect(path)
+    connection.executescript("""
+        INSERT INTO time_entries (time_entry_id, user_id, task_id,
+                                  duration_seconds)
+        VALUES (8, 1, 99, 60);
+        UPDATE tasks SET category_id = 5 WHERE task_id = 1;
+        """)
+    connection.commit()
+    connection.close()
+
+
+def test_upgrade_applies_the_delete_rules_to_dangling_rows(app, path, dangling):
+    flask_db(app, "upgrade")
+
+    assert rows(path, "SELECT time_entry_id FROM time_entries") == [(7,)]
+    assert rows(path, "SELECT category_id FROM tasks") == [(None,)]
+    assert rows(path, "PRAGMA foreign_key_check") == []
+
+
+def test_failed_upgrade_keeps_the_connection_enforcing_foreign_keys(
+    app, legacy, monkeypatch
+):
+    def fail(*args, **kwargs):
+        raise RuntimeError("copy failed")
+
+    monkeypatch.setattr(op, "batch_alter_table", fail)
+    with app.app_context():
+        result = app.test_cli_runner().invoke(args=["db", "upgrade"])
+    assert result.exit_code != 0
+
+    with app.app_context():
+        assert db.session.connection().exec_driver_sql("PRAGMA foreign_keys").scalar()
+
+
+def test_upgrade_keeps_the_connection_enforcing_foreign_keys(app, legacy):
+    flask_db(app, "upgrade")
+
+    with app.app_context():
+        assert db.session.connection().exec_driver_sql("PRAGMA foreign_keys").scalar()
+
+
+def test_downgrade_restores_the_first_release_rules(app, path, legacy):
+    flask_db(app, "upgrade")
+    flask_db(app, "downgrade", "0004_time_entry_history")
+
+    with pytest.raises(sqlite3.IntegrityError):
+        rows(path, "DELETE FROM projects WHERE project_id = 1")
+    assert rows(path, "SELECT COUNT(*) FROM time_entry_history") == [(1,)]
+
+
+def test_startup_upgrades_databases_created_by_create_all(path, dangling):
+    rows(path, "DROP TABLE alembic_version")
+
+    create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+            "METRICS_ENABLED": False,
+            "ANALYTICS_SNAPSHOT_INTERVAL": 0,
+        }
+    )
+
+    assert rows(path, "SELECT COUNT(*) FROM time_entry_history") == [(1,)]
+    assert rows(path, "SELECT category_id FROM tasks") == [(None,)]
+    rows(path, "DELETE FROM users WHERE user_id = 1")
+    assert rows(path, "SELECT COUNT(*) FROM projects") == [(1,)]
+    assert rows(path, "SELECT user_id FROM projects") == [(None,)]
+    assert rows(path, "SELECT COUNT(*) FROM time_entries") == [(0,)]
@@ -1,7 +1,7 @@
 import pytest
 from datetime import datetime
 
-from backend.models import Notification, User
+from backend.models import Notification, Project, User
 from backend.services.notification_service import (
     create_notification,
     notify_task_assigned,
@@ -34,13 +34,16 @@ def setup_notify_user(db_session):
 
 def test_create_notification_basic(db_session, setup_notify_user):
     user = setup_notify_user
-    create_notification(user.user_id, "Test message", "info", project_id=123)
+    project = Project(name="Notified", user_id=user.user_id, time_limit_hours=1)
+    db_session.add(project)
+    db_session.commit()
+    create_notification(user.user_id, "Test message", "info", project_id=project.project_id)
 
     note = Notification.query.filter_by(user_id=user.user_id).first()
     assert note is not None
     assert note.message == "Test message"
     assert note.type == "info"
-    assert note.project_id == 123
+    assert note.project_id == project.project_id
 
 
 def test_notify_task_assigned(db_session, setup_notify_user):
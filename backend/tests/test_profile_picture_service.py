@@ -27,7 +27,7 @@ class DummyFile:
             f.write("dummy image content")
 
 
-def test_create_profile_picture_new_file(app):
+def test_create_profile_picture_new_file(app, tmp_path, monkeypatch):
     """Test creating a new profile picture without an existing one.
 
     Ensures the file is saved in the correct location and the returned path
@@ -35,7 +35,10 @@ def test_create_profile_picture_new_file(app):
 
     Args:
         app (Flask): The Flask test app fixture with an active app context.
+        tmp_path (Path): Pytest's temporary path fixture, used as static folder.
+        monkeypatch (MonkeyPatch): Pytest fixture to swap the static folder.
     """
+    monkeypatch.setattr(app, "static_folder", str(tmp_path))
     profile_picture = DummyFile("myphoto.png")
 
     with app.app_context():
@@ -45,7 +48,7 @@ def test_create_profile_picture_new_file(app):
     assert os.path.exists(profile_picture.saved_path)
 
 
-def test_create_profile_picture_replaces_old_file(app, tmp_path):
+def test_create_profile_picture_replaces_old_file(app, tmp_path, monkeypatch):
     """Test replacing an existing profile picture with a new one.
 
     Ensures the old file is removed and the new file is saved correctly.
@@ -53,7 +56,9 @@ def test_create_profile_picture_replaces_old_file(app, tmp_path):
     Args:
         app (Flask): The Flask test app fixture with an active app context.
         tmp_path (Path): Pytest's temporary path fixture for isolated file I/O.
+        monkeypatch (MonkeyPatch): Pytest fixture to swap the static folder.
     """
+    monkeypatch.setattr(app, "static_folder", str(tmp_path))
     old_filename = "oldpic.png"
     old_folder = os.path.join(app.static_folder, "profile_pictures")
     os.makedirs(old_folder, exist_ok=True)
@@ -0,0 +1,89 @@
+import cProfile
+import os
+import pstats
+
+from backend.profiling import collapsed_stacks
+
+
+def leaf():
+    return sum(range(20000))
+
+
+def branch():
+    return leaf() + leaf()
+
+
+def test_collapsed_stacks_nest_callers():
+    profiler = cProfile.Profile()
+    profiler.enable()
+    branch()
+    profiler.disable()
+
+    lines = collapsed_stacks(pstats.Stats(profiler))
+
+    stacks = [line.rsplit(" ", 1)[0].split(";") for line in lines]
+    leaf_stacks = [stack for stack in stacks if stack[-1].startswith("leaf (")]
+    assert leaf_stacks
+    assert all(stack[-2].startswith("branch (") for stack in leaf_stacks)
+    assert all(int(line.rsplit(" ", 1)[1]) > 0 for line in lines)
+
+
+def test_cpu_profile_requires_token(app, client, db_session, tmp_path, monkeypatch):
+    monkeypatch.setitem(app.config, "PROFILING_TOKEN", "secret")
+    monkeypatch.setitem(app.config, "PROFILING_DIR", str(tmp_path))
+
+    wrong = {"X-Profile": "cpu", "X-Profile-Token": "wrong"}
+    assert "X-Profile-File" not in client.get("/", headers=wrong).headers
+
+    response = client.get(
+        "/", headers={"X-Profile": "cpu", "X-Profile-Token": "secret"}
+    )
+    profile_file = response.headers["X-Profile-File"]
+    assert profile_file.endswith("-home.prof")
+    assert pstats.Stats(str(tmp_path / profile_file)).total_calls > 0
+    assert os.path.getsize(tmp_path / profile_file.replace(".prof", ".collapsed")) > 0
+
+
+def test_memory_profile_lists_allocation_sites(
+    app, client, db_session, tmp_path, monkeypatch
+):
+    monkeypatch.setitem(app.config, "PROFILING_TOKEN", "secret")
+    monkeypatch.setitem(app.config, "PROFILING_DIR", str(tmp_path))
+
+    response = client.get("/?profile=memory&profile_token=secret")
+
+    report = (tmp_path / response.headers["X-Profile-File"]).read_text()
+    assert report.startswith("GET /\n")
+    assert "secret" not in report
+    assert "size=" in report
+
+
+def test_sampling_profiles_without_token(
+    app, client, db_session, tmp_path, monkeypatch
+):
+    monkeypatch.setitem(app.config, "PROFILING_SAMPLE_RATE", 1)
+    monkeypatch.setitem(app.config, "PROFILING_DIR", str(tmp_path))
+
+    response = client.get("/")
+
+    assert response.headers["X-Profile-File"].endswith(".prof")
+
+
+def test_only_the_newest_profiles_are_kept(
+    app, client, db_session, tmp_path, monkeypatch
+):
+    monkeypatch.setitem(app.config, "PROFILING_SAMPLE_RATE", 1)
+    monkeypatch.setitem(app.config, "PROFILING_DIR", str(tmp_path))
+    monkeypatch.setitem(app.config, "PROFILING_MAX_FILES", 4)
+    (tmp_path / "notes.txt").write_text("not a profile")
+
+    names = [client.get("/").headers["X-Profile-File"] for _ in range(3)]
+
+    # a cpu profile is a .prof and a .collapsed file
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        [
+            "notes.txt",
+            *names[1:],
+            *(name.replace(".prof", ".collapsed") for name in names[1:]),
+        ]
+    )
@@ -7,6 +7,7 @@ from backend.models import (
     Team,
     Project,
     Task,
+    TimeEntry,
 )
 from backend.models.project import ProjectType, ProjectStatus
 from backend.services.project_service import (
@@ -14,8 +15,10 @@ from backend.services.project_service import (
     create_project,
     get_project,
     delete_project,
+    purge_project,
     update_project,
     update_total_duration_for_project,
+    get_visible_projects,
     serialize_projects,
     get_info,
     export_project_info_pdf,
@@ -23,6 +26,20 @@ from backend.services.project_service import (
 )
 
 
+@pytest.fixture
+def other_user(db_session):
+    user = User(
+        username="otheruser",
+        email="other@example.com",
+        password_hash="hashed",
+        first_name="Other",
+        last_name="User",
+    )
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+
 @pytest.fixture
 def setup_project_env(db_session):
     user = User(
@@ -116,6 +133,53 @@ def test_delete_project_success(db_session, setup_project_env):
     assert Project.query.get(p.project_id) is None
 
 
+def _project_with_entries(db_session, user, tasks=2, entries_per_task=3):
+    project = Project(
+        name="Tracked",
+        user_id=user.user_id,
+        type=ProjectType.SoloProject,
+        status=ProjectStatus.active,
+        time_limit_hours=10,
+    )
+    db_session.add(project)
+    db_session.commit()
+    for i in range(tasks):
+        task = Task(title=f"T{i}", project_id=project.project_id)
+        db_session.add(task)
+        db_session.commit()
+        db_session.add_all(
+            [
+                TimeEntry(user_id=user.user_id, task_id=task.task_id, duration_seconds=60)
+                for _ in range(entries_per_task)
+            ]
+        )
+    db_session.commit()
+    return project.project_id
+
+
+def test_delete_project_cascades_in_database(db_session, setup_project_env):
+    user, _ = setup_project_env
+    project_id = _project_with_entries(db_session, user)
+
+    result = delete_project(project_id)
+
+    assert result["success"]
+    assert "scheduled" not in result
+    assert Task.query.filter_by(project_id=project_id).count() == 0
+    assert TimeEntry.query.filter_by(user_id=user.user_id).count() == 0
+
+
+def test_purge_project_deletes_in_chunks(db_session, setup_project_env):
+    user, _ = setup_project_env
+    project_id = _project_with_entries(db_session, user, tasks=3, entries_per_task=4)
+
+    result = purge_project(project_id, chunk_size=5)
+
+    assert result == {"time_entries": 12, "tasks": 3}
+    assert Project.query.filter_by(project_id=project_id).first() is None
+    assert TimeEntry.query.filter_by(user_id=user.user_id).count() == 0
+
+
 def test_update_project_fields(db_session, setup_project_env):
     user, _ = setup_project_env
     p = Project(
@@ -162,6 +226,75 @@ def test_update_total_duration(db_session, setup_project_env):
     assert Project.query.get(p.project_id).current_hours == 1.5
 
 
+def test_get_visible_projects_preloads_totals(
+    db_session, setup_project_env, other_user
+):
+    user, team = setup_project_env
+    from backend.models import UserTeam
+
+    db_session.add(UserTeam(user_id=user.user_id, team_id=team.team_id))
+    own = Project(
+        name="OwnTotals",
+        user_id=user.user_id,
+        type=ProjectType.SoloProject,
+        status=ProjectStatus.active,
+        time_limit_hours=10,
+    )
+    shared = Project(
+        name="TeamTotals",
+        user_id=other_user.user_id,
+        team_id=team.team_id,
+        type=ProjectType.TeamProject,
+        status=ProjectStatus.inactive,
+        time_limit_hours=10,
+    )
+    db_session.add_all([own, shared])
+    db_session.commit()
+
+    db_session.add_all(
+        [
+            Task(project_id=own.project_id, total_duration_seconds=3600),
+            Task(project_id=own.project_id, total_duration_seconds=61),
+            Task(project_id=shared.project_id, total_duration_seconds=None),
+        ]
+    )
+    db_session.commit()
+
+    projects = {p.name: p for p in get_visible_projects(user.user_id)}
+    assert set(projects) == {"OwnTotals", "TeamTotals"}
+    assert projects["OwnTotals"].task_count == 2
+    assert projects["OwnTotals"].duration_readable == "1h 1min 1s"
+    assert projects["TeamTotals"].task_count == 1
+    assert projects["TeamTotals"].duration_readable == "0h 0min 0s"
+
+    active = get_visible_projects(user.user_id, status=ProjectStatus.active)
+    assert [p.name for p in active] == ["OwnTotals"]
+
+
+def test_preloaded_totals_expire_with_the_project(db_session, setup_project_env):
+    user, _ = setup_project_env
+    project = Project(
+        name="Stale",
+        user_id=user.user_id,
+        type=ProjectType.SoloProject,
+        status=ProjectStatus.active,
+        time_limit_hours=10,
+    )
+    db_session.add(project)
+    db_session.commit()
+    task = Task(project_id=project.project_id, total_duration_seconds=60)
+    db_session.add(task)
+    db_session.commit()
+
+    [loaded] = [p for p in get_visible_projects(user.user_id) if p.name == "Stale"]
+    assert loaded.total_duration_seconds == 60
+
+    task.total_duration_seconds = 120
+    db_session.commit()
+    assert loaded.total_duration_seconds == 120
+    assert loaded.task_count == 1
+
+
 def test_serialize_projects_structure(db_session, setup_project_env):
     user, _ = setup_project_env
     p = Project(
@@ -181,7 +314,7 @@ def test_serialize_projects_structure(db_session, setup_project_env):
 
 
 def test_get_info_returns_own_and_team_projects(
-    db_session, setup_project_env, monkeypatch, app
+    db_session, setup_project_env, other_user, monkeypatch, app
 ):
     user, team = setup_project_env
 
@@ -200,7 +333,7 @@ def test_get_info_returns_own_and_team_projects(
 
     team_proj = Project(
         name="TeamProject",
-        user_id=9999,
+        user_id=other_user.user_id,
         team_id=team.team_id,
         type=ProjectType.TeamProject,
         status=ProjectStatus.inactive,
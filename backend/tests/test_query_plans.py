@@ -0,0 +1,213 @@
+"""Query-plan regression tests.
+
+Every service query listed below is captured while it runs, re-run with
+``EXPLAIN QUERY PLAN`` and rejected if SQLite plans a full scan of one of
+the hot tables instead of using an index.
+"""
+
+import re
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import event
+
+from backend.database import db
+from backend.models import (
+    Notification,
+    Project,
+    Task,
+    Team,
+    TimeEntry,
+    User,
+    UserTeam,
+)
+from backend.models.project import ProjectStatus, ProjectType
+from backend.services import (
+    analysis_service,
+    notification_service,
+    project_service,
+    task_service,
+    team_service,
+    time_entry_service,
+)
+
+HOT_TABLES = ("time_entries", "tasks", "notifications", "projects")
+
+# "SCAN tasks" (or an alias like "tasks_1") without "USING ... INDEX"
+FULL_SCAN = re.compile(r"^SCAN (?P<table>\w+)$")
+
+
+@contextmanager
+def captured_selects():
+    """Record every SELECT statement (with parameters) sent to the database.
+
+    Yields:
+        list[tuple[str, tuple]]: Statements in execution order.
+    """
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    engine = db.session.get_bind()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def full_table_scans(statement, parameters):
+    """Return the hot tables that SQLite would scan completely for a statement.
+
+    Args:
+        statement (str): SQL statement as sent to the driver.
+        parameters (tuple): Bound parameters of the statement.
+
+    Returns:
+        list[str]: Plan details that describe full scans of hot tables.
+    """
+    rows = db.session.connection().exec_driver_sql(
+        "EXPLAIN QUERY PLAN " + statement, parameters
+    )
+    scans = []
+    for row in rows:
+        match = FULL_SCAN.match(row[-1])
+        if match and match.group("table").rstrip("_0123456789") in HOT_TABLES:
+            scans.append(row[-1])
+    return scans
+
+
+@pytest.fixture
+def plan_data(db_session):
+    """Create a small data set so every service query has something to touch."""
+    user = User(
+        username="planner",
+        email="planner@example.com",
+        password_hash="hashed",
+        first_name="Plan",
+        last_name="Ner",
+    )
+    team = Team(name="Planners")
+    db_session.add_all([user, team])
+    db_session.commit()
+
+    db_session.add(UserTeam(user_id=user.user_id, team_id=team.team_id, role="admin"))
+    project = Project(
+        name="Plans",
+        user_id=user.user_id,
+        team_id=team.team_id,
+        type=ProjectType.TeamProject,
+        status=ProjectStatus.active,
+        time_limit_hours=10,
+        due_date=datetime.now() + timedelta(days=7),
+    )
+    db_session.add(project)
+    db_session.commit()
+
+    task = Task(
+        title="Explain",
+        project_id=project.project_id,
+        member_id=user.user_id,
+        due_date=datetime.now(),
+    )
+    db_session.add(task)
+    db_session.commit()
+
+    now = datetime.now()
+    db_session.add_all(
+        [
+            TimeEntry(
+                user_id=user.user_id,
+                task_id=task.task_id,
+                start_time=now - timedelta(hours=2),
+                end_time=now - timedelta(hours=1),
+                duration_seconds=3600,
+            ),
+            Notification(
+                user_id=user.user_id,
+                project_id=project.project_id,
+                message="Plan",
+                type="progress",
+            ),
+        ]
+    )
+    db_session.commit()
+    return SimpleNamespace(user=user, team=team, project=project, task=task)
+
+
+# name -> call that runs the service query against the plan_data fixture
+SERVICE_QUERIES = {
+    "get_time_entries_by_task": lambda d: time_entry_service.get_time_entries_by_task(
+        d.task.task_id
+    ),
+    "get_latest_time_entries_for_user": lambda d: (
+        time_entry_service.get_latest_time_entries_for_user(d.user.user_id)
+    ),
+    "get_latest_project_time_entry_for_user": lambda d: (
+        time_entry_service.get_latest_project_time_entry_for_user(d.user.user_id)
+    ),
+    "get_tasks_by_project": lambda d: task_service.get_tasks_by_project(
+        d.project.project_id
+    ),
+    "get_tasks_by_project_for_user": lambda d: (
+        task_service.get_tasks_by_project_for_user(d.project.project_id, d.user.user_id)
+    ),
+    "get_tasks_without_time_entries": lambda d: (
+        task_service.get_tasks_without_time_entries(d.user.user_id)
+    ),
+    "get_unassigned_tasks": lambda d: task_service.get_unassigned_tasks(d.user.user_id),
+    "get_tasks_assigned_to_user": lambda d: task_service.get_tasks_assigned_to_user(
+        d.user.user_id
+    ),
+    "update_total_duration_for_task": lambda d: (
+        task_service.update_total_duration_for_task(d.task.task_id)
+    ),
+    "get_visible_projects": lambda d: project_service.get_visible_projects(
+        d.user.user_id
+    ),
+    "count_project_time_entries": lambda d: (
+        project_service.count_project_time_entries(d.project.project_id)
+    ),
+    "update_total_duration_for_project": lambda d: (
+        project_service.update_total_duration_for_project(d.project.project_id)
+    ),
+    "get_team_overview": lambda d: team_service.get_team_overview(d.user.user_id),
+    "get_user_teams": lambda d: team_service.get_user_teams(d.user.user_id),
+    "already_notified_this_week": lambda d: (
+        notification_service.already_notified_this_week(
+            d.user.user_id, d.project.project_id
+        )
+    ),
+    "load_time_entries": lambda d: analysis_service.load_time_entries(),
+    "load_tasks": lambda d: analysis_service.load_tasks(),
+}
+
+
+def test_full_scan_is_detected(plan_data):
+    with captured_selects() as statements:
+        Task.query.filter(Task.title == "Explain").all()
+
+    statement, parameters = statements[0]
+    assert full_table_scans(statement, parameters) == ["SCAN tasks"]
+
+
+@pytest.mark.parametrize("name", sorted(SERVICE_QUERIES))
+def test_service_query_uses_indexes(name, plan_data, monkeypatch):
+    monkeypatch.setattr(
+        "backend.services.analysis_service.current_user", plan_data.user
+    )
+
+    with captured_selects() as statements:
+        SERVICE_QUERIES[name](plan_data)
+
+    assert statements, f"{name} ran no SELECT statements"
+    scans = {
+        statement: full_table_scans(statement, parameters)
+        for statement, parameters in statements
+    }
+    offending = {statement: s for statement, s in scans.items() if s}
+    assert not offending, f"{name} degrades to a full table scan: {offending}"
@@ -0,0 +1,96 @@
+import sqlite3
+from datetime import datetime
+
+from sqlalchemy import create_engine
+
+from backend.database import db
+from backend.services.seed_service import seed_synthetic_data
+
+NOW = datetime(2025, 6, 1)
+
+
+def make_database(path):
+    engine = create_engine(f"sqlite:///{path}")
+    db.metadata.create_all(engine)
+    engine.dispose()
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA foreign_keys=ON")
+    return connection
+
+
+def seed(connection, **options):
+    defaults = dict(users=12, teams=3, entries=2000, years=1, seed=7, now=NOW)
+    return seed_synthetic_data(connection, **dict(defaults, **options))
+
+
+def dump(connection, table):
+    return connection.execute(f"SELECT * FROM {table} ORDER BY 1, 2").fetchall()
+
+
+def test_seed_synthetic_data_inserts_consistent_rows(tmp_path):
+    connection = make_database(tmp_path / "seed.db")
+    counts = seed(connection)
+
+    for table, expected in [
+        ("users", counts["users"]),
+        ("teams", counts["teams"]),
+        ("projects", counts["projects"]),
+        ("tasks", counts["tasks"]),
+        ("time_entries", 2000),
+        ("notifications", counts["notifications"]),
+    ]:
+        assert connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] == (
+            expected
+        )
+    assert connection.execute("PRAGMA foreign_key_check").fetchall() == []
+
+    # entries belong to the user the task is assigned to and lie in the period
+    assert connection.execute(
+        "SELECT COUNT(*) FROM time_entries JOIN tasks USING (task_id)"
+        " WHERE time_entries.user_id != COALESCE(member_id, admin_id, tasks.user_id)"
+        " OR start_time < '2024-06-01' OR start_time >= '2025-06-01'"
+        " OR end_time <= start_time"
+    ).fetchone() == (0,)
+
+    # cached totals match the entries
+    assert connection.execute(
+        "SELECT COUNT(*) FROM tasks WHERE total_duration_seconds != (SELECT"
+        " COALESCE(SUM(duration_seconds), 0) FROM time_entries"
+        " WHERE time_entries.task_id = tasks.task_id)"
+    ).fetchone() == (0,)
+    project_hours = connection.execute("SELECT SUM(current_hours) FROM projects")
+    entry_seconds = connection.execute(
+        "SELECT SUM(duration_seconds) FROM time_entries JOIN tasks USING (task_id)"
+        " WHERE project_id IS NOT NULL"
+    )
+    assert abs(project_hours.fetchone()[0] - entry_seconds.fetchone()[0] / 3600) < 1
+
+    # the indexes dropped for the bulk load are back
+    indexes = {
+        row[0]
+        for row in connection.execute(
+            "SELECT name FROM sqlite_master WHERE tbl_name = 'time_entries'"
+        )
+    }
+    assert "ix_time_entries_user_id_start_time" in indexes
+    connection.close()
+
+
+def test_seed_synthetic_data_is_reproducible(tmp_path):
+    first, second = make_database(tmp_path / "a.db"), make_database(tmp_path / "b.db")
+    seed(first)
+    seed(second)
+
+    for table in ("projects", "tasks", "time_entries", "notifications"):
+        assert dump(first, table) == dump(second, table)
+    # password hashes are salted, everything else about the users is the same
+    users = "SELECT user_id, username, first_name, last_name, created_at FROM users"
+    assert first.execute(users).fetchall() == second.execute(users).fetchall()
+
+    # a second run adds to the data instead of colliding with it
+    counts = seed(first, seed=8)
+    assert first.execute("SELECT COUNT(*) FROM users").fetchone()[0] == (
+        2 * counts["users"]
+    )
+    first.close()
+    second.close()
@@ -0,0 +1,111 @@
+import enum
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+import msgpack
+import pytest
+from flask import Flask, jsonify, render_template_string, request
+
+from backend.serialization import OrjsonProvider, init_serialization
+
+
+class Color(enum.Enum):
+    red = "red"
+
+
+PAYLOAD = {
+    "when": datetime(2025, 3, 1, 9, 30),
+    "day": date(2025, 3, 1),
+    "color": Color.red,
+    "amount": Decimal("1.50"),
+    "counts": {2: "b", 1: "a"},
+    "name": "Zeiterfassung ü",
+}
+
+
+@pytest.fixture()
+def app():
+    app = Flask(__name__)
+    init_serialization(app)
+
+    @app.route("/payload")
+    def payload():
+        return jsonify(PAYLOAD)
+
+    @app.route("/echo", methods=["POST"])
+    def echo():
+        return request.get_json()
+
+    return app
+
+
+def test_app_uses_orjson_provider(app):
+    assert isinstance(app.json, OrjsonProvider)
+
+
+def test_jsonify_serializes_datetimes_and_enums_natively(app):
+    response = app.test_client().get("/payload")
+
+    assert response.mimetype == "application/json"
+    assert response.get_json() == {
+        "when": "2025-03-01T09:30:00",
+        "day": "2025-03-01",
+        "color": "red",
+        "amount": "1.50",
+        "counts": {"1": "a", "2": "b"},
+        "name": "Zeiterfassung ü",
+    }
+    # sorted keys like the stdlib provider
+    assert list(json.loads(response.data)) == sorted(PAYLOAD)
+
+
+def test_request_json_is_parsed_with_orjson(app):
+    client = app.test_client()
+
+    assert client.post("/echo", json={"a": [1, 2]}).get_json() == {"a": [1, 2]}
+    assert (
+        client.post("/echo", data="{", content_type="application/json").status_code
+        == 400
+    )
+
+
+def test_msgpack_is_sent_when_preferred(app):
+    client = app.test_client()
+
+    packed = client.get("/payload", headers={"Accept": "application/msgpack"})
+    default = client.get("/payload", headers={"Accept": "*/*"})
+
+    assert packed.mimetype == "application/msgpack"
+    assert "Accept" in packed.vary
+    assert msgpack.unpackb(packed.data, strict_map_key=False) == {
+        "when": "2025-03-01T09:30:00",
+        "day": "2025-03-01",
+        "color": "red",
+        "amount": "1.50",
+        "counts": {2: "b", 1: "a"},
+        "name": "Zeiterfassung ü",
+    }
+    assert default.mimetype == "application/json"
+    assert "Accept" in default.vary
+
+
+def test_tojson_filter_uses_provider(app):
+    with app.test_request_context():
+        rendered = render_template_string(
+            "{{ data|tojson }}", data={"b": Color.red, "a": "<x>"}
+        )
+
+    assert rendered == '{"a":"\\u003cx\\u003e","b":"red"}'
+
+
+def test_unsupported_dumps_arguments_fall_back_to_stdlib(app):
+    assert app.json.dumps({"a": 1}, indent=4) == '{\n    "a": 1\n}'
+
+
+def test_orjson_can_be_disabled():
+    app = Flask(__name__)
+    app.config["ORJSON_ENABLED"] = False
+    init_serialization(app)
+
+    assert not isinstance(app.json, OrjsonProvider)
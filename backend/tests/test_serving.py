@@ -0,0 +1,96 @@
+import sqlite3
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("gunicorn")
+
+from backend.database import db, dispose_engines
+from backend.serving import PreforkServer, gunicorn_options
+
+
+def test_gunicorn_options_follow_config_and_overrides(app, monkeypatch):
+    monkeypatch.setitem(app.config, "SERVER_BIND", "0.0.0.0:9000")
+    monkeypatch.setitem(app.config, "SERVER_MAX_REQUESTS", 1000)
+
+    options = gunicorn_options(app, workers=3, threads=None)
+
+    assert options["bind"] == ["0.0.0.0:9000"]
+    assert options["workers"] == 3
+    assert options["threads"] == app.config["SERVER_THREADS"]
+    assert options["max_requests_jitter"] == 100
+    assert options["worker_class"] == "gthread"
+    assert options["preload_app"] is True
+
+
+def test_server_loads_the_preloaded_app(app):
+    server = PreforkServer(app, gunicorn_options(app, workers=2, keepalive=7))
+
+    assert server.load() is app
+    assert server.cfg.workers == 2
+    assert server.cfg.keepalive == 7
+    assert server.cfg.preload_app
+
+
+def test_post_fork_drops_inherited_connections(app):
+    with app.app_context():
+        engine = db.engine
+    engine.connect().close()
+    reader = app.extensions["read_engines"]["reader"]
+    reader.connect().close()
+    assert engine.pool.checkedin() == 1
+
+    gunicorn_options(app)["post_fork"](None, None)
+
+    with app.app_context():
+        assert db.engine.pool.checkedin() == 0
+    assert reader.pool.checkedin() == 0
+
+
+def test_dispose_engines_closes_pooled_connections(app):
+    with app.app_context():
+        connection = db.engine.raw_connection()
+        driver_connection = connection.driver_connection
+        connection.close()
+
+    dispose_engines(app)
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        driver_connection.execute("SELECT 1")
+
+
+def test_master_refreshes_the_analytics_snapshot(app, monkeypatch):
+    started, stopped = [], []
+
+    def start(app):
+        started.append(app)
+        return 42
+
+    monkeypatch.setattr("backend.serving.start_snapshot_process", start)
+    monkeypatch.setattr("backend.serving.stop_snapshot_process", stopped.append)
+    monkeypatch.setattr("backend.serving.prune_metrics", lambda app, **kwargs: None)
+    options = gunicorn_options(app)
+
+    options["post_fork"](None, None)
+    assert started == []
+
+    options["when_ready"](None)
+    assert started == [app]
+    options["on_exit"](None)
+    assert stopped == [42]
+
+
+def test_master_prunes_the_metrics_of_exited_workers(app, monkeypatch):
+    pruned = []
+    monkeypatch.setattr(
+        "backend.serving.prune_metrics", lambda app, **kwargs: pruned.append(kwargs)
+    )
+    monkeypatch.setattr("backend.serving.start_snapshot_process", lambda app: None)
+    options = gunicorn_options(app)
+
+    options["when_ready"](None)
+    options["child_exit"](None, SimpleNamespace(pid=42))
+
+    assert pruned[0]["started_before"] <= time.time()
+    assert pruned[1] == {"pid": 42}
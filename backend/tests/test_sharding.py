@@ -0,0 +1,355 @@
+import sqlite3
+import threading
+from io import BytesIO
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from app import create_app
+from backend.database import (
+    DEFAULT_SHARD,
+    RoutingSession,
+    current_shard,
+    db,
+    use_shard,
+)
+from backend.models import User
+from backend.services.team_service import create_new_team
+from backend.services.user_team_service import add_member
+
+PASSWORD = "secret"
+
+
+def rows(path, query):
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute(query).fetchall()
+    finally:
+        connection.close()
+
+
+@pytest.fixture(autouse=True)
+def routing_session(monkeypatch):
+    # the db_session fixture leaves db.session bound to one connection
+    monkeypatch.setattr(
+        db, "session", db._make_scoped_session({"class_": RoutingSession})
+    )
+
+
+@pytest.fixture()
+def paths(tmp_path):
+    return {"default": tmp_path / "primary.db", "a": tmp_path / "shard-a.db"}
+
+
+def make_app(paths, shards=True, **overrides):
+    config = {
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{paths['default']}",
+        "SQLALCHEMY_SHARDS": (
+            {"a": {"url": f"sqlite:///{paths['a']}"}} if shards else {}
+        ),
+        "METRICS_ENABLED": False,
+        "ANALYTICS_SNAPSHOT_INTERVAL": 0,
+        **overrides,
+    }
+    return create_app(config)
+
+
+def register(client, username):
+    return client.post(
+        "/auth/register",
+        data={
+            "username": username,
+            "email": f"{username}@example.com",
+            "first_name": username.title(),
+            "last_name": "Tester",
+            "password": PASSWORD,
+            "profile_picture": (BytesIO(b""), ""),
+        },
+    )
+
+
+def login(client, username):
+    return client.post("/auth/login", data={"username": username, "password": PASSWORD})
+
+
+def test_users_are_assigned_round_robin_by_user_id(paths):
+    client = make_app(paths).test_client()
+
+    register(client, "alice")
+    register(client, "bob")
+
+    assert rows(paths["default"], "SELECT user_id, shard FROM user_shards") == [
+        (1, "a"),
+        (2, DEFAULT_SHARD),
+    ]
+    assert rows(paths["a"], "SELECT user_id, username FROM users") == [(1, "alice")]
+    assert rows(paths["default"], "SELECT user_id, username FROM users") == [(2, "bob")]
+
+
+def test_requests_of_a_user_run_on_the_users_shard(paths):
+    app = make_app(paths)
+    client = app.test_client()
+    register(client, "alice")
+
+    assert login(client, "alice").status_code == 302
+    response = client.post("/api/categories", json={"name": "Thesis"})
+    listed = client.get("/api/categories").get_json()
+
+    assert response.status_code == 201
+    assert listed == {"categories": [{"category_id": 1, "name": "Thesis"}]}
+    assert rows(paths["a"], "SELECT name, user_id FROM categories") == [("Thesis", 1)]
+    assert rows(paths["default"], "SELECT * FROM categories") == []
+    with app.app_context():
+        assert current_shard() == DEFAULT_SHARD
+
+
+def test_usernames_are_unique_across_shards(paths):
+    client = make_app(paths).test_client()
+    register(client, "alice")
+
+    response = register(client, "alice")
+
+    assert response.get_data(as_text=True) == "Username or e-mail already exists."
+    assert len(rows(paths["default"], "SELECT * FROM user_shards")) == 1
+
+
+def test_users_from_before_sharding_stay_on_the_default_shard(paths):
+    client = make_app(paths, shards=False).test_client()
+    register(client, "legacy")
+    assert rows(paths["default"], "SELECT * FROM user_shards") == []
+
+    client = make_app(paths).test_client()
+    register(client, "alice")
+
+    assert rows(paths["default"], "SELECT user_id, shard FROM user_shards") == [
+        (1, DEFAULT_SHARD),
+        (2, DEFAULT_SHARD),
+    ]
+    assert login(client, "legacy").status_code == 302
+    assert client.get("/api/categories").status_code == 200
+
+
+def test_use_shard_routes_background_work(paths):
+    app = make_app(paths)
+
+    def insert_user():
+        with app.app_context(), use_shard("a"):
+            db.session.add(
+                User(
+                    user_id=7,
+                    username="worker",
+                    email="worker@example.com",
+                    password_hash=generate_password_hash(PASSWORD),
+                    first_name="W",
+                    last_name="T",
+                )
+            )
+            db.session.commit()
+
+    thread = threading.Thread(target=insert_user)
+    thread.start()
+    thread.join()
+
+    assert rows(paths["a"], "SELECT username FROM users") == [("worker",)]
+    assert rows(paths["default"], "SELECT * FROM users") == []
+
+
+def test_shards_get_the_schema_without_the_directory(paths):
+    make_app(paths)
+
+    tables = {name for (name,) in rows(paths["a"], "SELECT name FROM sqlite_master")}
+    assert {"users", "tasks", "time_entries", "categories"} <= tables
+    assert "user_shards" not in tables
+
+
+def test_team_members_of_other_shards_are_found_through_the_directory(paths):
+    app = make_app(paths)
+    client = app.test_client()
+    for username in ("alice", "bob", "carol"):
+        register(client, username)
+
+    with app.app_context(), use_shard("a"):
+        create_new_team("Thesis", user_id=1)
+        other_shard = add_member("bob", "Thesis", "member")
+        same_shard = add_member("carol", "Thesis", "member")
+        missing = add_member("nobody", "Thesis", "member")
+
+    assert other_shard["success"] is True
+    assert same_shard["success"] is True
+    assert missing == {"error": "Username doesn't exists."}
+    assert rows(paths["default"], "SELECT team_id, shard FROM team_shards") == [
+        (1, "a")
+    ]
+    assert rows(paths["a"], "SELECT user_id, role FROM user_teams") == [
+        (1, "admin"),
+        (2, "member"),
+        (3, "member"),
+    ]
+    # bob lives on the default shard, the team's shard holds a copy
+    assert rows(
+        paths["a"],
+        "SELECT user_id, username, password_hash FROM users WHERE user_id = 2",
+    ) == [(2, "bob", "!")]
+    assert len(rows(paths["default"], "SELECT * FROM notifications")) == 2
+    assert rows(paths["a"], "SELECT * FROM notifications WHERE user_id = 2") == []
+
+
+def test_team_requests_run_on_the_teams_shard(paths):
+    app = make_app(paths)
+    alice, bob = app.test_client(), app.test_client()
+    for client, username in ((alice, "alice"), (bob, "bob")):
+        register(client, username)
+        login(client, username)
+
+    team_id = alice.post("/api/teams/", json={"name": "Thesis"}).get_json()["team_id"]
+    added = alice.patch(f"/api/teams/{team_id}/add-member", json={"user_id": "bob"})
+    again = alice.patch(f"/api/teams/{team_id}/add-member", json={"user_id": 2})
+    unknown = alice.patch(f"/api/teams/{team_id}/add-member", json={"user_id": "99"})
+    alice.post(
+        "/api/projects",
+        json={
+            "name": "Draft",
+            "type": "TeamProject",
+            "status": "active",
+            "time_limit_hours": 10,
+            "team_id": team_id,
+        },
+    )
+    # bob's own team is on the default shard, its project has the same id
+    own_team = bob.post("/api/teams/", json={"name": "Lab"}).get_json()["team_id"]
+    bob.post(
+        "/api/projects",
+        json={
+            "name": "Setup",
+            "type": "TeamProject",
+            "status": "active",
+            "time_limit_hours": 10,
+            "team_id": own_team,
+        },
+    )
+
+    assert added.status_code == 200
+    assert again.status_code == 400
+    assert unknown.status_code == 404
+    assert (team_id, own_team) == (1, 2)
+    assert rows(paths["a"], "SELECT user_id, team_id FROM user_teams") == [
+        (1, 1),
+        (2, 1),
+    ]
+    assert [
+        (team["team_id"], team["role"])
+        for team in bob.get("/api/teams/").get_json()["teams"]
+    ] == [(2, "admin"), (1, "member")]
+    assert [
+        (
+            team["name"],
+            [member["username"] for member in team["members"]],
+            [project["name"] for project in team["projects"]],
+        )
+        for team in bob.get("/api/teams/full").get_json()
+    ] == [("Lab", ["bob"], ["Setup"]), ("Thesis", ["alice", "bob"], ["Draft"])]
+    assert bob.get(f"/api/teams/{team_id}/members").get_json() == [
+        {"user_id": 1, "role": "admin"},
+        {"user_id": 2, "role": "member"},
+    ]
+    assert alice.get("/api/teams/users/2").get_json() == {
+        "user_id": 2,
+        "username": "bob",
+    }
+
+
+def test_removing_a_member_of_another_shard(paths):
+    app = make_app(paths)
+    alice = app.test_client()
+    for username in ("alice", "bob"):
+        register(alice, username)
+    login(alice, "alice")
+    team_id = alice.post("/api/teams/", json={"name": "Thesis"}).get_json()["team_id"]
+    alice.patch(f"/api/teams/{team_id}/add-member", json={"user_id": "bob"})
+
+    removed = alice.patch(f"/api/teams/{team_id}/remove-member", json={"user_id": 2})
+    unknown = alice.patch(
+        f"/api/teams/{team_id}/remove-member", json={"user_id": "nobody"}
+    )
+
+    assert removed.status_code == 200
+    assert unknown.status_code == 404
+    assert rows(paths["a"], "SELECT user_id FROM user_teams") == [(1,)]
+
+
+def test_user_copies_follow_profile_edits_and_deletion(paths):
+    app = make_app(paths)
+    alice, bob = app.test_client(), app.test_client()
+    for client, username in ((alice, "alice"), (bob, "bob")):
+        register(client, username)
+        login(client, username)
+    team_id = alice.post("/api/teams/", json={"name": "Thesis"}).get_json()["team_id"]
+    alice.patch(f"/api/teams/{team_id}/add-member", json={"user_id": "bob"})
+
+    bob.post(
+        "/auth/edit/profile/2",
+        data={
+            "username": "robert",
+            "email": "robert@example.com",
+            "password": "",
+            "first_name": "Robert",
+            "last_name": "Tester",
+            "profile_picture": (BytesIO(b""), ""),
+        },
+    )
+    renamed = rows(
+        paths["a"], "SELECT username, first_name FROM users WHERE user_id = 2"
+    )
+    bob.post("/auth/user/delete/2")
+
+    assert renamed == [("robert", "Robert")]
+    assert rows(paths["a"], "SELECT user_id FROM users") == [(1,)]
+    assert rows(paths["a"], "SELECT user_id FROM user_teams") == [(1,)]
+    assert rows(paths["default"], "SELECT user_id FROM users") == []
+
+
+def test_teams_from_before_the_directory_keep_their_ids(paths):
+    client = make_app(paths).test_client()
+    for username in ("alice", "bob"):
+        register(client, username)
+    for path, name in ((paths["default"], "Old"), (paths["a"], "Older")):
+        connection = sqlite3.connect(path)
+        connection.execute("INSERT INTO teams (name) VALUES (?)", (name,))
+        connection.commit()
+        connection.close()
+
+    app = make_app(paths)
+    with app.app_context():
+        team = create_new_team("New", user_id=2)
+
+    # team 1 of shard a collides with the primary's and gets no entry
+    assert rows(paths["default"], "SELECT team_id, shard FROM team_shards") == [
+        (1, DEFAULT_SHARD),
+        (2, DEFAULT_SHARD),
+    ]
+    assert team["team_id"] == 2
+
+
+def test_metrics_count_the_active_timers_of_all_shards(paths, tmp_path):
+    reader = {"url": f"sqlite:///file:{paths['default']}?mode=ro&uri=true"}
+    app = make_app(
+        paths,
+        SQLALCHEMY_READ_BINDS={"reader": reader},
+        METRICS_TOKEN="secret",
+        METRICS_DB_PATH=str(tmp_path / "metrics.db"),
+    )
+    for path, count in ((paths["default"], 1), (paths["a"], 2)):
+        connection = sqlite3.connect(path)
+        connection.executemany(
+            "INSERT INTO time_entries (user_id, task_id, start_time)"
+            " VALUES (1, 1, '2026-10-19 08:00:00')",
+            [()] * count,
+        )
+        connection.commit()
+        connection.close()
+
+    response = app.test_client().get(
+        "/metrics", headers={"Authorization": "Bearer secret"}
+    )
+
+    assert "clockwise_active_timers 3" in response.get_data(as_text=True)
@@ -0,0 +1,139 @@
+import os
+import sqlite3
+import time
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine
+
+from backend.database import ANALYTICS_BIND, READ_BIND, RoutingSession, db, read_only
+from backend.models import Project
+from backend.services.snapshot_service import (
+    discard_stale_snapshot,
+    get_snapshot_refreshed_at,
+    refresh_analytics_snapshot,
+    start_snapshot_process,
+    stop_snapshot_process,
+)
+
+
+def make_live_database(path, rows):
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("CREATE TABLE entries (id INTEGER PRIMARY KEY, note TEXT)")
+    connection.executemany(
+        "INSERT INTO entries (note) VALUES (?)", [("x" * 500,)] * rows
+    )
+    connection.commit()
+    return connection
+
+
+def test_refresh_analytics_snapshot_copies_in_batches(tmp_path):
+    live_path, snapshot_path = str(tmp_path / "live.db"), str(tmp_path / "analytics.db")
+    live = make_live_database(live_path, rows=200)
+
+    before = time.time()
+    refreshed_at = refresh_analytics_snapshot(
+        live_path, snapshot_path, pages=2, sleep=0
+    )
+
+    snapshot = sqlite3.connect(f"file:{snapshot_path}?mode=ro", uri=True)
+    assert snapshot.execute("SELECT COUNT(*) FROM entries").fetchone()[0] == 200
+    assert snapshot.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    snapshot.close()
+
+    assert refreshed_at.timestamp() >= int(before)
+    assert get_snapshot_refreshed_at(snapshot_path) == refreshed_at
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+    # later writes only show up after the next refresh
+    live.execute("DELETE FROM entries")
+    live.commit()
+    refresh_analytics_snapshot(live_path, snapshot_path)
+    snapshot = sqlite3.connect(f"file:{snapshot_path}?mode=ro", uri=True)
+    assert snapshot.execute("SELECT COUNT(*) FROM entries").fetchone()[0] == 0
+    snapshot.close()
+    live.close()
+
+
+def test_refresh_is_not_restarted_by_concurrent_commits(tmp_path):
+    live_path, snapshot_path = str(tmp_path / "live.db"), str(tmp_path / "analytics.db")
+    live = make_live_database(live_path, rows=200)
+    steps = []
+
+    def commit_between_steps(status, remaining, total):
+        steps.append(remaining)
+        if len(steps) < 100:
+            live.execute("INSERT INTO entries (note) VALUES ('later')")
+            live.commit()
+
+    refresh_analytics_snapshot(
+        live_path, snapshot_path, pages=5, sleep=0, progress=commit_between_steps
+    )
+
+    # every step made progress and the copy is the state of its start
+    assert steps == sorted(steps, reverse=True)
+    snapshot = sqlite3.connect(f"file:{snapshot_path}?mode=ro", uri=True)
+    assert snapshot.execute("SELECT COUNT(*) FROM entries").fetchone()[0] == 200
+    snapshot.close()
+    live.close()
+
+
+def test_snapshot_is_discarded_after_a_schema_change(tmp_path):
+    live_path, snapshot_path = str(tmp_path / "live.db"), str(tmp_path / "analytics.db")
+    live = make_live_database(live_path, rows=1)
+    app = SimpleNamespace(
+        config={"DATABASE_PATH": live_path, "ANALYTICS_SNAPSHOT_PATH": snapshot_path}
+    )
+    refresh_analytics_snapshot(live_path, snapshot_path)
+
+    live.execute("INSERT INTO entries (note) VALUES ('data only')")
+    live.commit()
+    assert discard_stale_snapshot(app) is False
+    assert os.path.exists(snapshot_path)
+
+    live.execute("CREATE VIEW entry_history AS SELECT * FROM entries")
+    live.commit()
+    assert discard_stale_snapshot(app) is True
+    assert not os.path.exists(snapshot_path)
+    live.close()
+
+
+def test_snapshot_is_refreshed_by_a_separate_process(tmp_path):
+    live_path, snapshot_path = str(tmp_path / "live.db"), str(tmp_path / "analytics.db")
+    make_live_database(live_path, rows=10).close()
+    app = SimpleNamespace(
+        testing=False,
+        config={
+            "DATABASE_PATH": live_path,
+            "ANALYTICS_SNAPSHOT_PATH": snapshot_path,
+            "ANALYTICS_SNAPSHOT_INTERVAL": 60,
+        },
+    )
+
+    pid = start_snapshot_process(app)
+    try:
+        deadline = time.monotonic() + 10
+        while not os.path.exists(snapshot_path) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert os.path.exists(snapshot_path)
+    finally:
+        stop_snapshot_process(pid)
+        os.waitpid(pid, 0)
+
+
+def test_get_snapshot_refreshed_at_without_snapshot(tmp_path):
+    assert get_snapshot_refreshed_at(str(tmp_path / "missing.db")) is None
+
+
+def test_analytics_reads_use_snapshot_once_it_exists(app, tmp_path, monkeypatch):
+    snapshot_path = tmp_path / "analytics.db"
+    snapshot = create_engine(f"sqlite:///file:{snapshot_path}?mode=ro&uri=true")
+    engines = dict(app.extensions["read_engines"], **{ANALYTICS_BIND: snapshot})
+    monkeypatch.setitem(app.extensions, "read_engines", engines)
+    session = RoutingSession(db)
+
+    with read_only(ANALYTICS_BIND):
+        assert session.get_bind(mapper=Project) is engines[READ_BIND]
+        snapshot_path.touch()
+        assert session.get_bind(mapper=Project) is snapshot
+    session.close()
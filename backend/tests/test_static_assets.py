@@ -0,0 +1,156 @@
+import gzip
+import os
+from unittest.mock import patch
+
+import pytest
+from flask import Flask, render_template_string
+
+from backend.static_assets import (
+    AssetManifest,
+    compress_static_files,
+    init_static_assets,
+)
+
+CSS = b"body { color: #222; }\n" * 100
+
+
+@pytest.fixture()
+def static_folder(tmp_path):
+    folder = tmp_path / "static"
+    (folder / "js").mkdir(parents=True)
+    (folder / "profile_pictures").mkdir()
+    (folder / "site.css").write_bytes(CSS)
+    (folder / "js" / "tiny.js").write_bytes(b"let a = 1;\n")
+    (folder / "profile_pictures" / "me.png").write_bytes(b"\x89PNG")
+    return folder
+
+
+def make_app(folder, **config):
+    app = Flask(__name__, static_folder=str(folder))
+    app.config.update(
+        {
+            "STATIC_MANIFEST_ENABLED": True,
+            "STATIC_MANIFEST_EXCLUDE": ["profile_pictures"],
+            "STATIC_IMMUTABLE_MAX_AGE": 31536000,
+            **config,
+        }
+    )
+    init_static_assets(app)
+    return app
+
+
+def static_url(app, filename):
+    with app.test_request_context():
+        return render_template_string(
+            "{{ url_for('static', filename=name) }}", name=filename
+        )
+
+
+def test_manifest_hashes_content_and_skips_excluded_folders(static_folder):
+    manifest = AssetManifest(str(static_folder), ["profile_pictures"])
+
+    assert set(manifest.urls) == {"site.css", "js/tiny.js"}
+    stem, digest, extension = manifest.urls["site.css"].split(".")
+    assert (stem, extension, len(digest)) == ("site", "css", 12)
+
+    (static_folder / "site.css").write_bytes(CSS + b"a { }\n")
+    assert (
+        AssetManifest(str(static_folder)).urls["site.css"] != manifest.urls["site.css"]
+    )
+
+
+def test_template_urls_do_not_touch_the_filesystem(static_folder):
+    app = make_app(static_folder)
+    hashed = app.extensions["static_assets"].urls["site.css"]
+
+    with patch("os.stat") as stat, patch("os.path.exists") as exists:
+        url = static_url(app, "site.css")
+
+    assert url == f"/static/{hashed}"
+    stat.assert_not_called()
+    exists.assert_not_called()
+    assert (
+        static_url(app, "profile_pictures/me.png") == "/static/profile_pictures/me.png"
+    )
+
+
+def test_hashed_url_is_immutable(static_folder):
+    app = make_app(static_folder)
+    client = app.test_client()
+
+    response = client.get(static_url(app, "site.css"))
+
+    assert response.status_code == 200
+    assert response.data == CSS
+    assert response.mimetype == "text/css"
+    assert response.cache_control.immutable
+    assert response.cache_control.public
+    assert response.cache_control.max_age == 31536000
+    assert "Content-Encoding" not in response.headers
+
+
+def test_unhashed_names_are_served_as_before(static_folder):
+    client = make_app(static_folder).test_client()
+
+    response = client.get("/static/profile_pictures/me.png")
+
+    assert response.status_code == 200
+    assert not response.cache_control.immutable
+    assert client.get("/static/missing.css").status_code == 404
+
+
+def test_precompressed_variant_is_served_when_accepted(static_folder):
+    written = compress_static_files(str(static_folder), ["profile_pictures"])
+    assert "gzip" in written["site.css"]
+    # too small to be worth it
+    assert "js/tiny.js" not in written
+
+    app = make_app(static_folder)
+    client = app.test_client()
+    url = static_url(app, "site.css")
+
+    compressed = client.get(url, headers={"Accept-Encoding": "gzip, deflate"})
+    plain = client.get(url, headers={"Accept-Encoding": "identity"})
+
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert compressed.mimetype == "text/css"
+    assert "Accept-Encoding" in compressed.vary
+    assert gzip.decompress(compressed.data) == CSS
+    assert "Content-Encoding" not in plain.headers
+    assert plain.data == CSS
+    assert "Accept-Encoding" in plain.vary
+
+
+def test_outdated_variant_is_ignored(static_folder):
+    compress_static_files(str(static_folder))
+    source = static_folder / "site.css"
+    variant = static_folder / "site.css.gz"
+    os.utime(variant, (0, 0))
+
+    app = make_app(static_folder)
+    response = app.test_client().get(
+        static_url(app, "site.css"), headers={"Accept-Encoding": "gzip"}
+    )
+
+    assert response.data == source.read_bytes()
+    assert "Content-Encoding" not in response.headers
+
+
+def test_manifest_can_be_disabled(static_folder):
+    app = make_app(static_folder, STATIC_MANIFEST_ENABLED=False)
+
+    assert static_url(app, "site.css") == "/static/site.css"
+    assert "static_assets" not in app.extensions
+
+
+def test_app_serves_static_files_without_session_cookie(tmp_path):
+    from app import create_app
+
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'app.db'}"})
+    client = app.test_client()
+
+    response = client.get(static_url(app, "navbar.css"))
+
+    assert response.status_code == 200
+    assert response.cache_control.immutable
+    assert "Set-Cookie" not in response.headers
@@ -0,0 +1,59 @@
+import json
+import logging
+
+from backend.structured_logging import JsonFormatter, KeyValueFormatter, get_logger
+from backend.tracing import Span, _current_span
+
+log = get_logger("backend.tests.logging")
+
+
+def test_disabled_level_does_not_evaluate_fields(caplog):
+    caplog.set_level(logging.INFO, logger="backend.tests.logging")
+    calls = []
+
+    log.debug("projects.listed", project_ids=lambda: calls.append(1))
+
+    assert calls == []
+    assert caplog.records == []
+
+
+def test_enabled_level_resolves_lazy_fields(caplog):
+    caplog.set_level(logging.DEBUG, logger="backend.tests.logging")
+
+    log.debug("projects.listed", project_ids=lambda: [1, 2], user_id=7)
+
+    record = caplog.records[0]
+    assert record.getMessage() == "projects.listed"
+    assert record.fields == {"project_ids": [1, 2], "user_id": 7}
+
+
+def test_sampling_drops_and_marks_events(caplog, monkeypatch):
+    caplog.set_level(logging.INFO, logger="backend.tests.logging")
+    monkeypatch.setattr("backend.structured_logging.random.random", lambda: 0.5)
+
+    log.info("request.finished", sample=0.1)
+    log.info("request.finished", sample=0.9)
+
+    assert len(caplog.records) == 1
+    assert caplog.records[0].fields == {"sample_rate": 0.9}
+
+
+def test_formatters_include_fields_and_trace():
+    record = logging.LogRecord(
+        "backend.routes", logging.INFO, __file__, 1, "projects.exported", (), None
+    )
+    record.fields = {"format": "csv", "bytes": 120}
+    root = Span("GET /api/projects/export/projects/csv", kind="SERVER")
+    token = _current_span.set(root)
+    try:
+        entry = json.loads(JsonFormatter().format(record))
+        text = KeyValueFormatter().format(record)
+    finally:
+        _current_span.reset(token)
+
+    assert entry["event"] == "projects.exported"
+    assert entry["level"] == "info"
+    assert entry["format"] == "csv"
+    assert entry["bytes"] == 120
+    assert entry["trace_id"] == root.trace_id
+    assert "projects.exported format='csv' bytes=120" in text
@@ -13,6 +13,7 @@ from backend.services.task_service import (
     get_tasks_without_time_entries,
     update_total_duration_for_task,
     get_unassigned_tasks,
+    unassign_tasks_for_user_in_team,
 )
 
 @pytest.fixture()
@@ -170,3 +171,69 @@ def test_get_unassigned_tasks(db_session, test_user):
 
     assert unassigned_task in results
     assert project_task not in results
+
+
+def test_unassign_tasks_for_user_in_team_all_team_projects(db_session, test_user):
+    from backend.models import Team
+
+    team = Team(name="BulkTeam")
+    db_session.add(team)
+    db_session.commit()
+
+    projects = [
+        Project(name=f"TP{i}", time_limit_hours=5, user_id=test_user.user_id, team_id=team.team_id)
+        for i in range(2)
+    ]
+    db_session.add_all(projects)
+    db_session.commit()
+
+    db_session.add_all(
+        [
+            Task(title="A", project_id=projects[0].project_id, member_id=test_user.user_id),
+            Task(title="B", project_id=projects[1].project_id, member_id=test_user.user_id),
+            Task(title="C", project_id=projects[1].project_id, user_id=test_user.user_id),
+        ]
+    )
+    db_session.commit()
+
+    unassign_tasks_for_user_in_team(test_user.user_id, team.team_id)
+
+    assert Task.query.filter_by(member_id=test_user.user_id).count() == 0
+    assert Task.query.filter_by(user_id=test_user.user_id).count() == 0
+
+
+def test_update_task_unassign_adjusts_project_hours(db_session, test_user, monkeypatch):
+    from backend.models import Team
+
+    monkeypatch.setattr("backend.services.task_service.current_user", test_user)
+    team = Team(name="HoursTeam")
+    db_session.add(team)
+    db_session.commit()
+
+    project = Project(
+        name="Hours",
+        time_limit_hours=5,
+        current_hours=1.5,
+        user_id=test_user.user_id,
+        team_id=team.team_id,
+    )
+    db_session.add(project)
+    db_session.commit()
+
+    task = Task(
+        title="Tracked",
+        project_id=project.project_id,
+        member_id=test_user.user_id,
+        total_duration_seconds=3600,
+    )
+    db_session.add(task)
+    db_session.commit()
+    db_session.add(TimeEntry(user_id=test_user.user_id, task_id=task.task_id, duration_seconds=3600))
+    db_session.commit()
+
+    result = update_task(task.task_id, member_id=None)
+
+    assert result["success"]
+    assert TimeEntry.query.filter_by(task_id=task.task_id).count() == 0
+    assert Task.query.get(task.task_id).total_duration_seconds == 0
+    assert Project.query.get(project.project_id).current_hours == 0.5
@@ -13,6 +13,7 @@ from backend.services.team_service import (
     get_team_members,
     delete_team_and_related,
     get_teams,
+    get_team_overview,
 )
 
 
@@ -159,6 +160,42 @@ def test_get_teams_with_projects(db_session, setup_user_team):
     assert {p.name for p in result[0]["projects"]} == {"P1", "P2"}
 
 
+def test_get_team_overview_batches_members_and_projects(db_session, setup_user_team):
+    user = setup_user_team
+    other = User(
+        username="teammate",
+        email="teammate@example.com",
+        password_hash="hashed",
+        first_name="Team",
+        last_name="Mate",
+    )
+    team = Team(name="Overview")
+    db_session.add_all([other, team])
+    db_session.commit()
+
+    db_session.add_all(
+        [
+            UserTeam(user_id=user.user_id, team_id=team.team_id, role="admin"),
+            UserTeam(user_id=other.user_id, team_id=team.team_id, role="member"),
+        ]
+    )
+    project = Project(name="Shared", team_id=team.team_id, user_id=user.user_id, time_limit_hours=10)
+    db_session.add(project)
+    db_session.commit()
+    db_session.add(Task(project_id=project.project_id, total_duration_seconds=7200))
+    db_session.commit()
+
+    overview = get_team_overview(user.user_id)
+
+    assert len(overview) == 1
+    assert overview[0]["team"].name == "Overview"
+    assert overview[0]["role"] == "admin"
+    assert {m["username"] for m in overview[0]["members"]} == {"notifyuser", "teammate"}
+    assert [p.name for p in overview[0]["projects"]] == ["Shared"]
+    assert overview[0]["projects"][0].duration_readable == "2h 0min 0s"
+    assert get_team_overview(other.user_id)[0]["role"] == "member"
+
+
 def test_check_admin_true_and_false(db_session, setup_user_team):
     user = setup_user_team
 
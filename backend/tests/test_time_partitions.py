@@ -0,0 +1,245 @@
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from app import create_app
+from backend.database import RoutingSession, db
+from backend.models import Project, Task, TimeEntry, TimeEntryHistory, User
+from backend.services.project_service import purge_project
+from backend.services.task_service import update_total_duration_for_task
+from backend.services.time_entry_service import (
+    get_time_entries_by_task,
+    update_time_entry,
+)
+from backend.services.time_partition_service import (
+    compact_time_entries,
+    hot_tier_start,
+    list_partitions,
+)
+
+NOW = datetime(2025, 3, 15, 12, 0)
+
+
+def rows(path, query):
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute(query).fetchall()
+    finally:
+        connection.close()
+
+
+@pytest.fixture(autouse=True)
+def routing_session(monkeypatch):
+    # the db_session fixture leaves db.session bound to one connection
+    monkeypatch.setattr(
+        db, "session", db._make_scoped_session({"class_": RoutingSession})
+    )
+
+
+@pytest.fixture()
+def path(tmp_path):
+    return tmp_path / "primary.db"
+
+
+@pytest.fixture()
+def app(path):
+    return create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+            "METRICS_ENABLED": False,
+            "ANALYTICS_SNAPSHOT_INTERVAL": 0,
+        }
+    )
+
+
+@pytest.fixture()
+def entries(app):
+    """Entries that ended in December, January, February and March, one running."""
+    with app.app_context():
+        user = User(
+            username="archivist",
+            email="archivist@example.com",
+            password_hash="hashed",
+            first_name="Ada",
+            last_name="Archer",
+        )
+        db.session.add(user)
+        db.session.flush()
+        task = Task(title="History", user_id=user.user_id)
+        db.session.add(task)
+        db.session.flush()
+        for start, end in [
+            (datetime(2024, 12, 31, 23), datetime(2025, 1, 1, 1)),
+            (datetime(2024, 12, 2, 9), datetime(2024, 12, 2, 10)),
+            (datetime(2025, 1, 10, 9), datetime(2025, 1, 10, 11)),
+            (datetime(2025, 2, 3, 9), datetime(2025, 2, 3, 10)),
+            (datetime(2025, 3, 1, 9), datetime(2025, 3, 1, 10)),
+            (datetime(2025, 3, 15, 9), None),
+        ]:
+            db.session.add(
+                TimeEntry(
+                    user_id=user.user_id,
+                    task_id=task.task_id,
+                    start_time=start,
+                    end_time=end,
+                    duration_seconds=(
+                        int((end - start).total_seconds()) if end else None
+                    ),
+                )
+            )
+        db.session.commit()
+        return task.task_id
+
+
+def test_hot_tier_starts_with_the_previous_month():
+    assert hot_tier_start(NOW) == datetime(2025, 2, 1)
+    assert hot_tier_start(datetime(2025, 1, 5), hot_months=3) == datetime(2024, 11, 1)
+    assert hot_tier_start(NOW, hot_months=1) == datetime(2025, 3, 1)
+
+
+def test_compaction_moves_old_months_into_partitions(app, path, entries):
+    moved = compact_time_entries(_engine(app), NOW)
+
+    assert moved == {"time_entries_2024_12": 1, "time_entries_2025_01": 2}
+    assert rows(path, "SELECT end_time FROM time_entries ORDER BY time_entry_id") == [
+        ("2025-02-03 10:00:00.000000",),
+        ("2025-03-01 10:00:00.000000",),
+        (None,),
+    ]
+    # the entry that ended on January 1st belongs to January
+    assert rows(path, "SELECT time_entry_id FROM time_entries_2025_01") == [(1,), (3,)]
+    assert rows(path, "SELECT COUNT(*) FROM time_entry_history") == [(6,)]
+
+    # nothing left to move
+    assert compact_time_entries(_engine(app), NOW) == {}
+
+
+def test_history_reads_include_archived_entries(app, entries):
+    compact_time_entries(_engine(app), NOW)
+
+    with app.app_context():
+        assert len(TimeEntry.query.all()) == 3
+        history = get_time_entries_by_task(entries)
+        assert sorted(entry.time_entry_id for entry in history) == [1, 2, 3, 4, 5, 6]
+        assert all(entry.task.title == "History" for entry in history)
+        assert (
+            update_total_duration_for_task(entries)["total_duration_seconds"]
+            == (2 + 1 + 2 + 1 + 1) * 3600
+        )
+
+
+def test_changing_an_archived_entry_thaws_it(app, path, entries):
+    compact_time_entries(_engine(app), NOW)
+
+    with app.app_context():
+        result = update_time_entry(2, comment="corrected")
+        assert result["success"]
+        history = db.session.query(TimeEntryHistory).filter_by(time_entry_id=2)
+        assert history.one().comment == "corrected"
+
+    assert rows(path, "SELECT comment FROM time_entries WHERE time_entry_id = 2") == [
+        ("corrected",)
+    ]
+    assert rows(path, "SELECT COUNT(*) FROM time_entries_2024_12") == [(0,)]
+
+    # the next compaction archives it again
+    assert compact_time_entries(_engine(app), NOW) == {"time_entries_2024_12": 1}
+
+
+def test_archived_ids_are_not_reused(app, path, entries):
+    # a table created before the partitioning, without AUTOINCREMENT
+    connection = sqlite3.connect(path)
+    connection.executescript("""
+        DROP VIEW time_entry_history;
+        CREATE TABLE old AS SELECT * FROM time_entries;
+        DROP TABLE time_entries;
+        CREATE TABLE time_entries (
+            time_entry_id INTEGER NOT NULL PRIMARY KEY,
+            user_id INTEGER NOT NULL REFERENCES users (user_id) ON DELETE CASCADE,
+            task_id INTEGER NOT NULL REFERENCES tasks (task_id) ON DELETE CASCADE,
+            start_time DATETIME, end_time DATETIME,
+            duration_seconds INTEGER, comment VARCHAR
+        );
+        INSERT INTO time_entries SELECT * FROM old;
+        DROP TABLE old;
+        CREATE VIEW time_entry_history AS SELECT * FROM time_entries;
+        """)
+    connection.close()
+
+    compact_time_entries(_engine(app), datetime(2025, 6, 1))
+    connection = sqlite3.connect(path)
+    connection.execute("DELETE FROM time_entries")
+    connection.execute(
+        "INSERT INTO time_entries (user_id, task_id, start_time) VALUES (1, 1, NULL)"
+    )
+    connection.commit()
+    connection.close()
+
+    assert rows(path, "SELECT time_entry_id FROM time_entries") == [(7,)]
+    assert rows(path, "SELECT COUNT(*) FROM time_entry_history") == [(6,)]
+    assert (
+        len(
+            rows(
+                path,
+                "SELECT * FROM sqlite_master WHERE type = 'index'"
+                " AND tbl_name = 'time_entries'",
+            )
+        )
+        == 3
+    )
+
+
+def test_deleting_the_task_cascades_into_the_partitions(app, path, entries):
+    compact_time_entries(_engine(app), NOW)
+
+    with app.app_context():
+        db.session.delete(db.session.get(Task, entries))
+        db.session.commit()
+        assert list_partitions(db.session.connection()) == [
+            "time_entries_2024_12",
+            "time_entries_2025_01",
+        ]
+
+    assert rows(path, "SELECT COUNT(*) FROM time_entry_history") == [(0,)]
+
+
+def test_purge_deletes_archived_entries_in_chunks(app, path, entries, monkeypatch):
+    compact_time_entries(_engine(app), NOW)
+    with app.app_context():
+        project = Project(name="Archive", user_id=1, time_limit_hours=10)
+        db.session.add(project)
+        db.session.flush()
+        db.session.get(Task, entries).project_id = project.project_id
+        db.session.commit()
+        project_id = project.project_id
+
+        commits = []
+        commit = db.session.commit
+
+        def counting_commit():
+            commits.append(rows(path, "SELECT COUNT(*) FROM time_entry_history")[0])
+            commit()
+
+        monkeypatch.setattr(db.session, "commit", counting_commit)
+        result = purge_project(project_id, chunk_size=2)
+
+    assert result == {"time_entries": 6, "tasks": 1}
+    assert rows(path, "SELECT COUNT(*) FROM time_entry_history") == [(0,)]
+    # no commit removed more than one chunk of entries
+    remaining = [6] + [count for (count,) in commits]
+    assert all(a - b <= 2 for a, b in zip(remaining, remaining[1:]))
+
+
+def test_cli_compacts_the_database(app, path, entries):
+    with app.app_context():
+        result = app.test_cli_runner().invoke(args=["compact-time-entries"])
+
+    assert result.exit_code == 0
+    assert "default: moved" in result.output
+    assert rows(path, "SELECT COUNT(*) FROM time_entries") == [(1,)]
+
+
+def _engine(app):
+    with app.app_context():
+        return db.engine
@@ -0,0 +1,113 @@
+import json
+
+import pytest
+from sqlalchemy import event
+
+from app import create_app
+from backend.database import db
+from backend.services import project_service
+from backend.tracing import (
+    Span,
+    _after_cursor_execute,
+    _before_cursor_execute,
+    _current_span,
+    current_span,
+    export_trace,
+    span,
+)
+
+
+@pytest.fixture
+def root_span():
+    root = Span("GET /api/projects", kind="SERVER")
+    token = _current_span.set(root)
+    yield root
+    _current_span.reset(token)
+
+
+@pytest.fixture
+def sql_spans(app):
+    event.listen(db.engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(db.engine, "after_cursor_execute", _after_cursor_execute)
+    yield
+    event.remove(db.engine, "before_cursor_execute", _before_cursor_execute)
+    event.remove(db.engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def test_traced_is_a_no_op_outside_of_a_trace():
+    assert current_span() is None
+    data = {"own_projects": [], "team_projects": []}
+    assert project_service.export_project_info_csv(data).startswith("Bereich,Projekt")
+
+
+def test_service_and_sql_spans_nest_under_the_request(root_span, sql_spans, db_session):
+    project_service.count_project_time_entries(1)
+    root_span.end()
+
+    service = next(s for s in root_span.trace if s.name.startswith("project_service."))
+    sql = next(s for s in root_span.trace if s.kind == "CLIENT")
+    assert service.name == "project_service.count_project_time_entries"
+    assert service.parent_span_id == root_span.span_id
+    assert sql.parent_span_id == service.span_id
+    assert sql.name == "SELECT"
+    assert "time_entry_history" in sql.attributes["db.statement"]
+    assert {s.trace_id for s in root_span.trace} == {root_span.trace_id}
+
+
+def test_failing_span_is_marked_as_error(root_span):
+    with pytest.raises(ValueError):
+        with span("render"):
+            raise ValueError("broken")
+
+    failed = root_span.trace[0]
+    assert failed.status == 2
+    assert failed.status_message == "ValueError: broken"
+
+
+def test_export_trace_writes_otlp_json_lines(root_span, tmp_path):
+    with span("project_service.export_project_info_pdf", projects=3):
+        pass
+    root_span.attributes["http.status_code"] = 200
+    root_span.end()
+    path = tmp_path / "traces.jsonl"
+
+    export_trace(root_span.trace, str(path))
+    export_trace(root_span.trace, str(path))
+
+    lines = path.read_text().splitlines()
+    assert len(lines) == 2
+    resource_spans = json.loads(lines[0])["resourceSpans"][0]
+    assert resource_spans["resource"]["attributes"][0]["value"] == {
+        "stringValue": "clockwise"
+    }
+    spans = resource_spans["scopeSpans"][0]["spans"]
+    assert [s["name"] for s in spans] == [
+        "project_service.export_project_info_pdf",
+        "GET /api/projects",
+    ]
+    child, root = spans
+    assert child["parentSpanId"] == root["spanId"]
+    assert root["kind"] == 2
+    assert {"key": "projects", "value": {"intValue": "3"}} in child["attributes"]
+    assert int(root["endTimeUnixNano"]) >= int(child["endTimeUnixNano"])
+
+
+def test_request_trace_leaves_out_the_query_string(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'trace.db'}",
+            "TRACING_ENABLED": True,
+            "TRACING_FILE": str(path),
+            "METRICS_ENABLED": False,
+            "ANALYTICS_SNAPSHOT_INTERVAL": 0,
+        }
+    )
+
+    app.test_client().get("/?profile=memory&profile_token=secret")
+
+    assert "secret" not in path.read_text()
+    spans = json.loads(path.read_text())["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert {"key": "http.target", "value": {"stringValue": "/"}} in spans[-1][
+        "attributes"
+    ]
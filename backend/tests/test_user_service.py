@@ -2,8 +2,8 @@ import io
 
 from werkzeug.datastructures import FileStorage
 
-from backend.models import User
-from backend.services.user_service import register_user
+from backend.models import Project, Task, Team, TimeEntry, User, UserTeam
+from backend.services.user_service import delete_user, register_user
 
 
 def test_register_user_success(db_session, client, monkeypatch):
@@ -66,3 +66,144 @@ def test_register_user_duplicate(db_session, client):
 
     assert "error" in result
     assert result["error"] == "Username or e-mail already exists."
+
+
+def test_delete_user_removes_owned_rows(db_session, client):
+    """Test that deleting a user removes their rows via ON DELETE CASCADE.
+
+    Args:
+        db_session (Session): SQLAlchemy test session fixture.
+        client (FlaskClient): Flask test client.
+    """
+    user = User(
+        username="leaving",
+        email="leaving@example.com",
+        password_hash="hashed",
+        first_name="John",
+        last_name="Doe",
+    )
+    db_session.add(user)
+    db_session.commit()
+
+    project = Project(name="Owned", user_id=user.user_id, time_limit_hours=1)
+    db_session.add(project)
+    db_session.commit()
+    task = Task(title="Owned task", project_id=project.project_id, user_id=user.user_id)
+    db_session.add(task)
+    db_session.commit()
+    db_session.add(TimeEntry(user_id=user.user_id, task_id=task.task_id))
+    db_session.commit()
+    user_id, project_id = user.user_id, project.project_id
+
+    result = delete_user(user_id)
+
+    assert result["success"] is True
+    assert User.query.filter_by(user_id=user_id).first() is None
+    assert Project.query.filter_by(project_id=project_id).first() is None
+    assert TimeEntry.query.filter_by(user_id=user_id).count() == 0
+
+
+def test_delete_user_hands_over_team_projects(db_session, client):
+    """Test that the team projects of a deleted user go to another team member.
+
+    Args:
+        db_session (Session): SQLAlchemy test session fixture.
+        client (FlaskClient): Flask test client.
+    """
+    leaving, member, admin = [
+        User(
+            username=name,
+            email=f"{name}@example.com",
+            password_hash="hashed",
+            first_name="John",
+            last_name="Doe",
+        )
+        for name in ("leaving", "member", "admin")
+    ]
+    team, lonely_team = Team(name="Team"), Team(name="Lonely team")
+    db_session.add_all([leaving, member, admin, team, lonely_team])
+    db_session.commit()
+    db_session.add_all(
+        [
+            UserTeam(user_id=leaving.user_id, team_id=team.team_id, role="admin"),
+            UserTeam(user_id=member.user_id, team_id=team.team_id, role="member"),
+            UserTeam(user_id=admin.user_id, team_id=team.team_id, role="admin"),
+            UserTeam(user_id=leaving.user_id, team_id=lonely_team.team_id),
+        ]
+    )
+    project = Project(
+        name="Team project",
+        user_id=leaving.user_id,
+        team_id=team.team_id,
+        time_limit_hours=1,
+    )
+    lonely_project = Project(
+        name="Lonely project",
+        user_id=leaving.user_id,
+        team_id=lonely_team.team_id,
+        time_limit_hours=1,
+    )
+    db_session.add_all([project, lonely_project])
+    db_session.commit()
+    project_id, lonely_project_id = project.project_id, lonely_project.project_id
+
+    result = delete_user(leaving.user_id)
+
+    assert result["success"] is True
+    assert db_session.get(Project, project_id).user_id == admin.user_id
+    assert db_session.get(Project, lonely_project_id).user_id is None
+
+
+def test_delete_user_subtracts_tracked_time(db_session, client):
+    """Test that the time of a deleted member leaves the task and project totals.
+
+    Args:
+        db_session (Session): SQLAlchemy test session fixture.
+        client (FlaskClient): Flask test client.
+    """
+    admin, leaving = [
+        User(
+            username=name,
+            email=f"{name}@example.com",
+            password_hash="hashed",
+            first_name="John",
+            last_name="Doe",
+        )
+        for name in ("admin", "leaving")
+    ]
+    team = Team(name="Team")
+    db_session.add_all([admin, leaving, team])
+    db_session.commit()
+    project = Project(
+        name="Team project",
+        user_id=admin.user_id,
+        team_id=team.team_id,
+        time_limit_hours=10,
+        current_hours=3.0,
+    )
+    db_session.add(project)
+    db_session.commit()
+    task = Task(
+        title="Shared task",
+        project_id=project.project_id,
+        member_id=leaving.user_id,
+        total_duration_seconds=3 * 3600,
+    )
+    db_session.add(task)
+    db_session.commit()
+    db_session.add_all(
+        [
+            TimeEntry(
+                user_id=user.user_id, task_id=task.task_id, duration_seconds=seconds
+            )
+            for user, seconds in [(admin, 3600), (leaving, 7200)]
+        ]
+    )
+    db_session.commit()
+    project_id, task_id = project.project_id, task.task_id
+
+    result = delete_user(leaving.user_id)
+
+    assert result["success"] is True
+    assert db_session.get(Task, task_id).total_duration_seconds == 3600
+    assert db_session.get(Project, project_id).current_hours == 1.0
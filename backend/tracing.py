@@ -0,0 +1,269 @@
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from flask import g, request
+from sqlalchemy import event
+
+from backend.database import db
+
+SPAN_KIND = {"INTERNAL": 1, "SERVER": 2, "CLIENT": 3}
+STATUS_UNSET, STATUS_OK, STATUS_ERROR = 0, 1, 2
+
+_current_span = ContextVar("current_span", default=None)
+_export_lock = threading.Lock()
+
+
+class Span:
+    """One timed operation of a trace.
+
+    Attributes:
+        name (str): Operation name, e.g. "GET /api/projects" or a function.
+        trace (list[Span]): Finished spans of the trace this span belongs to.
+        trace_id (str): 32 hex characters shared by all spans of a trace.
+        span_id (str): 16 hex characters.
+        parent_span_id (str): Span id of the parent, empty for the root.
+        kind (str): "SERVER", "INTERNAL" or "CLIENT".
+        attributes (dict): Extra key/value data.
+    """
+
+    def __init__(self, name, kind="INTERNAL", parent=None, **attributes):
+        self.name = name
+        self.kind = kind
+        self.trace = parent.trace if parent else []
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent.span_id if parent else ""
+        self.attributes = attributes
+        self.status = STATUS_UNSET
+        self.status_message = ""
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+
+    def set_error(self, error):
+        self.status = STATUS_ERROR
+        self.status_message = f"{type(error).__name__}: {error}"
+
+    def end(self):
+        self.end_ns = time.time_ns()
+        self.trace.append(self)
+
+    def to_otlp(self):
+        """Return the span in the OTLP/JSON encoding."""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_span_id,
+            "name": self.name,
+            "kind": SPAN_KIND[self.kind],
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in self.attributes.items()
+            ],
+            "status": {"code": self.status},
+        }
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def current_span():
+    """Return the active span, or None outside of a traced request."""
+    return _current_span.get()
+
+
+@contextmanager
+def span(name, kind="INTERNAL", **attributes):
+    """Time a block as a child of the active span.
+
+    Outside of a traced request this does nothing and yields None.
+
+    Args:
+        name (str): Operation name.
+        kind (str, optional): "INTERNAL" or "CLIENT".
+        **attributes: Extra key/value data stored on the span.
+
+    Yields:
+        Span|None: The new span.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+
+    child = Span(name, kind=kind, parent=parent, **attributes)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except Exception as error:
+        child.set_error(error)
+        raise
+    finally:
+        _current_span.reset(token)
+        child.end()
+
+
+def traced(name=None):
+    """Decorator that records each call of a function as a span.
+
+    Args:
+        name (str, optional): Span name, defaults to "module.function".
+
+    Returns:
+        callable: The decorator.
+    """
+
+    def decorator(func):
+        span_name = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return func(*args, **kwargs)
+            with span(span_name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def export_trace(spans, path, service_name="clockwise"):
+    """Append the spans of one trace to a JSON-lines file.
+
+    Each line is an OTLP `ExportTraceServiceRequest` in JSON, the format the
+    OpenTelemetry collector's file exporter writes and its file receiver reads.
+
+    Args:
+        spans (list[Span]): Finished spans of the trace.
+        path (str): Path of the JSON-lines file.
+        service_name (str, optional): Value of the `service.name` resource attribute.
+    """
+    line = json.dumps(
+        {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {
+                                "key": "service.name",
+                                "value": {"stringValue": service_name},
+                            }
+                        ]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "backend.tracing"},
+                            "spans": [s.to_otlp() for s in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+    )
+    with _export_lock:
+        with open(path, "a") as file:
+            file.write(line + "\n")
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+    parent = _current_span.get()
+    if parent is not None:
+        sql_span = Span(
+            statement.split(None, 1)[0].upper(),
+            kind="CLIENT",
+            parent=parent,
+            **{"db.system": "sqlite", "db.statement": statement},
+        )
+        conn.info.setdefault("trace_spans", []).append(sql_span)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+    if _current_span.get() is not None and conn.info.get("trace_spans"):
+        conn.info["trace_spans"].pop().end()
+
+
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("trace_spans"):
+        sql_span = connection.info["trace_spans"].pop()
+        sql_span.set_error(exception_context.original_exception)
+        sql_span.end()
+
+
+def init_tracing(app):
+    """Trace every request with spans for the route, services and SQL statements.
+
+    Finished traces are appended to `TRACING_FILE`. Disabled unless
+    `TRACING_ENABLED` is set.
+
+    Args:
+        app (Flask): The Flask application instance.
+    """
+    if not app.config.get("TRACING_ENABLED", False):
+        return
+
+    with app.app_context():
+        engines = list(db.engines.values())
+    engines += list(app.extensions.get("shard_engines", {}).values())
+    engines += list(app.extensions.get("read_engines", {}).values())
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+    @app.before_request
+    def start_trace():
+        rule = request.url_rule.rule if request.url_rule else request.path
+        root = Span(
+            f"{request.method} {rule}",
+            kind="SERVER",
+            **{
+                "http.method": request.method,
+                "http.route": rule,
+                # the query string may carry the profiling token
+                "http.target": request.path,
+            },
+        )
+        g.trace_root = root
+        g.trace_token = _current_span.set(root)
+
+    @app.after_request
+    def record_status(response):
+        root = g.get("trace_root")
+        if root is not None:
+            root.attributes["http.status_code"] = response.status_code
+            if response.status_code >= 500:
+                root.status = STATUS_ERROR
+        return response
+
+    @app.teardown_request
+    def finish_trace(exception):
+        root = g.pop("trace_root", None)
+        if root is None:
+            return
+        _current_span.reset(g.pop("trace_token"))
+        if exception is not None:
+            root.set_error(exception)
+        root.end()
+        try:
+            export_trace(root.trace, app.config["TRACING_FILE"])
+        except OSError:
+            app.logger.exception("Writing trace %s failed", root.trace_id)
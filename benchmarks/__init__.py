@@ -0,0 +1,5 @@
+"""Benchmarks that run against a large synthetic database.
+
+They are not part of the pytest suite; every module is started on its own,
+e.g. `python -m benchmarks.endpoints`.
+"""
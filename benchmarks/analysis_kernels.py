@@ -0,0 +1,216 @@
+"""Micro-benchmarks for the in-memory kernels of `analysis_service`.
+
+Each kernel is called directly on generated time entries or tasks of
+increasing size, without Flask or the database. For every size the best
+time of several runs (sized with `timeit`'s autorange) is reported as
+entries per second, together with the peak memory allocated by one call.
+
+Usage:
+    python -m benchmarks.analysis_kernels
+    python -m benchmarks.analysis_kernels --sizes 1000 100000 --only aggregate
+    python -m benchmarks.analysis_kernels --output before.json
+    python -m benchmarks.analysis_kernels --compare before.json
+"""
+
+import argparse
+import json
+import random
+import sys
+import timeit
+import tracemalloc
+from datetime import datetime, timedelta
+
+from backend.services.analysis_service import (
+    actual_target_comparison,
+    aggregate_time_by_day_project_task,
+    aggregate_weekly_time,
+    export_time_entries_csv,
+    export_time_entries_pdf,
+    overall_progress,
+    progress_per_project,
+    worked_time_events,
+)
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+PERIOD_END = datetime(2025, 6, 2)  # a Monday
+WEEK_START = PERIOD_END - timedelta(days=7)
+
+
+def make_time_entries(count, seed=0, projects=40, tasks_per_project=10, days=730):
+    """Generate time entries in the shape `load_time_entries` returns.
+
+    Args:
+        count (int): Number of entries.
+        seed (int, optional): Seed of the random generator.
+        projects (int, optional): Number of distinct projects.
+        tasks_per_project (int, optional): Number of distinct tasks per project.
+        days (int, optional): Length of the period before `PERIOD_END`.
+
+    Returns:
+        list[dict]: Entries with 'start', 'end', 'task' and 'project'.
+    """
+    rng = random.Random(seed)
+    period_start = PERIOD_END - timedelta(days=days)
+    # about one in ten entries belongs to a task without a project
+    names = [f"Projekt {index}" for index in range(projects)] + [None] * (projects // 9)
+    entries = []
+    for _ in range(count):
+        start = period_start + timedelta(seconds=rng.randrange(days * 86400))
+        project = rng.choice(names)
+        entries.append(
+            {
+                "start": start,
+                "end": start + timedelta(seconds=rng.randint(300, 14_400)),
+                "task": f"Aufgabe {rng.randrange(tasks_per_project)}",
+                "project": project,
+            }
+        )
+    return entries
+
+
+def make_tasks(count, seed=0, projects=40):
+    """Generate tasks in the shape `load_tasks` returns.
+
+    Args:
+        count (int): Number of tasks.
+        seed (int, optional): Seed of the random generator.
+        projects (int, optional): Number of distinct projects.
+
+    Returns:
+        list[dict]: Tasks with 'project', 'status' and 'project_status'.
+    """
+    rng = random.Random(seed)
+    return [
+        {
+            "project": f"Projekt {rng.randrange(projects)}",
+            "status": rng.choice(("todo", "in_progress", "done")),
+            "project_status": "active" if rng.random() < 0.8 else "inactive",
+        }
+        for _ in range(count)
+    ]
+
+
+# name -> (input factory, call, largest size worth running)
+KERNELS = {
+    "aggregate_weekly_time": (
+        make_time_entries,
+        lambda entries: aggregate_weekly_time(entries, WEEK_START),
+        None,
+    ),
+    "aggregate_time_by_day_project_task": (
+        make_time_entries,
+        lambda entries: aggregate_time_by_day_project_task(entries, WEEK_START),
+        None,
+    ),
+    "actual_target_comparison": (
+        make_time_entries,
+        lambda entries: actual_target_comparison(
+            entries, {f"Projekt {index}": 100 for index in range(40)}
+        ),
+        None,
+    ),
+    "progress_per_project": (make_tasks, progress_per_project, None),
+    "overall_progress": (make_tasks, overall_progress, None),
+    "worked_time_events": (make_time_entries, worked_time_events, None),
+    "export_time_entries_csv": (make_time_entries, export_time_entries_csv, None),
+    # about 11k rows per second, a million rows would take minutes per call
+    "export_time_entries_pdf": (make_time_entries, export_time_entries_pdf, 100_000),
+}
+
+
+def measure(call, data, repeat=3):
+    """Time a kernel and record the memory one call allocates.
+
+    Args:
+        call (callable): Function called with `data`.
+        data (list): Input of the kernel.
+        repeat (int, optional): Number of timed rounds, the best one counts.
+
+    Returns:
+        dict: seconds per call, entries per second and peak MiB.
+    """
+    timer = timeit.Timer(lambda: call(data))
+    number, _ = timer.autorange()
+    seconds = min(timer.repeat(repeat=repeat, number=number)) / number
+
+    tracemalloc.start()
+    call(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "seconds": seconds,
+        "entries_per_second": len(data) / seconds,
+        "peak_mib": peak / 2**20,
+    }
+
+
+def run(sizes, only=None, repeat=3):
+    """Run all kernels on all sizes.
+
+    Args:
+        sizes (list[int]): Input sizes.
+        only (str, optional): Run only kernels whose name contains this.
+        repeat (int, optional): Number of timed rounds per measurement.
+
+    Returns:
+        dict: kernel -> size (as str) -> measurement.
+    """
+    results = {}
+    for size in sizes:
+        inputs = {}  # one input per factory and size, shared by the kernels
+        for name, (factory, call, max_size) in KERNELS.items():
+            if (only and only not in name) or (max_size and size > max_size):
+                continue
+            if factory not in inputs:
+                inputs[factory] = factory(size)
+            result = measure(call, inputs[factory], repeat)
+            results.setdefault(name, {})[str(size)] = result
+            print_row(name, size, result)
+    return results
+
+
+def print_row(name, size, result, previous=None):
+    line = (
+        f"{name:36} {size:>9} {result['seconds'] * 1000:>11.2f} ms"
+        f" {result['entries_per_second']:>13,.0f}/s {result['peak_mib']:>9.2f} MiB"
+    )
+    if previous:
+        speedup = previous["seconds"] / result["seconds"]
+        line += f"  x{speedup:.2f} vs before"
+    print(line, flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--only", help="run only kernels whose name contains this")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON file of an earlier run")
+    args = parser.parse_args(argv)
+
+    print(
+        f"{'kernel':36} {'entries':>9} {'per call':>14} {'throughput':>15} {'peak':>13}"
+    )
+    results = run(args.sizes, args.only, args.repeat)
+
+    if args.compare:
+        with open(args.compare) as file:
+            before = json.load(file)
+        print(f"\nCompared with {args.compare}:")
+        for name, by_size in results.items():
+            for size, result in by_size.items():
+                previous = before.get(name, {}).get(size)
+                if previous:
+                    print_row(name, int(size), result, previous)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+            file.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
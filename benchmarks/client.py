@@ -0,0 +1,102 @@
+"""A minimal HTTP client for driving a locally served instance.
+
+Only the standard library is used, so the benchmarks need nothing beyond
+the app's own requirements.
+"""
+
+import json
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.cookiejar import CookieJar
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class Response:
+    """Status, body and latency of one request.
+
+    Attributes:
+        status (int): HTTP status, 0 if the connection failed.
+        body (bytes): Response body.
+        elapsed (float): Seconds from sending the request to reading the body.
+        error (str): Connection error, empty if a response arrived.
+    """
+
+    def __init__(self, status, body, elapsed, error=""):
+        self.status = status
+        self.body = body
+        self.elapsed = elapsed
+        self.error = error
+
+    def json(self):
+        try:
+            return json.loads(self.body)
+        except ValueError:
+            return None
+
+
+class Session:
+    """Cookie-keeping client of one simulated user; redirects are not followed.
+
+    Args:
+        base_url (str): e.g. "http://127.0.0.1:5001".
+        timeout (float, optional): Seconds to wait for a response.
+    """
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(CookieJar()), _NoRedirect
+        )
+
+    def request(self, method, path, json_body=None, form=None):
+        """Send a request and return its Response; never raises for HTTP errors.
+
+        Args:
+            method (str): HTTP method.
+            path (str): Path and query, e.g. "/api/tasks?project_id=3".
+            json_body (dict, optional): Body sent as JSON.
+            form (dict, optional): Body sent as form data.
+
+        Returns:
+            Response: The response.
+        """
+        data, headers = None, {}
+        if json_body is not None:
+            data = json.dumps(json_body).encode()
+            headers["Content-Type"] = "application/json"
+        elif form is not None:
+            data = urllib.parse.urlencode(form).encode()
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        request = urllib.request.Request(
+            self.base_url + path, data=data, headers=headers, method=method
+        )
+
+        started = time.perf_counter()
+        try:
+            with self.opener.open(request, timeout=self.timeout) as response:
+                status, body = response.status, response.read()
+        except urllib.error.HTTPError as error:
+            status, body = error.code, error.read()
+        except OSError as error:
+            return Response(0, b"", time.perf_counter() - started, str(error))
+        return Response(status, body, time.perf_counter() - started)
+
+    def get(self, path):
+        return self.request("GET", path)
+
+    def post(self, path, json_body=None, form=None):
+        return self.request("POST", path, json_body=json_body, form=form)
+
+    def login(self, username, password):
+        """Log in through the login form; True if the app redirected to the dashboard."""
+        response = self.post(
+            "/auth/login", form={"username": username, "password": password}
+        )
+        return response.status == 302
@@ -0,0 +1,146 @@
+"""The seeded benchmark database shared by all benchmarks."""
+
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+from collections import defaultdict
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BENCHMARK_DIR, "data")
+DATABASE_NAME = "benchmark.db"
+
+# size of the benchmark database; changing it invalidates the baselines
+DATASET = {
+    "users": 200,
+    "teams": 40,
+    "projects_per_user": 5,
+    "tasks_per_project": 8,
+    "entries": 200_000,
+    "years": 2,
+    "seed": 1,
+}
+PASSWORD = "synthetic"
+
+
+def database_path(name=DATABASE_NAME, data_dir=DATA_DIR):
+    """Return the path of a database file in the benchmark data directory."""
+    return os.path.join(data_dir, name)
+
+
+def configure_environment(name=DATABASE_NAME, data_dir=DATA_DIR):
+    """Point the app at the benchmark database before `app` is imported.
+
+    Args:
+        name (str, optional): File name of the database, e.g. of a scratch copy.
+        data_dir (str, optional): Directory of the benchmark database files.
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    os.environ["DATABASE_FOLDER"] = data_dir
+    os.environ["DATABASE_NAME"] = name
+    os.environ["ANALYTICS_DATABASE_NAME"] = "benchmark-analytics.db"
+    os.environ["ANALYTICS_SNAPSHOT_INTERVAL"] = "0"
+    os.environ["METRICS_ENABLED"] = "False"
+    os.environ["TRACING_ENABLED"] = "False"
+    os.environ["SQL_INSTRUMENTATION"] = "True"
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+
+def prepare_database(app, db):
+    """Seed the benchmark database unless it already holds data.
+
+    Args:
+        app (Flask): The Flask application instance.
+        db (SQLAlchemy): The database extension.
+    """
+    from backend.models import User
+    from backend.services.seed_service import seed_synthetic_data
+    from backend.services.snapshot_service import refresh_configured_snapshot
+
+    with app.app_context():
+        # the app creates the (empty) tables on import
+        seeded = db.session.query(User.user_id).first() is not None
+        db.session.remove()
+        if seeded:
+            return
+        print("Building the benchmark database ...", file=sys.stderr)
+        connection = db.engine.raw_connection()
+        try:
+            seed_synthetic_data(connection.driver_connection, **DATASET)
+        finally:
+            connection.close()
+    refresh_configured_snapshot(app)
+
+
+def copy_database(name):
+    """Copy the seeded benchmark database to a scratch file for destructive runs.
+
+    Args:
+        name (str): File name of the copy in the benchmark data directory.
+
+    Returns:
+        str: Path of the copy.
+    """
+    target_path = database_path(name)
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(target_path + suffix):
+            os.remove(target_path + suffix)
+    source = sqlite3.connect(database_path())
+    target = sqlite3.connect(target_path)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+    return target_path
+
+
+def pick_users(connection, users, tasks_per_user, seed):
+    """Choose users and, per user, tasks they are allowed to track.
+
+    Args:
+        connection (sqlite3.Connection): Connection to the benchmark database.
+        users (int): Number of users.
+        tasks_per_user (int): Number of tasks per user, fewer if it has fewer.
+        seed (int): Seed of the random choice.
+
+    Returns:
+        list[tuple[dict, list[int]]]: User (user_id, username) and its task ids.
+    """
+    rows = connection.execute(
+        "SELECT users.user_id, username, task_id FROM tasks"
+        # the assigned member of team tasks, the owner of all others
+        " JOIN users ON users.user_id = COALESCE(tasks.member_id, tasks.user_id)"
+        " ORDER BY users.user_id, task_id"
+    ).fetchall()
+    by_user = defaultdict(list)
+    names = {}
+    for user_id, username, task_id in rows:
+        by_user[user_id].append(task_id)
+        names[user_id] = username
+
+    rng = random.Random(seed)
+    chosen = rng.sample(sorted(by_user), min(users, len(by_user)))
+    return [
+        (
+            {"user_id": user_id, "username": names[user_id]},
+            rng.sample(by_user[user_id], min(tasks_per_user, len(by_user[user_id]))),
+        )
+        for user_id in chosen
+    ]
+
+
+def ensure_database():
+    """Build the benchmark database in a child process if it is not seeded yet.
+
+    For harnesses that only talk HTTP and should not import the app.
+    """
+    subprocess.run([sys.executable, "-m", "benchmarks.dataset"], check=True)
+
+
+if __name__ == "__main__":
+    configure_environment()
+    from app import app, db
+
+    prepare_database(app, db)
@@ -0,0 +1,278 @@
+"""Endpoint benchmarks with latency, query-count and memory budgets.
+
+Drives the Flask test client against a seeded benchmark database (built with
+`seed_synthetic_data` on first use) and records p50/p95 latency, the number
+of SQL statements and the peak Python memory per endpoint. The results are
+compared against `benchmarks/baselines.json`; any regression makes the run
+exit with status 1.
+
+Usage:
+    python -m benchmarks.endpoints                    # compare with the baselines
+    python -m benchmarks.endpoints --update-baselines # store new baselines
+    python -m benchmarks.endpoints --only analysis    # cases whose name matches
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+
+from benchmarks.dataset import (
+    BENCHMARK_DIR,
+    DATASET,
+    PASSWORD,
+    configure_environment,
+    prepare_database,
+)
+
+BASELINES_PATH = os.path.join(BENCHMARK_DIR, "baselines.json")
+
+# absolute slack on top of the relative tolerances, against timer and
+# allocator noise on small values
+LATENCY_FLOOR_MS = 2.0
+MEMORY_FLOOR_KIB = 64
+
+_SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+def pick_fixtures(app, db):
+    """Choose the busiest user and their largest project, solo and team.
+
+    Returns:
+        dict: username, a solo project id, a team project id and a task id.
+    """
+    from sqlalchemy import text
+
+    with app.app_context():
+        run = lambda sql, **params: db.session.execute(text(sql), params).first()
+        user_id, username = run(
+            "SELECT users.user_id, username FROM users JOIN time_entries"
+            " USING (user_id) GROUP BY users.user_id"
+            " ORDER BY COUNT(*) DESC, users.user_id LIMIT 1"
+        )
+        solo_project_id, task_id = run(
+            "SELECT projects.project_id, MIN(task_id) FROM projects JOIN tasks"
+            " USING (project_id) WHERE projects.user_id = :user_id"
+            " AND team_id IS NULL GROUP BY projects.project_id"
+            " ORDER BY COUNT(*) DESC LIMIT 1",
+            user_id=user_id,
+        )
+        team_project = run(
+            "SELECT project_id FROM projects JOIN user_teams USING (team_id)"
+            " WHERE user_teams.user_id = :user_id ORDER BY project_id LIMIT 1",
+            user_id=user_id,
+        )
+        db.session.remove()
+    return {
+        "username": username,
+        "solo_project_id": solo_project_id,
+        "team_project_id": team_project[0] if team_project else solo_project_id,
+        "task_id": task_id,
+    }
+
+
+def build_cases(fixtures):
+    """Return the benchmark cases as `name -> callable(client) -> [responses]`."""
+
+    def get(path):
+        return lambda client: [client.get(path)]
+
+    def post(path, payload=None):
+        return lambda client: [client.post(path, json=payload or {})]
+
+    def timer_cycle(client):
+        started = client.post(
+            "/api/time_entries/start", json={"task_id": fixtures["task_id"]}
+        )
+        entry_id = started.get_json()["time_entry_id"]
+        return [started, client.post(f"/api/time_entries/stop/{entry_id}")]
+
+    return {
+        "projects.list": get("/api/projects"),
+        "tasks.solo_project": get(
+            f"/api/tasks?project_id={fixtures['solo_project_id']}"
+        ),
+        "tasks.team_project": get(
+            f"/api/tasks?project_id={fixtures['team_project_id']}"
+        ),
+        "teams.full": get("/api/teams/full"),
+        "analysis.snapshot": get("/api/analysis/snapshot"),
+        "analysis.project_progress": get("/api/analysis/project-progress"),
+        "analysis.actual_vs_planned": get("/api/analysis/actual-vs-planned"),
+        "analysis.weekly_time_stacked": get("/api/analysis/weekly-time-stacked"),
+        "analysis.overall_progress": get("/api/analysis/overall-progress"),
+        "analysis.weekly_status": post("/api/analysis/weekly_status"),
+        "analysis.export_csv": get("/api/analysis/export/csv"),
+        "analysis.export_pdf": get("/api/analysis/export/pdf"),
+        "projects.export_csv": get("/api/projects/export/projects/csv"),
+        "projects.export_pdf": get("/api/projects/export/projects/pdf"),
+        "time_entries.start_stop": timer_cycle,
+    }
+
+
+def _query_count(responses):
+    count = 0
+    for response in responses:
+        for header in response.headers.getlist("Server-Timing"):
+            match = _SERVER_TIMING_QUERIES.search(header)
+            if match:
+                count += int(match.group(1))
+    return count
+
+
+def run_case(client, case, repeat):
+    """Run one case `repeat` times after a warm-up call.
+
+    The query count is the lowest seen, so occasional bookkeeping writes
+    (e.g. the `last_active` update once a minute) do not count.
+
+    Returns:
+        dict: p50_ms, p95_ms, queries and peak_kib of the case.
+    """
+    responses = case(client)
+    for response in responses:
+        if response.status_code >= 400:
+            raise RuntimeError(f"{response.request.path}: {response.status_code}")
+    queries = _query_count(responses)
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        responses = case(client)
+        timings.append((time.perf_counter() - started) * 1000)
+        queries = min(queries, _query_count(responses))
+
+    tracemalloc.start()
+    case(client)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    percentiles = statistics.quantiles(timings, n=20, method="inclusive")
+    return {
+        "p50_ms": round(statistics.median(timings), 2),
+        "p95_ms": round(percentiles[18], 2),
+        "queries": queries,
+        "peak_kib": round(peak / 1024),
+    }
+
+
+def find_regressions(results, baselines, latency_tolerance, memory_tolerance):
+    """Compare results with the baselines.
+
+    Latency and memory may exceed the baseline by the given share (but at
+    least by `LATENCY_FLOOR_MS` and `MEMORY_FLOOR_KIB`), the number of
+    queries must not grow at all.
+
+    Args:
+        results (dict): Measurements per case.
+        baselines (dict): Stored measurements per case.
+        latency_tolerance (float): Allowed relative increase of p50 and p95.
+        memory_tolerance (float): Allowed relative increase of the peak memory.
+
+    Returns:
+        list[str]: One message per regression.
+    """
+    limits = {
+        "p50_ms": (latency_tolerance, LATENCY_FLOOR_MS),
+        "p95_ms": (latency_tolerance, LATENCY_FLOOR_MS),
+        "queries": (0, 0),
+        "peak_kib": (memory_tolerance, MEMORY_FLOOR_KIB),
+    }
+    regressions = []
+    for name, result in results.items():
+        baseline = baselines.get(name)
+        if baseline is None:
+            continue
+        for metric, (tolerance, floor) in limits.items():
+            allowed = baseline[metric] + max(baseline[metric] * tolerance, floor)
+            if result[metric] > allowed:
+                regressions.append(
+                    f"{name}: {metric} {result[metric]} > {baseline[metric]}"
+                    f" (+{tolerance:.0%} allowed)"
+                )
+    return regressions
+
+
+def print_table(results, baselines):
+    """Print the results, each value followed by its baseline if there is one."""
+    metrics = ("p50_ms", "p95_ms", "queries", "peak_kib")
+    print(f"{'case':32}" + "".join(f"{metric:>18}" for metric in metrics))
+    for name, result in results.items():
+        baseline = baselines.get(name, {})
+        cells = [
+            f"{result[metric]} / {baseline[metric]}" if baseline else result[metric]
+            for metric in metrics
+        ]
+        print(f"{name:32}" + "".join(f"{cell:>18}" for cell in cells))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--only", help="run only cases whose name contains this")
+    parser.add_argument("--baselines", default=BASELINES_PATH)
+    parser.add_argument("--update-baselines", action="store_true")
+    parser.add_argument("--latency-tolerance", type=float, default=0.25)
+    parser.add_argument("--memory-tolerance", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    configure_environment()
+    from app import app, db
+
+    prepare_database(app, db)
+    fixtures = pick_fixtures(app, db)
+    client = app.test_client()
+    login = client.post(
+        "/auth/login", data={"username": fixtures["username"], "password": PASSWORD}
+    )
+    if login.status_code != 302:
+        raise RuntimeError("Login of the benchmark user failed")
+
+    results = {}
+    for name, case in build_cases(fixtures).items():
+        if args.only and args.only not in name:
+            continue
+        results[name] = run_case(client, case, args.repeat)
+
+    stored = {}
+    if os.path.exists(args.baselines):
+        with open(args.baselines) as file:
+            stored = json.load(file)
+    baselines = stored.get("cases", {}) if stored.get("dataset") == DATASET else {}
+    print_table(results, baselines)
+
+    if args.update_baselines:
+        cases = dict(baselines, **results)
+        with open(args.baselines, "w") as file:
+            json.dump(
+                {
+                    "dataset": DATASET,
+                    "python": platform.python_version(),
+                    "cases": cases,
+                },
+                file,
+                indent=2,
+                sort_keys=True,
+            )
+            file.write("\n")
+        print(f"Baselines written to {args.baselines}")
+        return 0
+
+    if not baselines:
+        print("No baselines for this dataset, run with --update-baselines")
+        return 0
+    regressions = find_regressions(
+        results, baselines, args.latency_tolerance, args.memory_tolerance
+    )
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
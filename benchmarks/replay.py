@@ -0,0 +1,523 @@
+"""Replay realistic user sessions against a served instance.
+
+Every virtual user logs in, loads the dashboard with all the fetches its
+page script makes, and then visits pages picked by weight until it logs out
+and starts over as the same user:
+
+- projects: the project list with its fetches, then create, edit and delete
+  a project and a task,
+- timer: the time tracking page and a start/pause/resume/stop cycle,
+- analysis: the analysis page with its charts and a CSV export, now and
+  then a PDF export,
+- teams: the teams page with its fetches.
+
+The steps name Flask endpoints, not paths. URLs are built from the app's
+URL map, so a renamed or removed route fails the replay instead of quietly
+measuring a 404; `--list-missed` lists the routes no scenario reaches.
+
+For capacity planning, give several concurrency levels; each one runs for
+`--duration` seconds and reports throughput, latency and errors. For
+regression checks, store a run with `--output` and compare later runs with
+`--compare`; a p95 or error rate beyond the tolerance exits with status 1.
+
+Usage:
+    python -m benchmarks.replay --concurrency 1 4 16 --duration 30
+    python -m benchmarks.replay --output before.json
+    python -m benchmarks.replay --compare before.json
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+
+from benchmarks.client import Session
+from benchmarks.dataset import (
+    PASSWORD,
+    configure_environment,
+    copy_database,
+    database_path,
+    ensure_database,
+    pick_users,
+)
+from benchmarks.server import start_server
+
+# every run starts from a fresh copy of the benchmark database
+SCRATCH_DATABASE = "replay.db"
+
+# page -> relative frequency of visits after the dashboard
+PAGE_WEIGHTS = {"projects": 3, "timer": 5, "analysis": 2, "teams": 1}
+PDF_EXPORT_SHARE = 0.1
+
+# absolute slack on top of the relative tolerance in comparisons
+LATENCY_FLOOR_MS = 5.0
+ERROR_RATE_FLOOR = 0.005
+
+# routes the scenarios leave out on purpose
+IGNORED_ENDPOINTS = {"static", "metrics.metrics"}
+
+
+class Routes:
+    """Build request paths and per-route labels from the app's URL map."""
+
+    def __init__(self, url_map):
+        self.adapter = url_map.bind("localhost")
+        self.rules = defaultdict(list)  # endpoint -> rules
+        for rule in url_map.iter_rules():
+            self.rules[rule.endpoint].append(rule)
+
+    def build(self, endpoint, method, values=None, query=None):
+        """Return the path and the route label of a request.
+
+        Args:
+            endpoint (str): Flask endpoint, e.g. "tasks.get_tasks".
+            method (str): HTTP method.
+            values (dict, optional): URL variables of the rule.
+            query (dict, optional): Query string arguments.
+
+        Returns:
+            tuple[str, str]: Path with query string and "METHOD /rule".
+
+        Raises:
+            werkzeug.routing.BuildError: If the app has no such route.
+        """
+        values = dict(values or {})
+        path = self.adapter.build(endpoint, values, method=method)
+        rule = next(
+            rule
+            for rule in self.rules[endpoint]
+            if method in rule.methods and set(values) <= set(rule.arguments)
+        )
+        if query:
+            path += "?" + "&".join(f"{key}={value}" for key, value in query.items())
+        return path, f"{method} {rule.rule}"
+
+    def all_routes(self):
+        """Return the labels of all routes the scenarios should reach."""
+        return {
+            f"{method} {rule.rule}"
+            for endpoint, rules in self.rules.items()
+            if endpoint not in IGNORED_ENDPOINTS
+            for rule in rules
+            for method in rule.methods - {"HEAD", "OPTIONS"}
+        }
+
+
+class Recorder:
+    """Thread-safe latencies and statuses per route."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)  # route -> seconds
+        self.statuses = defaultdict(Counter)  # route -> status -> count
+        self.sessions = 0
+
+    def record(self, route, response):
+        with self.lock:
+            self.latencies[route].append(response.elapsed)
+            self.statuses[route][response.status] += 1
+
+
+class VirtualUser:
+    """One simulated user visiting pages through a cookie-keeping session.
+
+    Args:
+        base_url (str): URL of the served instance.
+        routes (Routes): Route builder of the app.
+        recorder (Recorder): Receives every response.
+        user (dict): user_id and username of a seeded user.
+        tasks (list[int]): Tasks the user may track.
+        seed (int): Seed of the user's random generator.
+    """
+
+    def __init__(self, base_url, routes, recorder, user, tasks, seed):
+        self.base_url = base_url
+        self.routes = routes
+        self.recorder = recorder
+        self.user = user
+        self.tasks = tasks
+        self.rng = random.Random(seed)
+        self.session = None
+
+    def visit(self, endpoint, method="GET", values=None, query=None, **body):
+        """Send one request to an endpoint and record it under its route."""
+        path, route = self.routes.build(endpoint, method, values, query)
+        response = self.session.request(method, path, **body)
+        self.recorder.record(route, response)
+        return response
+
+    def run(self, deadline, think):
+        """Replay sessions until the deadline.
+
+        Args:
+            deadline (float): `time.monotonic()` value to stop at.
+            think (float): Mean seconds between two page visits.
+        """
+        pages = list(PAGE_WEIGHTS)
+        weights = list(PAGE_WEIGHTS.values())
+        while time.monotonic() < deadline:
+            self.session = Session(self.base_url)
+            self.login()
+            self.dashboard()
+            for _ in range(self.rng.randint(2, 6)):
+                if time.monotonic() >= deadline:
+                    break
+                self.pause(think)
+                getattr(self, self.rng.choices(pages, weights)[0])()
+            self.visit("logout")
+            with self.recorder.lock:
+                self.recorder.sessions += 1
+
+    def pause(self, think):
+        if think:
+            time.sleep(self.rng.expovariate(1 / think))
+
+    def login(self):
+        self.visit(
+            "auth.login",
+            "POST",
+            form={"username": self.user["username"], "password": PASSWORD},
+        )
+
+    def dashboard(self):
+        self.visit("dashboard")
+        projects = (self.visit("project.api_projects").json() or {}).get("projects")
+        self.visit("get_calendar_due_dates")
+        self.visit("get_calendar_worked_time")
+        self.visit("teams.get_full_teams")
+        self.visit("analysis.api_weekly_time_stacked")
+        self.visit("analysis.notify_weekly_status_route", "POST", json_body={})
+        if projects:
+            project = self.rng.choice(projects)
+            self.visit("tasks.get_tasks", query={"project_id": project["project_id"]})
+
+    def projects(self):
+        self.visit("projects")
+        self.visit("project.api_projects")
+        self.visit("category.api_get_categories")
+        self.visit("teams.get_user_teams")
+        self.visit("tasks.get_tasks", query={"unassigned": "true"})
+        self.visit("tasks.get_tasks_by_user", values={"user_id": self.user["user_id"]})
+
+        project_id = (
+            self.visit(
+                "project.api_projects",
+                "POST",
+                json_body={
+                    "name": f"Replay {self.rng.randrange(10**6)}",
+                    "description": "Created by the load replay",
+                    "type": "SoloProject",
+                    "status": "active",
+                    "time_limit_hours": 20,
+                },
+            ).json()
+            or {}
+        ).get("project_id")
+        if project_id is None:
+            return
+        project = {"project_id": project_id}
+        self.visit(
+            "project.api_project_detail",
+            "PATCH",
+            values=project,
+            json_body={"description": "Edited by the load replay"},
+        )
+        task_id = (
+            self.visit(
+                "tasks.create_task_api",
+                "POST",
+                json_body={"title": "Replay task", "project_id": project_id},
+            ).json()
+            or {}
+        ).get("task_id")
+        if task_id is not None:
+            task = {"task_id": task_id}
+            self.visit("tasks.get_tasks", query=project)
+            self.visit(
+                "tasks.update_task_api",
+                "PUT",
+                values=task,
+                json_body={"status": "in_progress"},
+            )
+            self.visit("tasks.get_task_by_id_api", values=task)
+            self.visit("tasks.delete_task_api", "DELETE", values=task)
+        self.visit("project.api_project_detail", "DELETE", values=project)
+
+    def timer(self):
+        self.visit("timeTracking")
+        self.visit("time_entries.get_tasks_without_entries")
+        self.visit("time_entries.get_latest_sessions")
+        if not self.tasks:
+            return
+        response = self.visit(
+            "time_entries.start_entry",
+            "POST",
+            json_body={"task_id": self.rng.choice(self.tasks)},
+        )
+        entry_id = (response.json() or {}).get("time_entry_id")
+        if entry_id is None:
+            return
+        entry = {"entry_id": entry_id}
+        for endpoint in ("pause_entry", "resume_entry", "stop_entry"):
+            self.pause(0.5)
+            self.visit(f"time_entries.{endpoint}", "POST", values=entry)
+        self.visit("time_entries.get_latest_sessions")
+
+    def analysis(self):
+        self.visit("analysis")
+        self.visit("analysis.api_weekly_time_stacked")
+        self.visit("get_calendar_due_dates")
+        self.visit("get_calendar_worked_time")
+        self.visit("analysis.api_project_progress")
+        self.visit("analysis.api_overall_progress")
+        self.visit("analysis.api_actual_vs_planned")
+        self.visit("analysis.export_csv")
+        if self.rng.random() < PDF_EXPORT_SHARE:
+            self.visit("analysis.export_pdf")
+
+    def teams(self):
+        self.visit("teams")
+        teams = (self.visit("teams.get_user_teams").json() or {}).get("teams")
+        self.visit("project.api_projects")
+        self.visit("teams.get_full_teams")
+        if teams:
+            team = {"team_id": self.rng.choice(teams)["team_id"]}
+            self.visit("teams.get_team_members", values=team)
+
+
+def _percentile(values, share):
+    return values[min(len(values) - 1, int(share * len(values)))] if values else 0
+
+
+def summarize(recorder, elapsed):
+    """Reduce the recorded responses to per-route distributions.
+
+    Args:
+        recorder (Recorder): Responses of one concurrency level.
+        elapsed (float): Seconds the level ran.
+
+    Returns:
+        dict: Totals and, per route, count, error rate and latency percentiles.
+    """
+    routes = {}
+    for route, latencies in sorted(recorder.latencies.items()):
+        latencies = sorted(latencies)
+        statuses = recorder.statuses[route]
+        errors = sum(
+            count for status, count in statuses.items() if status == 0 or status >= 400
+        )
+        routes[route] = {
+            "count": len(latencies),
+            "error_rate": errors / len(latencies),
+            "statuses": {str(status): count for status, count in statuses.items()},
+            **{
+                f"p{share}_ms": _percentile(latencies, share / 100) * 1000
+                for share in (50, 90, 95, 99)
+            },
+            "max_ms": latencies[-1] * 1000,
+        }
+    requests = sum(route["count"] for route in routes.values())
+    errors = sum(route["count"] * route["error_rate"] for route in routes.values())
+    every_latency = sorted(
+        latency for latencies in recorder.latencies.values() for latency in latencies
+    )
+    return {
+        "elapsed": elapsed,
+        "requests": requests,
+        "requests_per_second": requests / elapsed,
+        "sessions": recorder.sessions,
+        "error_rate": errors / requests if requests else 0,
+        "p95_ms": _percentile(every_latency, 0.95) * 1000,
+        "routes": routes,
+    }
+
+
+def print_level(concurrency, summary):
+    print(
+        f"\n{concurrency} concurrent users: {summary['requests']} requests,"
+        f" {summary['requests_per_second']:.1f} req/s,"
+        f" {summary['sessions']} sessions, p95 {summary['p95_ms']:.1f} ms,"
+        f" {summary['error_rate']:.2%} errors"
+    )
+    print(
+        f"{'route':58} {'count':>6} {'errors':>7} {'p50':>8} {'p90':>8}"
+        f" {'p95':>8} {'p99':>8} {'max':>8}"
+    )
+    for route, result in summary["routes"].items():
+        print(
+            f"{route:58} {result['count']:>6} {result['error_rate']:>7.1%}"
+            + "".join(
+                f" {result[key]:>8.1f}"
+                for key in ("p50_ms", "p90_ms", "p95_ms", "p99_ms", "max_ms")
+            )
+        )
+
+
+def find_regressions(results, before, tolerance):
+    """Compare the per-route p95 and error rates with an earlier run.
+
+    Args:
+        results (dict): concurrency (as str) -> summary of this run.
+        before (dict): The same for the earlier run.
+        tolerance (float): Allowed relative growth of the p95 latency.
+
+    Returns:
+        list[str]: Regressions, empty if there are none.
+    """
+    regressions = []
+    for level, summary in results.items():
+        for route, result in summary["routes"].items():
+            previous = before.get(level, {}).get("routes", {}).get(route)
+            if previous is None:
+                continue
+            allowed = previous["p95_ms"] * (1 + tolerance) + LATENCY_FLOOR_MS
+            if result["p95_ms"] > allowed:
+                regressions.append(
+                    f"{level} users, {route}: p95 {result['p95_ms']:.1f} ms"
+                    f" > {previous['p95_ms']:.1f} ms"
+                )
+            if result["error_rate"] > previous["error_rate"] + ERROR_RATE_FLOOR:
+                regressions.append(
+                    f"{level} users, {route}: error rate"
+                    f" {result['error_rate']:.1%} > {previous['error_rate']:.1%}"
+                )
+    return regressions
+
+
+def run_level(base_url, routes, users, concurrency, duration, think, seed):
+    """Let `concurrency` virtual users replay sessions for `duration` seconds."""
+    recorder = Recorder()
+    started = time.monotonic()
+    deadline = started + duration
+    threads = [
+        threading.Thread(
+            target=VirtualUser(
+                base_url,
+                routes,
+                recorder,
+                *users[index % len(users)],
+                seed=seed + index,
+            ).run,
+            args=(deadline, think),
+        )
+        for index in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(recorder, time.monotonic() - started)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--url",
+        help="use a running `python -m benchmarks.server` instead of starting one",
+    )
+    parser.add_argument(
+        "--database",
+        default=SCRATCH_DATABASE,
+        help="database file of the instance given with --url",
+    )
+    parser.add_argument("--port", type=int, default=5058)
+    parser.add_argument("--server-processes", type=int, default=1)
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        nargs="+",
+        default=[8],
+        help="concurrent users; one run per value",
+    )
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument(
+        "--think", type=float, default=1.0, help="mean seconds between page visits"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--list-missed", action="store_true", help="list the routes not replayed"
+    )
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON file of an earlier run")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25, help="allowed p95 growth"
+    )
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.url is None:
+        ensure_database()
+        copy_database(SCRATCH_DATABASE)
+        args.database = SCRATCH_DATABASE
+    # only for the URL map; the requests go to the served instance
+    configure_environment(args.database)
+    from app import app
+
+    routes = Routes(app.url_map)
+    connection = sqlite3.connect(
+        f"file:{database_path(args.database)}?mode=ro", uri=True
+    )
+    users = pick_users(connection, max(args.concurrency), 3, args.seed)
+    connection.close()
+
+    if args.url is None:
+        log_path = os.path.join(tempfile.gettempdir(), "replay_server.log")
+        server = start_server(
+            args.port, args.server_processes, log_path, database=SCRATCH_DATABASE
+        )
+        args.url = f"http://127.0.0.1:{args.port}"
+    results = {}
+    try:
+        for concurrency in args.concurrency:
+            summary = run_level(
+                args.url,
+                routes,
+                users,
+                concurrency,
+                args.duration,
+                args.think,
+                args.seed,
+            )
+            results[str(concurrency)] = summary
+            print_level(concurrency, summary)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    if len(results) > 1:
+        print(f"\n{'users':>6} {'req/s':>8} {'p95 ms':>8} {'errors':>7}")
+        for level, summary in results.items():
+            print(
+                f"{level:>6} {summary['requests_per_second']:>8.1f}"
+                f" {summary['p95_ms']:>8.1f} {summary['error_rate']:>7.2%}"
+            )
+
+    reached = {route for summary in results.values() for route in summary["routes"]}
+    missed = sorted(routes.all_routes() - reached)
+    print(f"\n{len(reached)} routes replayed, {len(missed)} not replayed")
+    if args.list_missed:
+        for route in missed:
+            print(f"  {route}")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+            file.write("\n")
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = find_regressions(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""Serve the app on the benchmark database in a child process.
+
+`python -m benchmarks.server --port 5001` serves it in the foreground;
+`start_server` runs the same command as a subprocess for the harnesses.
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+from benchmarks.dataset import DATABASE_NAME, configure_environment, prepare_database
+
+
+def serve(host, port, processes=1, database=DATABASE_NAME):
+    """Serve the app with the Werkzeug server until interrupted.
+
+    Args:
+        host (str): Interface to bind.
+        port (int): Port to bind.
+        processes (int, optional): Forked worker processes; 1 serves with threads.
+        database (str, optional): File name of the database in the data directory.
+    """
+    configure_environment(database)
+    from werkzeug.serving import run_simple
+
+    from app import app, db
+
+    prepare_database(app, db)
+    run_simple(
+        host,
+        port,
+        app,
+        threaded=processes == 1,
+        processes=processes,
+        use_reloader=False,
+    )
+
+
+def start_server(port, processes=1, log_path=None, database=DATABASE_NAME, timeout=120):
+    """Start `serve` in a subprocess and wait until it answers.
+
+    Args:
+        port (int): Port to bind on 127.0.0.1.
+        processes (int, optional): Forked worker processes; 1 serves with threads.
+        log_path (str, optional): File that receives the server's output.
+        database (str, optional): File name of the database in the data directory.
+        timeout (float, optional): Seconds to wait, the database may be seeded first.
+
+    Returns:
+        subprocess.Popen: The server process; terminate it when done.
+    """
+    log = open(log_path, "w") if log_path else subprocess.DEVNULL
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.server",
+            "--port",
+            str(port),
+            "--processes",
+            str(processes),
+            "--database",
+            database,
+        ],
+        stdout=log,
+        stderr=subprocess.STDOUT,
+    )
+    if log_path:
+        log.close()  # the child keeps its own handle
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with status {process.returncode}")
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/auth/login", timeout=1)
+            return process
+        except urllib.error.HTTPError:
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"Server did not answer on port {port} within {timeout}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5001)
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--database", default=DATABASE_NAME)
+    args = parser.parse_args()
+    serve(args.host, args.port, args.processes, args.database)
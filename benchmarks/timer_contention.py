@@ -0,0 +1,353 @@
+"""Stress the timer write path with concurrent start/pause/resume/stop cycles.
+
+Serves the app on the benchmark database (or uses `--url`) and lets many
+client threads run timer cycles for a fixed time. Several threads share one
+user and a handful of tasks, like a student with two tabs open or a class
+working on the same team tasks, and now and then a thread pauses or stops a
+timer another thread of the same user started. Reported are:
+
+- throughput of requests and completed cycles,
+- `database is locked` errors and busy retries found in the server log,
+- server errors (5xx) and failed connections,
+- duplicate open entries: a second entry of a user and task that was
+  started while the first one was still running,
+- lost duration updates: entries whose stored duration is lower than a
+  duration the server already confirmed, tasks whose total does not match
+  their entries, and entries left open.
+
+Usage:
+    python -m benchmarks.timer_contention --workers 40 --duration 30
+    python -m benchmarks.timer_contention --server-processes 4
+"""
+
+import argparse
+import os
+import random
+import re
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+
+from benchmarks.client import Session
+from benchmarks.dataset import (
+    DATABASE_NAME,
+    PASSWORD,
+    copy_database,
+    database_path,
+    ensure_database,
+    pick_users,
+)
+from benchmarks.server import start_server
+
+# every run starts from a fresh copy of the benchmark database
+SCRATCH_DATABASE = "contention.db"
+
+_BUSY_RETRY = re.compile(r"SQLite busy in \w+, retrying")
+
+
+class Recorder:
+    """Thread-safe record of everything the workers did and were told."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = Counter()  # operation -> count
+        self.latencies = defaultdict(list)  # operation -> seconds
+        self.server_errors = Counter()  # operation -> count
+        self.connection_errors = 0
+        self.rejected = Counter()  # error message -> count
+        self.cycles = 0
+        # entry id -> dict(user, task, opened, closed, confirmed)
+        self.entries = {}
+        self.open_by_user = defaultdict(list)
+
+    def response(self, operation, response):
+        with self.lock:
+            self.requests[operation] += 1
+            self.latencies[operation].append(response.elapsed)
+            if response.status == 0:
+                self.connection_errors += 1
+            elif response.status >= 500:
+                self.server_errors[operation] += 1
+            else:
+                body = response.json() or {}
+                if "error" in body:
+                    self.rejected[f"{operation}: {body['error']}"] += 1
+        return response
+
+    def opened(self, entry_id, user, task):
+        with self.lock:
+            self.entries[entry_id] = {
+                "user": user,
+                "task": task,
+                "opened": time.monotonic(),
+                "closed": None,
+                "confirmed": 0,
+            }
+            self.open_by_user[user].append(entry_id)
+
+    def confirmed(self, entry_id, duration):
+        with self.lock:
+            entry = self.entries[entry_id]
+            entry["confirmed"] = max(entry["confirmed"], duration or 0)
+
+    def closing(self, entry_id):
+        """Mark an entry as stopped (from the moment the stop is sent)."""
+        with self.lock:
+            entry = self.entries[entry_id]
+            if entry["closed"] is None:
+                entry["closed"] = time.monotonic()
+            if entry_id in self.open_by_user[entry["user"]]:
+                self.open_by_user[entry["user"]].remove(entry_id)
+
+    def someone_elses_entry(self, rng, user, own):
+        with self.lock:
+            others = [e for e in self.open_by_user[user] if e not in own]
+        return rng.choice(others) if others else None
+
+
+def worker(base_url, user, tasks, recorder, deadline, hold, meddle, seed):
+    """Run timer cycles as one user until the deadline."""
+    rng = random.Random(seed)
+    session = Session(base_url)
+    if not session.login(user["username"], PASSWORD):
+        raise RuntimeError(f"Login of {user['username']} failed")
+
+    own = set()
+    while time.monotonic() < deadline:
+        if meddle and rng.random() < meddle:
+            # the same user in another tab
+            entry_id = recorder.someone_elses_entry(rng, user["user_id"], own)
+            if entry_id is not None:
+                operation = rng.choice(("pause", "stop"))
+                if operation == "stop":
+                    recorder.closing(entry_id)
+                response = recorder.response(
+                    operation, session.post(f"/api/time_entries/{operation}/{entry_id}")
+                )
+                if (response.json() or {}).get("success"):
+                    recorder.confirmed(entry_id, response.json()["duration_seconds"])
+                continue
+
+        task_id = rng.choice(tasks)
+        response = recorder.response(
+            "start", session.post("/api/time_entries/start", {"task_id": task_id})
+        )
+        entry_id = (response.json() or {}).get("time_entry_id")
+        if entry_id is None:
+            time.sleep(hold)
+            continue
+        recorder.opened(entry_id, user["user_id"], task_id)
+        own.add(entry_id)
+
+        for operation in ("pause", "resume", "stop"):
+            time.sleep(hold)
+            if operation == "stop":
+                recorder.closing(entry_id)
+            response = recorder.response(
+                operation, session.post(f"/api/time_entries/{operation}/{entry_id}")
+            )
+            body = response.json() or {}
+            if body.get("success") and "duration_seconds" in body:
+                recorder.confirmed(entry_id, body["duration_seconds"])
+        with recorder.lock:
+            recorder.cycles += 1
+        own.discard(entry_id)
+
+
+def find_duplicate_opens(entries):
+    """Return pairs of entries of one user and task that were open at the same time.
+
+    An entry counts as open from its start response until its stop was
+    sent, so only overlaps the server must have seen are reported.
+    """
+    by_key = defaultdict(list)
+    for entry_id, entry in entries.items():
+        by_key[(entry["user"], entry["task"])].append((entry["opened"], entry_id))
+
+    duplicates = []
+    for opened in by_key.values():
+        opened.sort()
+        for (first_at, first), (second_at, second) in zip(opened, opened[1:]):
+            closed = entries[first]["closed"]
+            if closed is None or second_at < closed:
+                duplicates.append((first, second))
+    return duplicates
+
+
+def check_database(path, recorder, first_entry_id):
+    """Compare what the server confirmed with what is stored.
+
+    Returns:
+        dict: Lists of inconsistencies by kind.
+    """
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        stored = dict(
+            connection.execute(
+                "SELECT time_entry_id, COALESCE(duration_seconds, 0)"
+                " FROM time_entries WHERE time_entry_id >= ?",
+                (first_entry_id,),
+            ).fetchall()
+        )
+        left_open = [
+            row[0]
+            for row in connection.execute(
+                "SELECT time_entry_id FROM time_entries"
+                " WHERE time_entry_id >= ? AND end_time IS NULL",
+                (first_entry_id,),
+            )
+        ]
+        tasks = sorted({entry["task"] for entry in recorder.entries.values()})
+        stale_tasks = connection.execute(
+            "SELECT task_id, total_duration_seconds, (SELECT"
+            " COALESCE(SUM(duration_seconds), 0) FROM time_entries"
+            " WHERE time_entries.task_id = tasks.task_id)"
+            f" FROM tasks WHERE task_id IN ({','.join('?' * len(tasks))})",
+            tasks,
+        ).fetchall()
+    finally:
+        connection.close()
+
+    return {
+        "lost_updates": [
+            (entry_id, entry["confirmed"], stored.get(entry_id))
+            for entry_id, entry in recorder.entries.items()
+            if stored.get(entry_id, 0) < entry["confirmed"]
+        ],
+        "stale_task_totals": [row for row in stale_tasks if row[1] != row[2]],
+        "left_open": left_open,
+        "duplicate_opens": find_duplicate_opens(recorder.entries),
+    }
+
+
+def _percentile(values, share):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(share * len(values)))] if values else 0
+
+
+def report(recorder, checks, elapsed, log_text):
+    total = sum(recorder.requests.values())
+    print(f"{total} requests in {elapsed:.1f}s: {total / elapsed:.1f} req/s,")
+    print(f"{recorder.cycles} complete timer cycles: {recorder.cycles / elapsed:.1f}/s")
+    print(f"\n{'operation':10} {'count':>7} {'p50 ms':>8} {'p95 ms':>8} {'5xx':>5}")
+    for operation in ("start", "pause", "resume", "stop"):
+        latencies = recorder.latencies[operation]
+        print(
+            f"{operation:10} {recorder.requests[operation]:>7}"
+            f" {_percentile(latencies, 0.5) * 1000:>8.1f}"
+            f" {_percentile(latencies, 0.95) * 1000:>8.1f}"
+            f" {recorder.server_errors[operation]:>5}"
+        )
+
+    print("\nRejected by the app (expected under contention):")
+    for message, count in recorder.rejected.most_common():
+        print(f"  {count:>6}  {message}")
+
+    problems = {
+        "database is locked errors": log_text.count("database is locked"),
+        "busy retries": len(_BUSY_RETRY.findall(log_text)),
+        "server errors (5xx)": sum(recorder.server_errors.values()),
+        "connection errors": recorder.connection_errors,
+        "duplicate open entries": len(checks["duplicate_opens"]),
+        "lost duration updates": len(checks["lost_updates"]),
+        "stale task totals": len(checks["stale_task_totals"]),
+        "entries left open": len(checks["left_open"]),
+    }
+    print()
+    for name, count in problems.items():
+        print(f"{name:28} {count:>6}")
+    for kind in ("duplicate_opens", "lost_updates", "stale_task_totals"):
+        for example in checks[kind][:5]:
+            print(f"  {kind}: {example}")
+    # busy retries are the mechanism working, everything else is a failure
+    return any(count for name, count in problems.items() if name != "busy retries")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--url",
+        help="use a running `python -m benchmarks.server` instead of starting one",
+    )
+    parser.add_argument(
+        "--database",
+        default=DATABASE_NAME,
+        help="database file of the instance given with --url",
+    )
+    parser.add_argument("--port", type=int, default=5057)
+    parser.add_argument("--server-processes", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=40)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--tasks-per-user", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--hold", type=float, default=0.2, help="seconds between steps")
+    parser.add_argument(
+        "--meddle",
+        type=float,
+        default=0.1,
+        help="share of steps on another tab's timer",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    log_path = os.path.join(tempfile.gettempdir(), "timer_contention_server.log")
+    server = None
+    if args.url is None:
+        ensure_database()
+        copy_database(SCRATCH_DATABASE)
+        args.database = SCRATCH_DATABASE
+        server = start_server(
+            args.port, args.server_processes, log_path, database=SCRATCH_DATABASE
+        )
+        args.url = f"http://127.0.0.1:{args.port}"
+    path = database_path(args.database)
+    try:
+        connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        users = pick_users(connection, args.users, args.tasks_per_user, args.seed)
+        first_entry_id = connection.execute(
+            "SELECT COALESCE(MAX(time_entry_id), 0) + 1 FROM time_entries"
+        ).fetchone()[0]
+        connection.close()
+
+        recorder = Recorder()
+        started = time.monotonic()
+        deadline = started + args.duration
+        threads = [
+            threading.Thread(
+                target=worker,
+                args=(
+                    args.url,
+                    *users[index % len(users)],
+                    recorder,
+                    deadline,
+                    args.hold,
+                    args.meddle,
+                    args.seed + index,
+                ),
+            )
+            for index in range(args.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    log_text = ""
+    if server is not None:
+        with open(log_path) as file:
+            log_text = file.read()
+    checks = check_database(path, recorder, first_entry_id)
+    failed = report(recorder, checks, elapsed, log_text)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,76 @@
 import os
 
 from dotenv import load_dotenv
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool
 
 load_dotenv()
 
 basedir = os.path.abspath(os.path.dirname(__file__))
 
 
+def _shard_binds(names, folder, engine_options):
+    """Build the `SQLALCHEMY_SHARDS` entries for comma-separated shard names."""
+    return {
+        name: {
+            "url": "sqlite:///" + os.path.join(folder, f"shard-{name}.db"),
+            **engine_options,
+        }
+        for name in names.split(",")
+        if name
+    }
+
+
+def _read_binds(database_path, snapshot_path):
+    """Build `SQLALCHEMY_READ_BINDS` for a database file and its analytics snapshot."""
+    return {
+        "reader": {
+            "url": "sqlite:///file:" + database_path + "?mode=ro&uri=true",
+            "pool_size": int(os.getenv("DATABASE_READ_POOL_SIZE", 10)),
+        },
+        # no pooling: every connection opens the latest snapshot file
+        "analytics": {
+            "url": "sqlite:///file:" + snapshot_path + "?mode=ro&uri=true",
+            "poolclass": NullPool,
+        },
+    }
+
+
+def database_file_settings(database_uri, engine_options):
+    """Return the settings that belong next to the database file of a URI.
+
+    `create_app` applies them when its config overrides
+    `SQLALCHEMY_DATABASE_URI`, so the read-only engines, the analytics
+    snapshot and the shards follow the database that is written to.
+
+    Args:
+        database_uri (str): The effective `SQLALCHEMY_DATABASE_URI`.
+        engine_options (dict): Engine options for the shards.
+
+    Returns:
+        dict: `DATABASE_PATH`, `ANALYTICS_SNAPSHOT_PATH`, `SQLALCHEMY_SHARDS`
+        and `SQLALCHEMY_READ_BINDS`; empty if the URI names no database file.
+    """
+    database = make_url(database_uri).database or ""
+    if database.startswith("file:"):
+        database = database[5:]
+    if database in ("", ":memory:"):
+        return {}
+    database_path = os.path.abspath(database)
+    folder = os.path.dirname(database_path)
+    snapshot_path = os.path.join(
+        folder, os.getenv("ANALYTICS_DATABASE_NAME", "analytics.db")
+    )
+    return {
+        "DATABASE_PATH": database_path,
+        "ANALYTICS_SNAPSHOT_PATH": snapshot_path,
+        "SQLALCHEMY_SHARDS": _shard_binds(
+            os.getenv("DATABASE_SHARDS", ""), folder, engine_options
+        ),
+        "SQLALCHEMY_READ_BINDS": _read_binds(database_path, snapshot_path),
+    }
+
+
 class Config:
     """
     Configuration class for Flask application settings.
@@ -17,8 +81,29 @@ class Config:
     Attributes:
         SECRET_KEY (str): Secret key for session management.
         FLASK_ENV (str): Environment mode ('production', 'development', etc.).
+        DATABASE_PATH (str): Absolute path of the SQLite database file.
         SQLALCHEMY_DATABASE_URI (str): URI for the database connection.
         SQLALCHEMY_TRACK_MODIFICATIONS (bool): Disable modification tracking.
+        AUTO_CREATE_SCHEMA (bool): Create missing tables at startup and rebuild
+            tables with outdated foreign keys, skipped anyway when the database
+            has an `alembic_version` table.
+        JINJA_BYTECODE_CACHE_DIR (str): Directory of the compiled templates, None
+            for Jinja's per-user directory in the system temp folder.
+        STATIC_MANIFEST_ENABLED (bool): Serve static files under content-hashed URLs
+            with far-future caching; turn off while editing CSS or JS.
+        STATIC_MANIFEST_EXCLUDE (list[str]): Static subfolders whose files change at
+            runtime and keep their plain URLs.
+        STATIC_IMMUTABLE_MAX_AGE (int): Seconds browsers cache a hashed static file.
+        ORJSON_ENABLED (bool): Serialize JSON with orjson when it is installed.
+        MSGPACK_ENABLED (bool): Answer `Accept: application/msgpack` with
+            MessagePack instead of JSON (needs orjson and msgpack).
+        COMPRESSION_ENABLED (bool): Compress text responses the client accepts
+            gzip or brotli for.
+        COMPRESSION_MIN_SIZE (int): Bytes below which a buffered response is sent
+            uncompressed; streamed responses are always compressed.
+        COMPRESSION_LEVEL (int): gzip level, 1 (fastest) to 9 (smallest).
+        COMPRESSION_BROTLI_QUALITY (int): brotli quality, 0 (fastest) to 11.
+        COMPRESSION_MIMETYPES (list[str]): Response types that are compressed.
         UPLOAD_EXTENSIONS (list[str]): Allowed file extensions for uploads.
         UPLOAD_PATH (str): Relative path for upload directory.
         UPLOAD_FOLDER (str): Absolute path for upload directory.
@@ -29,17 +114,187 @@ class Config:
         MAIL_USERNAME (str): Username for SMTP authentication.
         MAIL_PASSWORD (str): Password for SMTP authentication.
         JWT_SECRET_KEY (str): Secret key used for JWT encoding/decoding.
+        SERVER_BIND (str): Address `flask serve` listens on, "host:port".
+        SERVER_WORKERS (int): Worker processes forked from the preloaded app.
+        SERVER_THREADS (int): Request threads per worker.
+        SERVER_TIMEOUT (int): Seconds a request may take before its worker is
+            killed and replaced.
+        SERVER_GRACEFUL_TIMEOUT (int): Seconds workers get to finish their requests
+            on a restart or shutdown.
+        SERVER_KEEPALIVE (int): Seconds an idle keep-alive connection stays open.
+        SERVER_MAX_REQUESTS (int): Requests after which a worker is recycled, 0 never.
+        PROJECT_PURGE_THRESHOLD (int): Number of time entries above which a project
+            is deleted by the chunked background purge.
+        PROJECT_PURGE_CHUNK_SIZE (int): Rows deleted per transaction by the purge.
+        SQLITE_PRAGMAS (dict): Pragmas applied to every new SQLite connection.
+        SQLITE_BUSY_RETRIES (int): How often a write is retried after SQLITE_BUSY.
+        SQLITE_BUSY_BACKOFF (float): Initial delay in seconds between retries,
+            doubled after every attempt.
+        SQLALCHEMY_ENGINE_OPTIONS (dict): Connection pool settings for the engine.
+        SQL_INSTRUMENTATION (bool): Record the SQL statements of every request.
+        SQL_SLOW_QUERY_MS (float): Statements slower than this are logged with a stack.
+        SQL_N_PLUS_ONE_THRESHOLD (int): Executions of one statement shape per
+            request above which the request is reported as a possible N+1.
+        METRICS_ENABLED (bool): Collect request metrics for `/metrics`.
+        METRICS_DB_PATH (str): SQLite file in which all workers store their metrics.
+        METRICS_FLUSH_INTERVAL (float): Seconds between two writes of a worker's
+            metrics to the store.
+        METRICS_TOKEN (str): Bearer token the scraper has to send to `/metrics`,
+            the endpoint is off while it is unset.
+        PROFILING_TOKEN (str): Secret that enables on-demand request profiling,
+            profiling is off while it is unset.
+        PROFILING_SAMPLE_RATE (int): Profile one in N requests, 0 disables sampling.
+        PROFILING_DIR (str): Directory for profile and flamegraph files.
+        PROFILING_TOP_ALLOCATIONS (int): Allocation sites kept per memory profile.
+        PROFILING_MAX_FILES (int): Newest files kept in PROFILING_DIR, older
+            profiles are deleted.
+        TRACING_ENABLED (bool): Record request traces with route, service and SQL spans.
+        TRACING_FILE (str): JSON-lines file the traces are appended to.
+        LOG_LEVEL (str): Level of the `backend` loggers, e.g. "INFO" or "DEBUG".
+        LOG_FORMAT (str): "text" for key=value lines or "json" for one JSON object
+            per line.
+        SQLALCHEMY_SHARDS (dict): Engine options of the additional shards by name,
+            e.g. from `DATABASE_SHARDS=a,b` the files `shard-a.db` and `shard-b.db`
+            next to the primary database. Empty disables sharding.
+        SQLALCHEMY_READ_BINDS (dict): Engine options of the read-only engines used
+            inside `backend.database.read_only()`: "reader" on the live database
+            file and "analytics" on the analytics snapshot.
+        ANALYTICS_SNAPSHOT_PATH (str): Path of the analytics snapshot database.
+        ANALYTICS_SNAPSHOT_INTERVAL (int): Seconds between two snapshot refreshes
+            by a process of the `flask serve` master, 0 disables the background
+            refresh (e.g. for `flask refresh-analytics-snapshot` from cron).
+        ANALYTICS_SNAPSHOT_PAGES (int): Pages copied per backup step.
+        ANALYTICS_SNAPSHOT_SLEEP (float): Seconds to pause between backup steps.
+        TIME_ENTRY_HOT_MONTHS (int): Months whose time entries stay in the hot
+            `time_entries` table, including the current one; `flask
+            compact-time-entries` moves older ones into month partitions.
     """
 
     SECRET_KEY = os.getenv("SECRET_KEY", "default-secret")
     FLASK_ENV = os.getenv("FLASK_ENV", "production")
 
-    SQLALCHEMY_DATABASE_URI = "sqlite:///" + os.path.join(
+    DATABASE_PATH = os.path.join(
         basedir,
         os.getenv("DATABASE_FOLDER", "backend"),
         os.getenv("DATABASE_NAME", "database.db"),
     )
+    SQLALCHEMY_DATABASE_URI = "sqlite:///" + DATABASE_PATH
+
+    ANALYTICS_SNAPSHOT_PATH = os.path.join(
+        basedir,
+        os.getenv("DATABASE_FOLDER", "backend"),
+        os.getenv("ANALYTICS_DATABASE_NAME", "analytics.db"),
+    )
+    ANALYTICS_SNAPSHOT_INTERVAL = int(os.getenv("ANALYTICS_SNAPSHOT_INTERVAL", 300))
+    ANALYTICS_SNAPSHOT_PAGES = int(os.getenv("ANALYTICS_SNAPSHOT_PAGES", 1024))
+    ANALYTICS_SNAPSHOT_SLEEP = float(os.getenv("ANALYTICS_SNAPSHOT_SLEEP", 0.01))
+    TIME_ENTRY_HOT_MONTHS = int(os.getenv("TIME_ENTRY_HOT_MONTHS", 2))
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    AUTO_CREATE_SCHEMA = os.getenv("AUTO_CREATE_SCHEMA", "True").lower() in (
+        "true",
+        "1",
+        "yes",
+    )
+    JINJA_BYTECODE_CACHE_DIR = os.getenv("JINJA_BYTECODE_CACHE_DIR")
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_size": int(os.getenv("DATABASE_POOL_SIZE", 5)),
+        "max_overflow": int(os.getenv("DATABASE_MAX_OVERFLOW", 10)),
+        "pool_timeout": int(os.getenv("DATABASE_POOL_TIMEOUT", 30)),
+    }
+
+    SQLALCHEMY_SHARDS = _shard_binds(
+        os.getenv("DATABASE_SHARDS", ""),
+        os.path.dirname(DATABASE_PATH),
+        SQLALCHEMY_ENGINE_OPTIONS,
+    )
+
+    SQLALCHEMY_READ_BINDS = _read_binds(DATABASE_PATH, ANALYTICS_SNAPSHOT_PATH)
+
+    SQLITE_PRAGMAS = {
+        "foreign_keys": "ON",
+        "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+        "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+        "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000)),
+        # negative values are KiB, i.e. 64 MiB page cache
+        "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", -64000)),
+        "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", 268435456)),
+        "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+    }
+    SQLITE_BUSY_RETRIES = int(os.getenv("SQLITE_BUSY_RETRIES", 3))
+    SQLITE_BUSY_BACKOFF = float(os.getenv("SQLITE_BUSY_BACKOFF", 0.05))
+
+    SQL_INSTRUMENTATION = os.getenv("SQL_INSTRUMENTATION", "True").lower() in (
+        "true",
+        "1",
+        "yes",
+    )
+    SQL_SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", 200))
+    SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", 10))
+
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True").lower() in (
+        "true",
+        "1",
+        "yes",
+    )
+    METRICS_DB_PATH = os.getenv(
+        "METRICS_DB_PATH", os.path.join(basedir, "backend", "metrics.db")
+    )
+    METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", 5))
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+    PROFILING_TOKEN = os.getenv("PROFILING_TOKEN")
+    PROFILING_SAMPLE_RATE = int(os.getenv("PROFILING_SAMPLE_RATE", 0))
+    PROFILING_DIR = os.getenv("PROFILING_DIR", os.path.join(basedir, "profiles"))
+    PROFILING_TOP_ALLOCATIONS = int(os.getenv("PROFILING_TOP_ALLOCATIONS", 25))
+    PROFILING_MAX_FILES = int(os.getenv("PROFILING_MAX_FILES", 200))
+
+    TRACING_ENABLED = os.getenv("TRACING_ENABLED", "False").lower() in (
+        "true",
+        "1",
+        "yes",
+    )
+    TRACING_FILE = os.getenv("TRACING_FILE", os.path.join(basedir, "traces.jsonl"))
+
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+
+    STATIC_MANIFEST_ENABLED = os.getenv("STATIC_MANIFEST_ENABLED", "True").lower() in (
+        "true",
+        "1",
+        "yes",
+    )
+    STATIC_MANIFEST_EXCLUDE = os.getenv(
+        "STATIC_MANIFEST_EXCLUDE", "profile_pictures"
+    ).split(",")
+    STATIC_IMMUTABLE_MAX_AGE = int(os.getenv("STATIC_IMMUTABLE_MAX_AGE", 31536000))
+
+    ORJSON_ENABLED = os.getenv("ORJSON_ENABLED", "True").lower() in ("true", "1", "yes")
+    MSGPACK_ENABLED = os.getenv("MSGPACK_ENABLED", "True").lower() in (
+        "true",
+        "1",
+        "yes",
+    )
+
+    COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "True").lower() in (
+        "true",
+        "1",
+        "yes",
+    )
+    COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+    COMPRESSION_LEVEL = int(os.getenv("COMPRESSION_LEVEL", 6))
+    # the top qualities are meant for static files, too slow per request
+    COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 4))
+    COMPRESSION_MIMETYPES = [
+        "application/json",
+        "application/msgpack",
+        "application/x-msgpack",
+        "text/csv",
+        "text/html",
+        "text/plain",
+        "text/css",
+        "text/javascript",
+        "application/javascript",
+    ]
 
     UPLOAD_EXTENSIONS = os.getenv("UPLOAD_EXTENSIONS", ".jpg,.png").split(",")
     UPLOAD_PATH = os.getenv("UPLOAD_PATH", "uploads")
@@ -53,3 +308,14 @@ class Config:
     MAIL_PASSWORD = os.getenv("MAIL_PASSWORD")
 
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "default-jwt-secret")
+
+    SERVER_BIND = os.getenv("SERVER_BIND", "127.0.0.1:8000")
+    SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", os.cpu_count() or 1))
+    SERVER_THREADS = int(os.getenv("SERVER_THREADS", 4))
+    SERVER_TIMEOUT = int(os.getenv("SERVER_TIMEOUT", 60))
+    SERVER_GRACEFUL_TIMEOUT = int(os.getenv("SERVER_GRACEFUL_TIMEOUT", 30))
+    SERVER_KEEPALIVE = int(os.getenv("SERVER_KEEPALIVE", 5))
+    SERVER_MAX_REQUESTS = int(os.getenv("SERVER_MAX_REQUESTS", 0))
+
+    PROJECT_PURGE_THRESHOLD = int(os.getenv("PROJECT_PURGE_THRESHOLD", 5000))
+    PROJECT_PURGE_CHUNK_SIZE = int(os.getenv("PROJECT_PURGE_CHUNK_SIZE", 1000))
@@ -0,0 +1,44 @@
+"""add hot query indexes
+
+Revision ID: 0002_hot_query_indexes
+Revises: 0001_initial_schema
+Create Date: 2026-10-19 10:17:51.469807
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_hot_query_indexes'
+down_revision = '0001_initial_schema'
+branch_labels = None
+depends_on = None
+
+
+# (index name, table, columns) for the filters used by the services
+INDEXES = [
+    ('ix_time_entries_user_id_start_time', 'time_entries', ['user_id', 'start_time']),
+    ('ix_time_entries_user_id_end_time', 'time_entries', ['user_id', 'end_time']),
+    ('ix_time_entries_task_id', 'time_entries', ['task_id']),
+    ('ix_tasks_project_id', 'tasks', ['project_id']),
+    ('ix_tasks_member_id', 'tasks', ['member_id']),
+    ('ix_tasks_user_id', 'tasks', ['user_id']),
+    ('ix_tasks_admin_id', 'tasks', ['admin_id']),
+    ('ix_tasks_due_date', 'tasks', ['due_date']),
+    ('ix_notifications_user_id_is_read_created_at', 'notifications',
+     ['user_id', 'is_read', 'created_at']),
+    ('ix_projects_team_id', 'projects', ['team_id']),
+    ('ix_projects_user_id', 'projects', ['user_id']),
+]
+
+
+def upgrade():
+    # IF NOT EXISTS: databases created by db.create_all() already have them
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False, if_not_exists=True)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
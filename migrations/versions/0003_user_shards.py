@@ -0,0 +1,34 @@
+"""add user shard directory
+
+Revision ID: 0003_user_shards
+Revises: 0002_hot_query_indexes
+Create Date: 2026-10-19 11:35:12.204518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_user_shards'
+down_revision = '0002_hot_query_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # IF NOT EXISTS: databases created by db.create_all() already have it
+    op.create_table('user_shards',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('username', sa.String(), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('shard', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('user_id'),
+    sa.UniqueConstraint('email'),
+    sa.UniqueConstraint('username'),
+    if_not_exists=True
+    )
+
+
+def downgrade():
+    op.drop_table('user_shards', if_exists=True)
@@ -0,0 +1,30 @@
+"""add time entry history view
+
+Revision ID: 0004_time_entry_history
+Revises: 0003_user_shards
+Create Date: 2026-10-19 12:48:03.551872
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_time_entry_history'
+down_revision = '0003_user_shards'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # over the hot table only; `flask compact-time-entries` adds the month
+    # partitions and switches the table to AUTOINCREMENT
+    op.execute(
+        'CREATE VIEW IF NOT EXISTS time_entry_history AS '
+        'SELECT time_entry_id, user_id, task_id, start_time, end_time, '
+        'duration_seconds, comment FROM time_entries'
+    )
+
+
+def downgrade():
+    op.execute('DROP VIEW IF EXISTS time_entry_history')
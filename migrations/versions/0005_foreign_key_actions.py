@@ -0,0 +1,251 @@
+"""add ON DELETE rules to the foreign keys
+
+Revision ID: 0005_foreign_key_actions
+Revises: 0004_time_entry_history
+Create Date: 2026-10-19 13:02:41.318205
+
+"""
+import logging
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005_foreign_key_actions'
+down_revision = '0004_time_entry_history'
+branch_labels = None
+depends_on = None
+
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+PARTITION_PATTERN = re.compile(r'^time_entries_\d{4}_\d{2}$')
+HISTORY_COLUMNS = (
+    'time_entry_id, user_id, task_id, start_time, end_time, '
+    'duration_seconds, comment'
+)
+
+
+def _tables(actions):
+    """The tables with the given ON DELETE rules, as created by create_all()."""
+    metadata = sa.MetaData()
+    for name, key in [('users', 'user_id'), ('teams', 'team_id')]:
+        sa.Table(name, metadata, sa.Column(key, sa.Integer(), primary_key=True))
+
+    def fk(target, action):
+        return sa.ForeignKey(target, ondelete=action if actions else None)
+
+    categories = sa.Table('categories', metadata,
+        sa.Column('category_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('user_id', sa.Integer(), fk('users.user_id', 'CASCADE'),
+                  nullable=False),
+        sa.PrimaryKeyConstraint('category_id'),
+        sa.Index('ix_categories_category_id', 'category_id'),
+    )
+    projects = sa.Table('projects', metadata,
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.Column('time_limit_hours', sa.Integer(), nullable=False),
+        sa.Column('current_hours', sa.Float(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('due_date', sa.DateTime(), nullable=True),
+        sa.Column('type', sa.Enum('TeamProject', 'SoloProject', name='projecttype'),
+                  nullable=False),
+        sa.Column('is_course', sa.Boolean(), nullable=True),
+        sa.Column('credit_points', sa.Integer(), nullable=True),
+        sa.Column('status', sa.Enum('active', 'inactive', name='projectstatus'),
+                  nullable=False),
+        sa.Column('user_id', sa.Integer(), fk('users.user_id', 'SET NULL'),
+                  nullable=actions),
+        sa.Column('team_id', sa.Integer(), fk('teams.team_id', 'CASCADE'),
+                  nullable=True),
+        sa.PrimaryKeyConstraint('project_id'),
+        sa.Index('ix_projects_project_id', 'project_id'),
+        sa.Index('ix_projects_team_id', 'team_id'),
+        sa.Index('ix_projects_user_id', 'user_id'),
+    )
+    user_teams = sa.Table('user_teams', metadata,
+        sa.Column('user_id', sa.Integer(), fk('users.user_id', 'CASCADE'),
+                  nullable=False),
+        sa.Column('team_id', sa.Integer(), fk('teams.team_id', 'CASCADE'),
+                  nullable=False),
+        sa.Column('role', sa.String(), nullable=False),
+        sa.Column('joined_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('user_id', 'team_id'),
+    )
+    notifications = sa.Table('notifications', metadata,
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), fk('users.user_id', 'CASCADE'),
+                  nullable=False),
+        sa.Column('project_id', sa.Integer(),
+                  fk('projects.project_id', 'SET NULL'), nullable=True),
+        sa.Column('message', sa.String(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('type', sa.String(), nullable=False),
+        sa.Column('is_read', sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.Index('ix_notifications_id', 'id'),
+        sa.Index('ix_notifications_user_id_is_read_created_at',
+                 'user_id', 'is_read', 'created_at'),
+    )
+    tasks = sa.Table('tasks', metadata,
+        sa.Column('task_id', sa.Integer(), nullable=False),
+        sa.Column('project_id', sa.Integer(),
+                  fk('projects.project_id', 'CASCADE'), nullable=True),
+        sa.Column('user_id', sa.Integer(), fk('users.user_id', 'SET NULL'),
+                  nullable=True),
+        sa.Column('admin_id', sa.Integer(), fk('users.user_id', 'SET NULL'),
+                  nullable=True),
+        sa.Column('member_id', sa.Integer(), fk('users.user_id', 'SET NULL'),
+                  nullable=True),
+        sa.Column('category_id', sa.Integer(),
+                  fk('categories.category_id', 'SET NULL'), nullable=True),
+        sa.Column('title', sa.String(), nullable=True),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.Column('due_date', sa.DateTime(), nullable=True),
+        sa.Column('status',
+                  sa.Enum('todo', 'in_progress', 'done', name='taskstatus'),
+                  nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('created_from_tracking', sa.Boolean(), nullable=False),
+        sa.Column('total_duration_seconds', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('task_id'),
+        sa.Index('ix_tasks_project_id', 'project_id'),
+        sa.Index('ix_tasks_user_id', 'user_id'),
+        sa.Index('ix_tasks_admin_id', 'admin_id'),
+        sa.Index('ix_tasks_member_id', 'member_id'),
+        sa.Index('ix_tasks_due_date', 'due_date'),
+    )
+    time_entries = sa.Table('time_entries', metadata,
+        sa.Column('time_entry_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), fk('users.user_id', 'CASCADE'),
+                  nullable=False),
+        sa.Column('task_id', sa.Integer(), fk('tasks.task_id', 'CASCADE'),
+                  nullable=False),
+        sa.Column('start_time', sa.DateTime(), nullable=True),
+        sa.Column('end_time', sa.DateTime(), nullable=True),
+        sa.Column('duration_seconds', sa.Integer(), nullable=True),
+        sa.Column('comment', sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint('time_entry_id'),
+        sa.Index('ix_time_entries_user_id_start_time', 'user_id', 'start_time'),
+        sa.Index('ix_time_entries_user_id_end_time', 'user_id', 'end_time'),
+        sa.Index('ix_time_entries_task_id', 'task_id'),
+    )
+    return [categories, projects, user_teams, notifications, tasks, time_entries]
+
+
+def _has_autoincrement(bind):
+    sql = bind.exec_driver_sql(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' "
+        "AND name = 'time_entries'"
+    ).scalar()
+    return 'AUTOINCREMENT' in (sql or '').upper()
+
+
+def _apply_delete_rules(bind):
+    """Delete or clear the rows whose referenced row is gone.
+
+    The first release deleted tasks without their time entries, so such
+    rows exist. They get what their ON DELETE rule would have done; rows
+    of foreign keys without a rule are kept and logged.
+    """
+    foreign_keys = {}
+    while True:
+        problems = bind.exec_driver_sql('PRAGMA foreign_key_check').fetchall()
+        skipped = []
+        for table, rowid, parent, fkid in problems:
+            if table not in foreign_keys:
+                foreign_keys[table] = bind.exec_driver_sql(
+                    f'PRAGMA foreign_key_list("{table}")'
+                ).fetchall()
+            key = [row for row in foreign_keys[table] if row[0] == fkid]
+            rule = key[0][6].upper()
+            if rowid is None or rule not in ('CASCADE', 'SET NULL'):
+                skipped.append((table, rowid, parent, fkid))
+            elif rule == 'CASCADE':
+                bind.exec_driver_sql(
+                    f'DELETE FROM "{table}" WHERE rowid = ?', (rowid,)
+                )
+            else:
+                columns = ', '.join(f'"{row[3]}" = NULL' for row in key)
+                bind.exec_driver_sql(
+                    f'UPDATE "{table}" SET {columns} WHERE rowid = ?', (rowid,)
+                )
+        if len(skipped) == len(problems):
+            break
+    if skipped:
+        logger.warning('kept %d rows without their referenced row: %s',
+                       len(skipped), skipped[:10])
+
+
+def _recreate(actions, autoincrement):
+    bind = op.get_bind()
+    # SQLite runs the ON DELETE rules (or fails the constraints) of the
+    # referencing tables when a referenced table is dropped for the copy.
+    # The pragma is ignored inside a transaction.
+    with op.get_context().autocommit_block():
+        op.execute('PRAGMA foreign_keys = OFF')
+    try:
+        _copy_tables(bind, actions, autoincrement)
+    except BaseException:
+        # turning the pragma back on needs the transaction to end, which
+        # would commit the half-done copy; a new connection gets it from
+        # the configured pragmas
+        bind.invalidate()
+        raise
+    with op.get_context().autocommit_block():
+        op.execute('PRAGMA foreign_keys = ON')
+
+
+def _copy_tables(bind, actions, autoincrement):
+    if bind.exec_driver_sql('PRAGMA foreign_keys').scalar():
+        raise RuntimeError('could not turn off the foreign key enforcement')
+
+    # a table referenced by a view cannot be renamed into place
+    partitions = sorted(
+        name for name in sa.inspect(bind).get_table_names()
+        if PARTITION_PATTERN.match(name)
+    )
+    op.execute('DROP VIEW IF EXISTS time_entry_history')
+    # the AUTOINCREMENT counter lives in sqlite_sequence and goes with the
+    # table, archived entries may have used ids above the largest hot one
+    sequence = 0
+    if _has_autoincrement(bind):
+        sequence = bind.exec_driver_sql(
+            "SELECT seq FROM sqlite_sequence WHERE name = 'time_entries'"
+        ).scalar() or 0
+
+    for table in _tables(actions):
+        table_kwargs = {}
+        if table.name == 'time_entries' and autoincrement:
+            table_kwargs['sqlite_autoincrement'] = True
+        with op.batch_alter_table(table.name, copy_from=table,
+                                  recreate='always', table_kwargs=table_kwargs):
+            pass
+
+    if sequence and autoincrement:
+        op.execute(
+            "UPDATE sqlite_sequence SET seq = MAX(seq, {:d}) "
+            "WHERE name = 'time_entries'".format(sequence)
+        )
+    op.execute(
+        'CREATE VIEW time_entry_history AS '
+        + ' UNION ALL '.join(
+            f'SELECT {HISTORY_COLUMNS} FROM {name}'
+            for name in ['time_entries', *partitions]
+        )
+    )
+    _apply_delete_rules(bind)
+
+
+def upgrade():
+    # AUTOINCREMENT as in create_all(), so compaction never has to rebuild
+    _recreate(actions=True, autoincrement=True)
+
+
+def downgrade():
+    _recreate(actions=False, autoincrement=_has_autoincrement(op.get_bind()))
@@ -0,0 +1,30 @@
+"""add team shard directory
+
+Revision ID: 0006_team_shards
+Revises: 0005_foreign_key_actions
+Create Date: 2026-10-19 16:21:47.830152
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006_team_shards'
+down_revision = '0005_foreign_key_actions'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # IF NOT EXISTS: databases created by db.create_all() already have it
+    op.create_table('team_shards',
+    sa.Column('team_id', sa.Integer(), nullable=False),
+    sa.Column('shard', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('team_id'),
+    if_not_exists=True
+    )
+
+
+def downgrade():
+    op.drop_table('team_shards', if_exists=True)